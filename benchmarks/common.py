@@ -0,0 +1,28 @@
+import os
+from types import SimpleNamespace
+
+
+def make_settings(sampling_rate: int = 100, port: str = "/dev/null"):
+    """Minimal stand-in for the Settings attributes the benchmarked code reads."""
+    return SimpleNamespace(
+        channels=[
+            SimpleNamespace(name="EHZ", adc_channel=0),
+            SimpleNamespace(name="EHN", adc_channel=1),
+            SimpleNamespace(name="EHE", adc_channel=2),
+        ],
+        decimation_factor=4,
+        mcu=SimpleNamespace(sampling_rate=sampling_rate, adc_gain=6, adc_sample_rate=11, vref=2.5),
+        station=SimpleNamespace(network="XX", station="RPI3", location_code="00"),
+        jobs_settings=SimpleNamespace(
+            reader=SimpleNamespace(port=port, baudrate=250000),
+            ring_server=SimpleNamespace(host="localhost", port=18000, write_interval_sec=10.0),
+        ),
+    )
+
+
+def process_cpu_sec(pid: int) -> float:
+    """User + system CPU time of a process so far, from /proc (Linux only)."""
+    with open(f"/proc/{pid}/stat") as f:
+        # The command name may contain spaces: split after its closing bracket
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
@@ -0,0 +1,98 @@
+"""
+Speed of split_buffer_at_midnight against the per-sample loop it replaced.
+
+Each buffer holds one write interval of samples straddling midnight. The
+script first checks that both implementations cut every buffer at the same
+sample, including start times a nanosecond away from midnight, then times
+them.
+
+    python -m benchmarks.midnight_split [--rates 100 250 1000] [--interval 1800]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from obspy import UTCDateTime
+
+from src.utils.writer_utils import split_buffer_at_midnight
+
+
+def reference_split(values, start_time: UTCDateTime, sampling_rate: float):
+    """The former implementation: the day of every sample through UTCDateTime."""
+    slices = []
+    slice_start = start_time
+    slice_values = []
+
+    seconds_per_sample = 1.0 / sampling_rate
+
+    for i, v in enumerate(values):
+        sample_time = start_time + i * seconds_per_sample
+
+        if slice_values and sample_time.julday != slice_start.julday:
+            slices.append((slice_start, slice_values))
+            slice_start = sample_time
+            slice_values = []
+
+        slice_values.append(v)
+
+    if slice_values:
+        slices.append((slice_start, slice_values))
+
+    return slices
+
+
+def check_equivalence(cases: int = 300):
+    """Raise AssertionError if the two implementations split a buffer differently."""
+    rng = random.Random(3)
+    for _ in range(cases):
+        rate = rng.choice([1, 20, 50, 100, 200, 250, 333.3, 500, 1000 / 3])
+        count = rng.randint(1, 5000)
+        midnight = UTCDateTime(2025, 12, 31) + 86400 * rng.randint(0, 2)
+        start = (
+            midnight
+            - rng.uniform(0, count / rate)
+            + rng.choice([0, 1e-9, -1e-9, 0.5 / rate])
+        )
+        values = np.arange(count, dtype=np.int32)
+
+        expected = [(t, len(v)) for t, v in reference_split(list(values), start, rate)]
+        actual = [(t, len(v)) for t, v in split_buffer_at_midnight(values, start, rate)]
+        assert actual == expected, (rate, count, start, expected, actual)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=float, nargs="+", default=[100, 250, 1000])
+    parser.add_argument("--interval", type=float, default=1800.0, help="Buffer length, seconds")
+    args = parser.parse_args()
+
+    check_equivalence()
+    print("Both implementations split 300 random buffers identically")
+
+    print(f"{'rate':>7} {'samples':>9} {'reference':>11} {'current':>11} {'speedup':>9}")
+    for rate in args.rates:
+        count = int(rate * args.interval)
+        values = np.arange(count, dtype=np.int32)
+        start = UTCDateTime(2026, 1, 1) - args.interval / 2
+
+        reference = best_of(1, reference_split, values.tolist(), start, rate)
+        current = best_of(5, split_buffer_at_midnight, values, start, rate)
+        print(
+            f"{rate:>5.0f}Hz {count:>9} {1000 * reference:>9.1f}ms "
+            f"{1000 * current:>9.3f}ms {reference / current:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput of the RingServerSender, from the hub to a DataLink server.
+
+A minute of 3-channel data is published on a private hub endpoint as fast
+as possible, in blocks of a tenth of a second, to a RingServerSender
+connected to an in-process DataLink server. The time runs until the last
+sample has been acknowledged, after checking that every sample arrived.
+The loop it replaced slept 10 ms after every message, a ceiling of about
+100 messages/s whatever the rate, shown for comparison.
+
+    python -m benchmarks.ringserver_throughput [--rates 100 250 500 1000] [--seconds 60]
+"""
+
+import argparse
+import io
+import logging
+import os
+import tempfile
+import time
+from multiprocessing import Event
+
+import numpy as np
+import zmq
+from obspy import read
+
+from benchmarks.common import make_settings
+from tests.fake_datalink import FakeDataLinkServer
+from src.structs.hub_message import HubMessage
+from src.threads.managers.ringserver_sender import RingServerSender
+
+FORMER_MESSAGES_PER_SEC = 100
+
+
+def measure(rate: int, seconds: float) -> tuple[float, int]:
+    """Seconds to deliver `seconds` of data at `rate`, and the hub messages sent."""
+    server = FakeDataLinkServer().start()
+    settings = make_settings(rate)
+    settings.jobs_settings.ring_server.host = f"127.0.0.1:{server.port}"
+
+    endpoint = f"ipc://{tempfile.gettempdir()}/rpi-seism-bench-{os.getpid()}.ipc"
+    context = zmq.Context.instance()
+    pub = context.socket(zmq.PUB)
+    pub.setsockopt(zmq.SNDHWM, 0)
+    pub.bind(endpoint)
+
+    shutdown_event = Event()
+    sender = RingServerSender(settings, shutdown_event, endpoint)
+    sender.start()
+    time.sleep(0.5)  # Subscription and DataLink connection
+
+    # Blocks of 0.1 s starting now, so no channel is stale mid-run
+    block = max(1, rate // 10)
+    rng = np.random.default_rng(0)
+    start_time = time.time()
+    frames = [
+        HubMessage.data_message(
+            sequence,
+            start_time + sequence * block / rate,
+            np.cumsum(rng.integers(-50, 50, (len(settings.channels), block)), axis=1),
+        ).to_frames()
+        for sequence in range(int(rate * seconds / block))
+    ]
+
+    started = time.perf_counter()
+    for message in frames:
+        pub.send_multipart(message)
+    while sender.messages_received < len(frames):
+        time.sleep(0.001)
+    # Stopping packs the partial records and waits for their acknowledgement
+    shutdown_event.set()
+    sender.join()
+    elapsed = time.perf_counter() - started
+
+    pub.close()
+    server.stop()
+
+    received = read(io.BytesIO(b"".join(packet[3] for packet in server.packets)))
+    samples = sum(trace.stats.npts for trace in received)
+    expected = len(frames) * len(settings.channels) * block
+    if samples != expected:
+        raise RuntimeError(f"The server received {samples} of {expected} samples")
+
+    return elapsed, len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'rate':>6} {'messages':>9} {'elapsed':>9} {'messages/s':>11} {'realtime':>9} {'former max':>11}")
+    for rate in args.rates:
+        elapsed, messages = measure(rate, args.seconds)
+        former = messages / FORMER_MESSAGES_PER_SEC
+        print(
+            f"{rate:>4}Hz {messages:>9} {elapsed:>8.2f}s {messages / elapsed:>11.0f} "
+            f"{args.seconds / elapsed:>8.0f}x {args.seconds / former:>10.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+CPU cost of the Reader's serial loop.
+
+A pseudo-terminal plays the MCU: it echoes the settings frame like the
+firmware does, then streams packets at the sampling rate. The real Reader
+process reads them and publishes on a private hub endpoint, while this
+script counts the data messages and samples the Reader's CPU time. The
+same stream is then read by the loop the Reader used before blocking reads
+(spinning on in_waiting with a per-packet decoder), for comparison.
+
+    python -m benchmarks.serial_reader [--rates 100 250 500] [--seconds 20]
+
+Linux only (pty and /proc).
+"""
+
+import argparse
+import logging
+import os
+import pty
+import struct
+import tempfile
+import threading
+import time
+from binascii import crc32
+from multiprocessing import Event, Process, Queue
+
+import serial
+import zmq
+
+from benchmarks.common import make_settings, process_cpu_sec
+from src.processes.reader import Reader
+from src.structs.hub_message import DATA_TOPIC
+from src.structs.mcu_settings import MCUSettingsFrame
+from src.structs.sample import Sample
+
+_header = struct.pack("<BBiii", 0xAA, 0xBB, 1, -2, 3)
+PACKET = _header + struct.pack("<I", crc32(_header))
+
+
+def fake_mcu(fd: int, rate: int, stop: threading.Event):
+    """Answer the settings frame, then stream packets at `rate` per second."""
+    frame = b""
+    while len(frame) < MCUSettingsFrame.PACKET_SIZE:
+        frame += os.read(fd, MCUSettingsFrame.PACKET_SIZE - len(frame))
+    time.sleep(0.1)  # The Reader flushes its input before waiting for the echo
+    os.write(fd, frame)
+
+    next_time = time.perf_counter()
+    while not stop.is_set():
+        os.write(fd, PACKET)
+        next_time += 1 / rate
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def polling_loop(port: str, stop: Event):
+    """The Reader loop before blocking reads, without publishing."""
+    with serial.Serial(port, 250000, timeout=0.1) as ser:
+        buffer = bytearray()
+        while not stop.is_set():
+            if ser.in_waiting > 0:
+                buffer.extend(ser.read(ser.in_waiting))
+
+            while len(buffer) >= Sample.PACKET_SIZE:
+                if buffer[0] == 0xAA and buffer[1] == 0xBB:
+                    Sample.from_bytes(buffer[: Sample.PACKET_SIZE])
+                    del buffer[: Sample.PACKET_SIZE]
+                else:
+                    del buffer[0]
+
+
+def measure_reader(rate: int, seconds: float, block_max_samples: int) -> tuple[float, int]:
+    """CPU seconds of the Reader process and data messages published over `seconds`."""
+    master, slave = pty.openpty()
+    stop = threading.Event()
+    mcu = threading.Thread(target=fake_mcu, args=(master, rate, stop), daemon=True)
+    mcu.start()
+
+    endpoint = f"ipc://{tempfile.gettempdir()}/rpi-seism-bench-{os.getpid()}.ipc"
+    shutdown_event = Event()
+    reader = Reader(
+        make_settings(rate, os.ttyname(slave)),
+        shutdown_event,
+        endpoint,
+        Queue(),
+        block_max_samples=block_max_samples,
+    )
+
+    context = zmq.Context.instance()
+    sub = context.socket(zmq.SUB)
+    sub.setsockopt_string(zmq.SUBSCRIBE, DATA_TOPIC)
+    sub.connect(endpoint)
+
+    reader.start()
+    try:
+        # Wait for the handshake (2 s MCU reboot delay) and the first data
+        if not sub.poll(15000):
+            raise RuntimeError("The Reader published no data")
+        sub.recv_multipart()
+
+        messages = 0
+        cpu_start = process_cpu_sec(reader.pid)
+        deadline = time.monotonic() + seconds
+        while (timeout := deadline - time.monotonic()) > 0:
+            if sub.poll(timeout * 1000):
+                sub.recv_multipart()
+                messages += 1
+        cpu = process_cpu_sec(reader.pid) - cpu_start
+    finally:
+        shutdown_event.set()
+        reader.join(5)
+        stop.set()
+        mcu.join()
+        sub.close()
+        os.close(master)
+        os.close(slave)
+
+    return cpu, messages
+
+
+def measure_polling(rate: int, seconds: float) -> float:
+    """CPU seconds of the polling loop over `seconds`."""
+    master, slave = pty.openpty()
+    stop = threading.Event()
+    mcu = threading.Thread(target=fake_mcu, args=(master, rate, stop), daemon=True)
+    mcu.start()
+    os.write(slave, b"\x00" * MCUSettingsFrame.PACKET_SIZE)  # No handshake
+
+    stop_loop = Event()
+    loop = Process(target=polling_loop, args=(os.ttyname(slave), stop_loop))
+    loop.start()
+    try:
+        time.sleep(1)  # Let it open the port
+        cpu_start = process_cpu_sec(loop.pid)
+        time.sleep(seconds)
+        cpu = process_cpu_sec(loop.pid) - cpu_start
+    finally:
+        stop_loop.set()
+        loop.join(5)
+        stop.set()
+        mcu.join()
+        os.close(master)
+        os.close(slave)
+
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[100, 250, 500])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--block-max-samples", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'rate':>6} {'loop':>8} {'CPU':>8} {'messages/s':>11}")
+    for rate in args.rates:
+        cpu, messages = measure_reader(rate, args.seconds, args.block_max_samples)
+        print(f"{rate:>4}Hz {'reader':>8} {100 * cpu / args.seconds:>7.1f}% {messages / args.seconds:>11.0f}")
+        cpu = measure_polling(rate, args.seconds)
+        print(f"{rate:>4}Hz {'polling':>8} {100 * cpu / args.seconds:>7.1f}% {'-':>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from src.processes.plotters import Plotters
 from src.processes.producers import Producers
 from src.processes.reader import Reader
 from src.station_xml import ensure_station_xml
+from src.tuning import Tuning
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,9 @@ def main():
     log_queue = multiprocessing.Queue(-1)
     log_listener = setup_main_logging(data_base_folder, log_queue)
 
+    # Optional performance options, defaults when the file is missing
+    tuning = Tuning.load(data_base_folder / "tuning.yml")
+
     # Define the ZMQ Address for IPC
     ZMQ_ADDR = "ipc:///tmp/seism_hub.ipc"
 
@@ -46,7 +50,9 @@ def main():
     # Initialize the 4 Process Containers
     # Each of these encapsulates multiple threads/tasks
 
-    reader = Reader(settings, shutdown_event, ZMQ_ADDR, log_queue)
+    reader = Reader(
+        settings, shutdown_event, ZMQ_ADDR, log_queue, **tuning.reader.kwargs()
+    )
 
     producers = Producers(
         settings,
@@ -56,14 +62,25 @@ def main():
         plot_queue,
         ZMQ_ADDR,
         log_queue,
+        tuning,
     )
 
-    managers = Managers(settings, shutdown_event, earthquake_event, ZMQ_ADDR, log_queue)
+    managers = Managers(
+        settings,
+        data_base_folder,
+        shutdown_event,
+        earthquake_event,
+        ZMQ_ADDR,
+        log_queue,
+        tuning,
+    )
 
     all_processes = [reader, producers, managers]
 
     if settings.jobs_settings.dayplot.enabled:
-        plotters = Plotters(settings, plot_queue, shutdown_event, log_queue)
+        plotters = Plotters(
+            settings, plot_queue, shutdown_event, log_queue, **tuning.plotters.kwargs()
+        )
         all_processes.append(plotters)
 
     # 5. Start Execution
@@ -1,25 +1,31 @@
 import logging
 from multiprocessing import Event, Process, Queue
+from pathlib import Path
 
 from rpi_seism_common.settings import Settings
 from src.logger import configure_worker_logging
+from src.tuning import Tuning
 
 
 class Managers(Process):
     def __init__(
         self,
         settings: Settings,
+        data_base_folder: Path,
         shutdown_event: Event,
         trigger_event: Event,
         zmq_addr: str,
-        log_queue: Queue
+        log_queue: Queue,
+        tuning: Tuning,
     ):
         super().__init__(name="ManagersProcess")
         self.settings = settings
+        self.data_base_folder = data_base_folder
         self.shutdown_event = shutdown_event
         self.trigger_event = trigger_event
         self.zmq_addr = zmq_addr
         self.log_queue = log_queue
+        self.tuning = tuning
 
     def run(self):
         from src.threads.managers import (
@@ -39,13 +45,20 @@ class Managers(Process):
 
         if any(x.enabled for x in self.settings.jobs_settings.notifiers):
             notifier_job = NotifierSender(
-                self.settings, self.shutdown_event, self.trigger_event, self.zmq_addr
+                self.settings,
+                self.shutdown_event,
+                self.trigger_event,
+                self.zmq_addr,
+                **self.tuning.notifier.kwargs(),
             )
             jobs.append(notifier_job)
 
         if self.settings.jobs_settings.ring_server.enabled:
             ringser_job = RingServerSender(
-                self.settings, self.shutdown_event, self.zmq_addr
+                self.settings,
+                self.shutdown_event,
+                self.zmq_addr,
+                spool_dir=self.data_base_folder / "ringserver_spool",
             )
             jobs.append(ringser_job)
 
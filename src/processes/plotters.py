@@ -1,22 +1,46 @@
 import logging
 import time
-from multiprocessing import Event, Pool, Process, Queue
+import zlib
+from multiprocessing import Event, Process, Queue
 from os import getpid
 from queue import Empty
 
-from src.utils.dayplot_render import init_worker, render_dayplot_worker
+from src.utils.dayplot_render import RECYCLE_EXIT_CODE, plot_worker
 
 
 class Plotters(Process):
+    """
+    Process that manages the day plot workers.
+
+    The workers are persistent: each one imports the plotting stack once and
+    then renders the tasks sent by the MSeedWriter one after another. A
+    worker whose resident memory is above `rss_budget_mb` after a task exits
+    on its own, and is replaced by a fresh one; a crashed worker is replaced
+    the same way. Every task logs its wall and CPU time and the RSS of the
+    worker.
+
+    Each worker has its own task queue: a worker killed while reading a
+    shared queue would leave its lock held and block all the others. Tasks
+    are assigned by plot path, so the incremental updates of a plot always
+    run in order on the same worker.
+    """
+
     def __init__(
         self,
         settings,  # This is the Settings object
         plot_queue: Queue,
         shutdown_event: Event,
         log_queue: Queue,
+        workers: int = 1,
+        rss_budget_mb: int = 300,
     ):
         super().__init__(name="PlottersProcess")
-        # Extract settings to a serializable dict for the pool workers
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if rss_budget_mb <= 0:
+            raise ValueError("rss_budget_mb must be positive.")
+
+        # Extract settings to a serializable dict for the workers
         self.settings_dict = {
             "enabled": settings.jobs_settings.dayplot.enabled,
             "low_cutoff": settings.jobs_settings.dayplot.low_cutoff,
@@ -26,6 +50,9 @@ class Plotters(Process):
         self.plot_queue = plot_queue
         self.shutdown_event = shutdown_event
         self.log_queue = log_queue
+        # workers=1: Do one plot at a time to save RAM
+        self.workers = workers
+        self.rss_budget_mb = rss_budget_mb
 
     def run(self):
         if not self.settings_dict["enabled"]:
@@ -35,73 +62,122 @@ class Plotters(Process):
 
         configure_worker_logging(self.log_queue)
         self.logger = logging.getLogger(__name__)
-        self.logger.info("Plotters Manager started. PID: %d", getpid())
-
-        # processes=1: Do one plot at a time to save RAM
-        # maxtasksperchild=1: KILL the process after 1 task to prevent OOM
-        with Pool(
-            processes=1,
-            maxtasksperchild=1,
-            initializer=init_worker,
-            initargs=(self.log_queue,),
-        ) as pool:
-            drain_start_time = None
-            writer_finished = False
-
-            while True:
+        self.logger.info(
+            "Plotters Manager started with %d worker(s), %d MB RSS budget. PID: %d",
+            self.workers,
+            self.rss_budget_mb,
+            getpid(),
+        )
+
+        self.task_queues = [Queue() for _ in range(self.workers)]
+        self.worker_processes = [self._start_worker(q) for q in self.task_queues]
+        self._stopping = False
+
+        drain_start_time = None
+        writer_finished = False
+
+        while True:
+            try:
+                self._replace_stopped_workers()
+
+                # Check for a task (1s timeout to keep loop responsive)
                 try:
-                    # Check for a task (1s timeout to keep loop responsive)
-                    try:
-                        task = self.plot_queue.get(timeout=1.0)
-                    except Empty:
-                        task = "EMPTY"
-
-                    # Handle Writer Shutdown Sentinel (None)
-                    if task is None:
-                        self.logger.info(
-                            "Writer finished signal received. Draining for 10s..."
-                        )
-                        writer_finished = True
+                    task = self.plot_queue.get(timeout=1.0)
+                except Empty:
+                    task = "EMPTY"
+
+                # Handle Writer Shutdown Sentinel (None)
+                if task is None:
+                    self.logger.info(
+                        "Writer finished signal received. Draining for 10s..."
+                    )
+                    writer_finished = True
+                    drain_start_time = time.time()
+                    continue
+
+                # Handle actual plot tasks
+                if isinstance(task, dict):
+                    worker = zlib.crc32(str(task["plot_path"]).encode()) % self.workers
+                    self.task_queues[worker].put(task)
+
+                # Case A: Writer sent 'None', wait 10s for final data to clear
+                if writer_finished:
+                    if (
+                        time.time() - drain_start_time
+                        > self.settings_dict["shutdown_timeout"]
+                    ):
+                        self.logger.info("Grace period complete. Stopping workers.")
+                        break
+
+                # Case B: Global shutdown event (Ctrl+C), fallback timer
+                elif self.shutdown_event.is_set():
+                    if drain_start_time is None:
                         drain_start_time = time.time()
-                        continue
-
-                    # Handle actual plot tasks
-                    if isinstance(task, dict):
-                        pool.apply_async(
-                            render_dayplot_worker,
-                            args=(task, self.settings_dict),
-                            callback=self.logger.info,  # Logs the success string from worker
+                        self.logger.warning(
+                            "Global shutdown. Waiting 10s for writer cleanup..."
                         )
 
-                    # Case A: Writer sent 'None', wait 10s for final data to clear
-                    if writer_finished:
-                        if (
-                            time.time() - drain_start_time
-                            > self.settings_dict["shutdown_timeout"]
-                        ):
-                            self.logger.info("Grace period complete. Closing Pool.")
-                            break
-
-                    # Case B: Global shutdown event (Ctrl+C), fallback timer
-                    elif self.shutdown_event.is_set():
-                        if drain_start_time is None:
-                            drain_start_time = time.time()
-                            self.logger.warning(
-                                "Global shutdown. Waiting 10s for writer cleanup..."
-                            )
-
-                        if (
-                            time.time() - drain_start_time
-                            > self.settings_dict["shutdown_timeout"]
-                        ):
-                            self.logger.info("Safety timeout reached. Force closing.")
-                            break
-
-                except Exception:
-                    self.logger.exception("Error in Plotters manager loop")
-
-            # Finalize the pool
-            pool.close()
-            pool.join()
+                    if (
+                        time.time() - drain_start_time
+                        > self.settings_dict["shutdown_timeout"]
+                    ):
+                        self.logger.info("Safety timeout reached. Force closing.")
+                        break
 
+            except Exception:
+                self.logger.exception("Error in Plotters manager loop")
+
+        self._stop_workers()
         self.logger.info("Plotters process stopped.")
+
+    def _start_worker(self, task_queue: Queue) -> Process:
+        worker = Process(
+            target=plot_worker,
+            args=(task_queue, self.settings_dict, self.log_queue, self.rss_budget_mb),
+            name="PlotWorker",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _replace_stopped_workers(self):
+        """Start a fresh worker for every one that recycled itself or crashed."""
+        for i, worker in enumerate(self.worker_processes):
+            # Exit code 0: stopped by a sentinel, on shutdown
+            if worker.is_alive() or worker.exitcode == 0:
+                continue
+
+            worker.join()
+            if worker.exitcode != RECYCLE_EXIT_CODE:
+                self.logger.error(
+                    "Plot worker %d died with exit code %s, restarting it",
+                    worker.pid,
+                    worker.exitcode,
+                )
+                # Its queue may be unusable (lock held, message half read)
+                self.task_queues[i] = Queue()
+                if self._stopping:
+                    self.task_queues[i].put(None)
+
+            # A recycled worker left its queue intact, tasks and sentinel included
+            self.worker_processes[i] = self._start_worker(self.task_queues[i])
+
+    def _stop_workers(self):
+        """Let the workers finish the queued tasks, then stop them."""
+        # The sentinels are queued after the tasks, so these are plotted first
+        self._stopping = True
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+
+        deadline = time.time() + self.settings_dict["shutdown_timeout"]
+        while time.time() < deadline:
+            self._replace_stopped_workers()
+            if not any(worker.is_alive() for worker in self.worker_processes):
+                break
+            time.sleep(0.1)
+
+        for worker in self.worker_processes:
+            if worker.is_alive():
+                self.logger.warning("Plot worker %d did not stop, terminating it", worker.pid)
+                worker.terminate()
+            worker.join()
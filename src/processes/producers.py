@@ -5,6 +5,7 @@ from pathlib import Path
 from rpi_seism_common.settings import Settings
 
 from src.logger import configure_worker_logging
+from src.tuning import Tuning
 
 
 class Producers(Process):
@@ -16,7 +17,8 @@ class Producers(Process):
         trigger_event: Event,
         plot_queue: Queue,
         zmq_addr: str,
-        log_queue: Queue
+        log_queue: Queue,
+        tuning: Tuning,
     ):
         # CRITICAL: Call super constructor
         super().__init__(name="ProducersProcess")
@@ -27,6 +29,7 @@ class Producers(Process):
         self.plot_queue = plot_queue
         self.zmq_addr = zmq_addr
         self.log_queue = log_queue
+        self.tuning = tuning
 
     def run(self):
         from src.threads.producers import MSeedWriter, TriggerProcessor, WebSocketSender
@@ -46,6 +49,7 @@ class Producers(Process):
             self.trigger_event,
             self.plot_queue,
             self.zmq_addr,
+            **self.tuning.writer.kwargs(),
         )
         jobs.append(writer_job)
 
@@ -55,7 +59,11 @@ class Producers(Process):
         jobs.append(trigger_job)
 
         websocket_job = WebSocketSender(
-            self.settings, self.shutdown_event, self.trigger_event, self.zmq_addr
+            self.settings,
+            self.shutdown_event,
+            self.trigger_event,
+            self.zmq_addr,
+            **self.tuning.websocket.kwargs(),
         )
         jobs.append(websocket_job)
 
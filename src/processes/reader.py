@@ -3,12 +3,14 @@ import logging
 from multiprocessing import Event, Process, Queue
 from os import getpid
 
+import numpy as np
 import serial
 import zmq
 from rpi_seism_common.settings import Settings
 
 from src.exception.mcu_no_response import MCUNoResponse
 from src.logger import configure_worker_logging
+from src.structs.hub_message import HubMessage, channel_layout
 from src.structs.mcu_settings import MCUSettingsFrame
 from src.structs.sample import Sample
 from src.utils.soh_tracker import SOHTracker
@@ -25,7 +27,10 @@ class Reader(Process):
         settings: Settings,
         shutdown_event: Event,
         zmq_endpoint: str,
-        log_queue: Queue
+        log_queue: Queue,
+        read_latency_sec: float = 0.02,
+        block_max_samples: int = 1,
+        block_max_latency_sec: float = 0.05,
     ):
         super().__init__(name="ReaderProcess")
         self.port = settings.jobs_settings.reader.port
@@ -43,8 +48,32 @@ class Reader(Process):
         self.connection_timeout = 2.0
         self.last_heartbeat = 0
         self.last_soh_update = 0
-
-        self.channels = self.__map_channels()
+        self.sequence = 0
+
+        # Blocking reads sized to the packet rate: each read returns as soon as
+        # `read_size` bytes (about `read_latency_sec` worth of packets) arrived,
+        # or after `read_timeout` so the re-poke and SOH checks keep running
+        # when the line goes quiet. The process sleeps in between.
+        packets_per_read = max(
+            1, round(self.settings.mcu.sampling_rate * read_latency_sec)
+        )
+        self.read_size = packets_per_read * Sample.PACKET_SIZE
+        self.read_timeout = max(
+            2 * packets_per_read / self.settings.mcu.sampling_rate, 0.01
+        )
+
+        # Rows of the published sample arrays, in hub message order
+        self.channels = channel_layout(settings)
+
+        # Micro-batching: samples are coalesced into one hub message until
+        # `block_max_samples` are pending or the oldest one has waited
+        # `block_max_latency_sec`. The default of 1 publishes every sample
+        # as soon as it is decoded.
+        self.block_max_samples = max(1, block_max_samples)
+        self.block_max_latency_sec = block_max_latency_sec
+        self._pending_blocks: list[np.ndarray] = []
+        self._pending_count = 0
+        self._pending_time = 0.0
 
     def run(self):
         configure_worker_logging(self.log_queue)
@@ -59,7 +88,9 @@ class Reader(Process):
         self.pub_socket.bind(self.zmq_endpoint)
 
         try:
-            with serial.Serial(self.port, self.baudrate, timeout=0.1) as ser:
+            with serial.Serial(
+                self.port, self.baudrate, timeout=self.read_timeout
+            ) as ser:
                 self.logger.info("Connected to RS-422 on %s at %d", self.port, self.baudrate)
 
                 if not self._sendSettings(ser, is_initial_connect=True):
@@ -78,40 +109,50 @@ class Reader(Process):
                         self._sendSettings(ser)
                         self.last_packet_time = time.time()
 
-                    # read available data
-                    if ser.in_waiting > 0:
-                        buffer.extend(ser.read(ser.in_waiting))
-
-                    # process buffer for packets
-                    while len(buffer) >= Sample.PACKET_SIZE:
-                        # Look for headers 0xAA 0xBB
-                        if buffer[0] == 0xAA and buffer[1] == 0xBB:
-                            packet_data = buffer[: Sample.PACKET_SIZE]
-
-                            sample, checksum = Sample.from_bytes(packet_data)
-                            if checksum:
-                                self.last_packet_time = time.time()
-                                self._process_packet(sample)
-                                self.soh_tracker.record_success()
-                                del buffer[
-                                    : Sample.PACKET_SIZE
-                                ]  # Remove processed packet
-                            else:
-                                self.logger.warning("Checksum failed, shifting buffer")
-                                self.soh_tracker.record_checksum_error()
-                                self.soh_tracker.record_dropped_bytes(1)
-                                del buffer[0]  # Slide window to find next header
-                        else:
-                            # Not a header, discard byte and keep looking
-                            self.soh_tracker.record_dropped_bytes(1)
-                            del buffer[0]
+                    # Block until a chunk arrives (or the timeout expires),
+                    # taking anything extra that is already waiting
+                    buffer.extend(ser.read(max(ser.in_waiting, self.read_size)))
+
+                    # decode every complete packet in the buffer at once
+                    batch = Sample.decode_batch(buffer)
+
+                    if batch.checksum_errors:
+                        self.logger.warning(
+                            "Checksum failed on %d packet(s), resynchronising",
+                            batch.checksum_errors,
+                        )
+                        self.soh_tracker.record_checksum_error(batch.checksum_errors)
+                    if batch.dropped_bytes:
+                        self.soh_tracker.record_dropped_bytes(batch.dropped_bytes)
+
+                    if len(batch.packets):
+                        self.last_packet_time = time.time()
+                        self.soh_tracker.record_success(len(batch.packets))
+                        self._publish_packets(batch.packets)
+
+                    # Remove processed packets and discarded bytes in one go
+                    del buffer[: batch.consumed]
+
+                    # Don't let a partial block wait longer than the latency budget
+                    if (
+                        self._pending_blocks
+                        and time.time() - self._pending_time >= self.block_max_latency_sec
+                    ):
+                        self._flush_pending()
 
                     if time.time() - self.last_soh_update > 5.0:
                         soh_stats = self.soh_tracker.get_snapshot()
-                        # Send on a specific ZMQ topic or a different socket
-                        self.pub_socket.send_pyobj({"type": "SOH", "data": soh_stats})
+                        # SOH carries the sequence number of the last data message
+                        message = HubMessage.soh_message(
+                            self.sequence, time.time(), soh_stats
+                        )
+                        self.pub_socket.send_multipart(message.to_frames())
                         self.last_soh_update = time.time()
 
+                # Don't lose the samples of a partial block on shutdown
+                if self._pending_blocks:
+                    self._flush_pending()
+
         except Exception:
             self.logger.exception("RS-422 Reader exception")
         finally:
@@ -121,14 +162,48 @@ class Reader(Process):
             self.pub_socket.close()
             context.term()
 
-    def _process_packet(self, data: Sample):
-        timestamp = time.time()
-        packet = data.to_dict(timestamp, self.channels)
-
-        self.pub_socket.send_pyobj(packet)
-
-    def __map_channels(self):
-        return {i.adc_channel: i for i in self.settings.channels}
+    def _publish_packets(self, packets: np.ndarray):
+        """Queue decoded packets for publishing, one row per channel."""
+        samples = np.stack([packets[f"ch{ch.adc_channel}"] for ch in self.channels])
+
+        if not self._pending_blocks:
+            self._pending_time = time.time()
+
+        self._pending_blocks.append(samples)
+        self._pending_count += samples.shape[1]
+
+        if self._pending_count >= self.block_max_samples:
+            self._flush_pending(full_blocks_only=True)
+
+    def _flush_pending(self, full_blocks_only: bool = False):
+        """
+        Publish the pending samples in blocks of block_max_samples.
+        With full_blocks_only, a trailing partial block stays pending.
+        """
+        samples = np.concatenate(self._pending_blocks, axis=1)
+        period = 1.0 / self.settings.mcu.sampling_rate
+
+        end = samples.shape[1]
+        if full_blocks_only:
+            end -= end % self.block_max_samples
+
+        for start in range(0, end, self.block_max_samples):
+            self._process_packet(
+                samples[:, start : start + self.block_max_samples],
+                self._pending_time + start * period,
+            )
+
+        self._pending_blocks.clear()
+        self._pending_count = samples.shape[1] - end
+        if self._pending_count:
+            self._pending_blocks.append(samples[:, end:])
+            self._pending_time += end * period
+
+    def _process_packet(self, samples: np.ndarray, timestamp: float):
+        # One message per block, all channels included
+        self.sequence += 1
+        message = HubMessage.data_message(self.sequence, timestamp, samples)
+        self.pub_socket.send_multipart(message.to_frames())
 
     def _sendSettings(self, ser: serial.Serial, is_initial_connect: bool = False):
         if is_initial_connect:
@@ -154,17 +229,16 @@ class Reader(Process):
         start_time = time.time()
 
         while (time.time() - start_time) < 10:
-            if ser.in_waiting >= MCUSettingsFrame.PACKET_SIZE:
-                # Check for header alignment
-                potential_header = ser.read(1)
-                if potential_header == b"\xcc":
-                    next_byte = ser.read(1)
-                    if next_byte == b"\xdd":
-                        # We found the start! Read the remaining bytes (MCUSettingsFrame.PACKET_SIZE - 2)
-                        remaining = ser.read(MCUSettingsFrame.PACKET_SIZE - 2)
-                        response = potential_header + next_byte + remaining
-                        break
-                # If not header, continue loop to effectively "drain" garbage bytes
+            # Blocking read: returns empty after the read timeout
+            potential_header = ser.read(1)
+            if potential_header == b"\xcc":
+                next_byte = ser.read(1)
+                if next_byte == b"\xdd":
+                    # We found the start! Read the remaining bytes (MCUSettingsFrame.PACKET_SIZE - 2)
+                    remaining = ser.read(MCUSettingsFrame.PACKET_SIZE - 2)
+                    response = potential_header + next_byte + remaining
+                    break
+            # If not header, continue loop to effectively "drain" garbage bytes
 
         # Verify
         if not response:
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from enum import IntEnum
+import json
+import struct
+
+import numpy as np
+from rpi_seism_common.settings import Settings
+from rpi_seism_common.settings.channel import Channel
+
+
+# ZMQ topics (prefix-matched by libzmq on the first frame)
+DATA_TOPIC = "data"
+SOH_TOPIC = "soh"
+
+
+class HubMessageType(IntEnum):
+    DATA = 1
+    SOH = 2
+
+
+def channel_layout(settings: Settings) -> list[Channel]:
+    """
+    Order of the channel rows in a DATA message.
+
+    Channel metadata never travels on the socket: the Reader and every
+    subscriber derive the same layout from the shared settings.
+    """
+    return sorted(settings.channels, key=lambda ch: ch.adc_channel)
+
+
+@dataclass
+class HubMessage:
+    """
+    Binary message published on the ZMQ hub.
+
+    Sent as a three-frame multipart message:
+        1. topic: 'data' or 'soh', so subscribers filter inside libzmq
+        2. fixed header (version, type, channel count, sample count,
+           sequence number, timestamp of the first sample)
+        3. payload: raw little-endian int32 samples, channel-major
+           (one contiguous row per channel) for DATA, JSON for SOH
+
+    A block of all channels travels as a single message: one message per
+    channel would multiply the hub traffic by the channel count, for the
+    benefit of the TriggerProcessor alone. On receive, the DATA payload is
+    exposed as a zero-copy NumPy view.
+    """
+
+    message_type: HubMessageType
+    sequence: int
+    timestamp: float
+    channel_count: int = 0
+    sample_count: int = 0
+    data: np.ndarray | None = None  # shape (channel_count, sample_count)
+    soh: dict | None = None
+
+    VERSION = 3
+    # version, type, channel count, sample count, sequence, timestamp
+    HEADER_FORMAT = "<BBHIQd"
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    SAMPLE_DTYPE = np.dtype("<i4")
+
+    @classmethod
+    def data_message(
+        cls, sequence: int, timestamp: float, samples: np.ndarray
+    ) -> "HubMessage":
+        """Build a DATA message from a (channel_count, sample_count) array."""
+        samples = np.ascontiguousarray(samples, dtype=cls.SAMPLE_DTYPE)
+        if samples.ndim != 2:
+            raise ValueError("samples must be a (channel_count, sample_count) array.")
+
+        return cls(
+            HubMessageType.DATA,
+            sequence,
+            timestamp,
+            channel_count=samples.shape[0],
+            sample_count=samples.shape[1],
+            data=samples,
+        )
+
+    @classmethod
+    def soh_message(cls, sequence: int, timestamp: float, snapshot: dict) -> "HubMessage":
+        """Build an SOH message carrying a SOHTracker snapshot."""
+        return cls(HubMessageType.SOH, sequence, timestamp, soh=snapshot)
+
+    @classmethod
+    def from_frames(cls, frames: list) -> "HubMessage":
+        """Parse the frames returned by recv_multipart()."""
+        if len(frames) != 3:
+            raise ValueError(f"Expected 3 frames, got {len(frames)}.")
+
+        _topic, header, payload = frames
+        (
+            version,
+            message_type,
+            channel_count,
+            sample_count,
+            sequence,
+            timestamp,
+        ) = struct.unpack(cls.HEADER_FORMAT, header)
+
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported hub message version {version}.")
+
+        message_type = HubMessageType(message_type)
+
+        if message_type == HubMessageType.SOH:
+            return cls(message_type, sequence, timestamp, soh=json.loads(bytes(payload)))
+
+        data = np.frombuffer(payload, dtype=cls.SAMPLE_DTYPE)
+        if len(data) != channel_count * sample_count:
+            raise ValueError("Payload size does not match the header.")
+
+        return cls(
+            message_type,
+            sequence,
+            timestamp,
+            channel_count=channel_count,
+            sample_count=sample_count,
+            data=data.reshape(channel_count, sample_count),
+        )
+
+    @property
+    def topic(self) -> str:
+        if self.message_type == HubMessageType.SOH:
+            return SOH_TOPIC
+        return DATA_TOPIC
+
+    def to_frames(self) -> list:
+        """Frames to pass to send_multipart()."""
+        header = struct.pack(
+            self.HEADER_FORMAT,
+            self.VERSION,
+            self.message_type,
+            self.channel_count,
+            self.sample_count,
+            self.sequence,
+            self.timestamp,
+        )
+        topic = self.topic.encode("ascii")
+
+        if self.message_type == HubMessageType.SOH:
+            return [topic, header, json.dumps(self.soh).encode("utf-8")]
+
+        return [topic, header, self.data]
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+
+@dataclass(frozen=True)
+class Notification:
+    """
+    A message for the NotificationDispatcher.
+
+    `kind` and `trigger_time` (the start of the trigger that caused it, in
+    epoch seconds) identify it: a notification with the same pair as one
+    already delivered (or being delivered) to a target is dropped, so a
+    trigger that stays on, or is noticed twice, is only reported once.
+    """
+
+    kind: str  # e.g. "alert" or "report"
+    trigger_time: float
+    title: str
+    body: str
+    attachment: bytes | None = None
+    attachment_name: str | None = None
+    mimetype: str | None = None
+
+    @property
+    def key(self) -> tuple[str, float]:
+        return (self.kind, self.trigger_time)
+
+    @property
+    def trigger(self) -> str:
+        """The trigger start as an ISO 8601 UTC string, for the logs."""
+        return datetime.fromtimestamp(self.trigger_time, UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
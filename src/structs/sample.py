@@ -1,10 +1,30 @@
-from typing import Dict
+from typing import NamedTuple
 from dataclasses import dataclass
 import struct
 
 from binascii import crc32
 
-from rpi_seism_common.settings.channel import Channel
+import numpy as np
+
+
+def _crc32_table() -> np.ndarray:
+    """Lookup table for the reflected CRC-32 polynomial used by binascii.crc32."""
+    table = np.arange(256, dtype=np.uint32)
+    for _ in range(8):
+        table = np.where(table & 1, (table >> 1) ^ np.uint32(0xEDB88320), table >> 1)
+    return table.astype(np.uint32)
+
+
+_CRC32_TABLE = _crc32_table()
+
+
+class DecodedBatch(NamedTuple):
+    """Result of decoding a chunk of the serial stream."""
+
+    packets: np.ndarray  # Structured array with Sample.PACKET_DTYPE
+    consumed: int  # Bytes that can be removed from the front of the buffer
+    dropped_bytes: int  # Bytes discarded while searching for headers
+    checksum_errors: int  # Headers whose CRC did not match
 
 
 @dataclass
@@ -20,6 +40,18 @@ class Sample:
     PACKET_FORMAT = "<BBiiiI"
     PACKET_SIZE = struct.calcsize(PACKET_FORMAT)
 
+    # The same layout as a NumPy structured dtype, for batch decoding
+    PACKET_DTYPE = np.dtype(
+        [
+            ("header_1", "u1"),
+            ("header_2", "u1"),
+            ("ch0", "<i4"),
+            ("ch1", "<i4"),
+            ("ch2", "<i4"),
+            ("crc", "<u4"),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, data: bytes):
         """
@@ -38,6 +70,81 @@ class Sample:
         # Verify checksum
         return sample, sample.verify_checksum(data)
 
+    @classmethod
+    def decode_batch(cls, data: bytes | bytearray) -> DecodedBatch:
+        """
+        Locate, validate and decode every packet in a chunk of the serial stream.
+
+        Gives the same result as scanning the buffer byte by byte (accept a
+        packet on a valid header + CRC, otherwise drop one byte and retry),
+        but all header positions and CRCs are evaluated at once with NumPy,
+        so the cost stays linear even when the line is noisy.
+        The trailing bytes that may still belong to an incomplete packet are
+        not consumed.
+        """
+        raw = np.frombuffer(data, dtype=np.uint8)
+        n = len(raw)
+        size = cls.PACKET_SIZE
+
+        if n < size:
+            return DecodedBatch(np.empty(0, dtype=cls.PACKET_DTYPE), 0, 0, 0)
+
+        # Every position that can hold a full packet and starts with 0xAA 0xBB
+        last_start = n - size
+        candidates = np.flatnonzero(
+            (raw[: last_start + 1] == 0xAA) & (raw[1 : last_start + 2] == 0xBB)
+        )
+
+        # Gather the candidate packets as rows and check all CRCs at once
+        rows = raw[candidates[:, None] + np.arange(size)]
+        valid = cls._crc32_rows(rows[:, :-4]) == rows[:, -4:].copy().view("<u4")[:, 0]
+
+        # A valid packet is only accepted if it does not overlap the previously
+        # accepted one. Valid packets from a healthy stream never overlap, so
+        # the greedy walk is only needed for pathological inputs.
+        starts = candidates[valid]
+        if len(starts) > 1 and np.any(np.diff(starts) < size):
+            accepted = []
+            next_free = 0
+            for start in starts.tolist():
+                if start >= next_free:
+                    accepted.append(start)
+                    next_free = start + size
+            keep = np.isin(starts, accepted)
+            starts = starts[keep]
+            rows_valid = rows[valid][keep]
+        else:
+            rows_valid = rows[valid]
+
+        # Everything up to the last position that was scanned is consumed
+        consumed = last_start + 1
+        if len(starts):
+            consumed = max(consumed, int(starts[-1]) + size)
+
+        # Invalid headers hidden inside an accepted packet are never scanned
+        bad = candidates[~valid]
+        if len(starts) and len(bad):
+            owner = np.searchsorted(starts, bad, side="right") - 1
+            inside = (owner >= 0) & (bad < starts[np.maximum(owner, 0)] + size)
+            bad = bad[~inside]
+
+        packets = np.ascontiguousarray(rows_valid).view(cls.PACKET_DTYPE)[:, 0]
+
+        return DecodedBatch(
+            packets=packets,
+            consumed=consumed,
+            dropped_bytes=consumed - len(starts) * size,
+            checksum_errors=len(bad),
+        )
+
+    @staticmethod
+    def _crc32_rows(rows: np.ndarray) -> np.ndarray:
+        """CRC32 of every row of a (n, k) uint8 array, equal to binascii.crc32."""
+        crc = np.full(len(rows), 0xFFFFFFFF, dtype=np.uint32)
+        for column in rows.T:
+            crc = _CRC32_TABLE[(crc ^ column) & 0xFF] ^ (crc >> 8)
+        return crc ^ np.uint32(0xFFFFFFFF)
+
     def to_bytes(self):
         """
         Convert the Sample instance to bytes for transmission or storage.
@@ -62,14 +169,3 @@ class Sample:
         calculated_crc = crc32(payload) & 0xFFFFFFFF
 
         return calculated_crc == transmitted_crc
-
-    def to_dict(self, timestamp: int, channels: Dict[int, Channel]):
-        return {
-            "type": "packet",
-            "timestamp": timestamp,
-            "measurements": [
-                {"channel": channels.get(0), "value": self.ch0},
-                {"channel": channels.get(1), "value": self.ch1},
-                {"channel": channels.get(2), "value": self.ch2}
-            ]
-        }
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+
+# (channel, freqmin, freqmax, decimation factor)
+ProductKey = tuple[str, float, float, int]
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """
+    What a WebSocket client receives: the decimated output of `channels`
+    after a `freqmin`-`freqmax` Hz bandpass.
+
+    Clients with equal subscriptions share the same products and the same
+    serialized messages.
+    """
+
+    channels: tuple[str, ...]
+    freqmin: float
+    freqmax: float
+    decimation: int
+
+    def product_key(self, channel: str) -> ProductKey:
+        return (channel, self.freqmin, self.freqmax, self.decimation)
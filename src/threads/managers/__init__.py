@@ -1,3 +1,5 @@
 from .notifier_sender import NotifierSender
 from .ringserver_sender import RingServerSender
-from .bookmark_generator import BookmarkGenerator
\ No newline at end of file
+from .bookmark_generator import BookmarkGenerator
+from .notification_dispatcher import NotificationDispatcher
+from .datalink_target import DataLinkTarget
@@ -0,0 +1,306 @@
+import queue
+import time
+from logging import getLogger
+from pathlib import Path
+from threading import Event, Thread
+
+from datalink_client import DataLink, DataLinkError
+
+from src.utils.record_spool import RecordSpool, SpooledRecord
+
+logger = getLogger(__name__)
+
+
+class DataLinkTarget(Thread):
+    """
+    Thread that sends encoded MiniSEED records to one DataLink server.
+
+    The RingServerSender encodes every record once and hands it to each
+    target with put(), which never blocks: every target has its own
+    connection, queue and backlog, so a slow or unreachable server only
+    delays itself.
+
+    Each burst of records ends with an acknowledged write, so a record only
+    counts as sent once the server has confirmed it. With a `spool_dir`,
+    records that cannot be sent are appended to a RecordSpool (at most
+    `spool_max_bytes`, oldest evicted first, synced to the storage every
+    `spool_sync_sec`) and replayed after reconnecting at up to
+    `replay_records_per_sec`, interleaved with the live records so these
+    are never held back. The backlog depth is logged
+    every BACKLOG_LOG_INTERVAL_SEC while it is not empty. Without a spool,
+    up to `max_pending_records` records are kept in memory instead.
+    Reconnections are attempted every `reconnect_interval_sec`.
+    """
+
+    BACKLOG_LOG_INTERVAL_SEC = 60
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        stream_prefix: str,
+        client_id: str,
+        max_pending_records: int = 10000,
+        reconnect_interval_sec: float = 5.0,
+        stats_interval_sec: float = 3600.0,
+        spool_dir: Path | None = None,
+        spool_max_bytes: int = 256 * 1024 * 1024,
+        spool_segment_bytes: int = 4 * 1024 * 1024,
+        spool_sync_sec: float = 5.0,
+        replay_records_per_sec: float = 100.0,
+        timeout_sec: float = 10.0,
+    ):
+        super().__init__(daemon=True, name=f"datalink-{host}:{port}")
+        if replay_records_per_sec <= 0:
+            raise ValueError("replay_records_per_sec must be positive.")
+
+        self.host = host
+        self.port = port
+        self.stream_prefix = stream_prefix  # e.g. "XX_STA_00_"
+        self.client_id = client_id
+        self.reconnect_interval_sec = reconnect_interval_sec
+        self.stats_interval_sec = stats_interval_sec
+        self.replay_records_per_sec = replay_records_per_sec
+        self.timeout_sec = timeout_sec
+
+        # Live records handed over by the sender, and those being sent
+        self._queue: queue.Queue[SpooledRecord] = queue.Queue(max_pending_records)
+        self._pending: list[SpooledRecord] = []
+        self._max_pending = max_pending_records
+        self._last_connect_attempt = 0.0
+        self._stopping = Event()
+
+        self._spool = (
+            RecordSpool(spool_dir, spool_segment_bytes, spool_max_bytes, spool_sync_sec)
+            if spool_dir is not None
+            else None
+        )
+        self._spooling = False  # Spilling live records during an outage
+        self._replay_allowance = 0.0
+        self._last_replay = time.monotonic()
+        self._replay_started: float | None = None
+        self._last_backlog_log = 0.0
+
+        # Statistics, logged every stats_interval_sec
+        self.records_sent = 0
+        self.records_replayed = 0
+        self.records_dropped = 0
+
+        self.client = None
+
+    def __str__(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def backlog(self) -> int:
+        """Records waiting in the spool."""
+        return len(self._spool) if self._spool is not None else 0
+
+    def put(self, record: SpooledRecord):
+        """Queue a live record. Thread-safe, never blocks."""
+        while True:
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                # Only when the worker is stuck: make room, oldest first
+                try:
+                    self._queue.get_nowait()
+                    self.records_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def stop(self, timeout: float | None = None):
+        """Send or spool what is queued, then stop the thread."""
+        self._stopping.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        next_stats_time = time.time() + self.stats_interval_sec
+
+        while not self._stopping.is_set():
+            try:
+                # Ensure Connection
+                if self.client is None or not self.client.is_connected:
+                    self._attempt_connection()
+
+                self._take(timeout=0.1)
+                self._send_pending()
+                self._replay_spool()
+                self._log_backlog()
+            except Exception:
+                logger.exception("Error in the DataLink loop of %s", self)
+                time.sleep(1)
+
+            now = time.time()
+            if now >= next_stats_time:
+                self._log_stats()
+                next_stats_time = now + self.stats_interval_sec
+
+        self._take(timeout=0)
+        self._send_pending()
+        if self._spool is not None:
+            self._spool.close()
+        if self.client:
+            self.client.close()
+
+    def _take(self, timeout: float):
+        """Move the queued records to the pending list, waiting up to `timeout` for one."""
+        try:
+            if timeout:
+                self._pending.append(self._queue.get(timeout=timeout))
+            while True:
+                self._pending.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if len(self._pending) > self._max_pending:
+            # Unreachable without a spool: keep the newest records
+            self.records_dropped += len(self._pending) - self._max_pending
+            del self._pending[: -self._max_pending]
+
+    def _attempt_connection(self):
+        now = time.monotonic()
+        if now - self._last_connect_attempt < self.reconnect_interval_sec:
+            return
+        self._last_connect_attempt = now
+
+        try:
+            # Create client (host, port)
+            self.client = DataLink(self.host, self.port, timeout=self.timeout_sec)
+            self.client.connect()
+
+            # Identify is crucial for Ringserver to accept the stream
+            server_id = self.client.identify(clientid=self.client_id)
+            logger.info("Connected to Ringserver %s: %s", self, server_id)
+        except Exception as e:
+            logger.error("DataLink connection to %s failed: %s", self, e)
+            if self.client is not None:
+                self.client.close()
+            self.client = None
+            return
+
+        self._spooling = False
+        if self.backlog:
+            logger.info(
+                "Replaying a backlog of %d records (%d bytes) to %s at %.0f records/s",
+                self.backlog,
+                self._spool.nbytes,
+                self,
+                self.replay_records_per_sec,
+            )
+            self._replay_started = time.monotonic()
+
+    def _send_pending(self):
+        """Send the live records, or spool them if the server is unreachable."""
+        if not self._pending:
+            return
+
+        if self.client is not None and self.client.is_connected:
+            try:
+                self._write(self._pending)
+            except (DataLinkError, OSError) as e:
+                self._disconnect(e)
+            else:
+                self.records_sent += len(self._pending)
+                self._pending.clear()
+                return
+
+        if self._spool is None:
+            return  # Kept in memory, up to max_pending_records
+
+        if not self._spooling:
+            logger.warning(
+                "Ringserver %s unreachable, spooling records to %s", self, self._spool.directory
+            )
+            self._spooling = True
+        for record in self._pending:
+            self._spool.append(record.channel, record.start_us, record.end_us, record.data)
+        self._spool.flush()
+        self._pending.clear()
+
+    def _replay_spool(self):
+        """Send the oldest spooled records, at most replay_records_per_sec."""
+        now = time.monotonic()
+        elapsed, self._last_replay = now - self._last_replay, now
+        if not self.backlog or self.client is None or not self.client.is_connected:
+            return
+
+        # Token bucket holding at most one second of records
+        self._replay_allowance = min(
+            self._replay_allowance + elapsed * self.replay_records_per_sec,
+            self.replay_records_per_sec,
+        )
+        count = int(self._replay_allowance)
+        if count < 1:
+            return
+
+        records = self._spool.peek(count)
+        try:
+            self._write(records)
+        except (DataLinkError, OSError) as e:
+            self._disconnect(e)
+            return
+
+        self._spool.commit()
+        self._replay_allowance -= len(records)
+        self.records_replayed += len(records)
+
+        if not self.backlog and self._replay_started is not None:
+            logger.info("Backlog of %s replayed in %.1f s", self, now - self._replay_started)
+            self._replay_started = None
+
+    def _write(self, records: list[SpooledRecord]):
+        """Send records in one network burst, acknowledged by the server."""
+        try:
+            with self.client.batch(max_bytes=64 * 1024):
+                for i, record in enumerate(records):
+                    # The last write waits for the server: TCP keeps the order,
+                    # so its OK acknowledges the whole burst
+                    self.client.write(
+                        f"{self.stream_prefix}{record.channel}/MSEED",
+                        record.start_us,
+                        record.end_us,
+                        record.data,
+                        ack=i == len(records) - 1,
+                    )
+        except (DataLinkError, OSError):
+            raise
+        except Exception as e:
+            # Anything else (e.g. a client library mismatch) is handled like
+            # a failed send, so the records are kept or spooled, not lost
+            logger.exception("Unexpected error while writing to Ringserver %s", self)
+            raise DataLinkError(f"Unexpected write error: {e!r}") from e
+
+    def _disconnect(self, error: Exception):
+        logger.error("Send to Ringserver %s failed: %s", self, error)
+        self.client.close()
+        self.client = None
+
+    def _log_backlog(self):
+        if not self.backlog:
+            return
+        now = time.monotonic()
+        if now - self._last_backlog_log >= self.BACKLOG_LOG_INTERVAL_SEC:
+            logger.info(
+                "Ringserver %s backlog: %d records (%d bytes) spooled, %d evicted",
+                self,
+                self.backlog,
+                self._spool.nbytes,
+                self._spool.evicted,
+            )
+            self._last_backlog_log = now
+
+    def _log_stats(self):
+        logger.info(
+            "Ringserver %s: %d records sent, %d replayed, %d dropped, %d backlog",
+            self,
+            self.records_sent,
+            self.records_replayed,
+            self.records_dropped,
+            self.backlog,
+        )
+        self.records_sent = 0
+        self.records_replayed = 0
+        self.records_dropped = 0
@@ -0,0 +1,229 @@
+import asyncio
+import queue
+import time
+from collections import OrderedDict
+from logging import getLogger
+from threading import Event, Thread
+
+from apprise import Apprise, NotifyFormat
+from apprise.attachment.memory import AttachMemory
+
+from src.structs.notification import Notification
+
+logger = getLogger(__name__)
+
+
+class NotificationDispatcher(Thread):
+    """
+    Thread that delivers notifications to the Apprise targets with Apprise's
+    asyncio API.
+
+    submit() only puts the notification on a bounded queue (at most
+    INBOX_SIZE waiting, further ones are dropped), so the caller is never
+    blocked by the network; without any target nothing is queued. Every
+    target has its own asyncio queue and
+    delivery task: a slow or unreachable target delays only its own
+    notifications, and each target receives them in submission order (the
+    alert before the report of the same event).
+
+    A failed delivery (rejected by Apprise, or an exception such as a
+    network error) is retried up to `max_retries` times with exponential
+    backoff (`backoff_sec`, doubled on every attempt, at most
+    `max_backoff_sec`). A notification whose (kind, trigger start) pair
+    has already been queued for a target is not sent to it again.
+    """
+
+    # Notifications remembered per target for deduplication
+    DEDUP_SIZE = 256
+    # Notifications waiting to be handed to the targets
+    INBOX_SIZE = 64
+    # Longest wait for a notification before checking for shutdown
+    INBOX_TIMEOUT_SEC = 1.0
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_retries: int = 3,
+        backoff_sec: float = 2.0,
+        max_backoff_sec: float = 60.0,
+        drain_timeout_sec: float = 10.0,
+    ):
+        super().__init__(daemon=True, name="notification-dispatcher")
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative.")
+        if backoff_sec <= 0 or max_backoff_sec < backoff_sec:
+            raise ValueError("backoff_sec must be positive and at most max_backoff_sec.")
+
+        self.max_retries = max_retries
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.drain_timeout_sec = drain_timeout_sec
+
+        # One Apprise instance per target, so targets are delivered independently
+        self.targets: dict[str, Apprise] = {}
+        # Notification URLs embed tokens: log the scheme and position only
+        self.labels: dict[str, str] = {}
+        for index, url in enumerate(urls):
+            label = f"{url.split('://', 1)[0]} #{index}"
+            notifier = Apprise()
+            if notifier.add(url):
+                self.targets[url] = notifier
+                self.labels[url] = label
+            else:
+                logger.error("Ignoring invalid notification URL (%s)", label)
+
+        # None is the wake-up sentinel queued by stop()
+        self._inbox: queue.Queue[Notification | None] = queue.Queue(self.INBOX_SIZE)
+        self._stopping = Event()
+
+    def submit(self, notification: Notification):
+        """Queue a notification for every target. Thread-safe, never blocks."""
+        if not self.targets:
+            return
+
+        if self._stopping.is_set():
+            logger.warning(
+                "Dispatcher stopped, dropping %s for the trigger at %s",
+                notification.kind,
+                notification.trigger,
+            )
+            return
+
+        try:
+            self._inbox.put_nowait(notification)
+        except queue.Full:
+            logger.warning(
+                "Notification queue full, dropping %s for the trigger at %s",
+                notification.kind,
+                notification.trigger,
+            )
+
+    def stop(self, timeout: float | None = None):
+        """Deliver what is queued (up to drain_timeout_sec), then stop the thread."""
+        self._stopping.set()
+        try:
+            self._inbox.put_nowait(None)  # Wake the thread up
+        except queue.Full:
+            pass  # Busy draining, it checks the flag after each notification
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        if not self.targets:
+            logger.info("No notification targets configured.")
+            return
+
+        logger.info("Notification dispatcher started with %d target(s).", len(self.targets))
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        queues = {url: asyncio.Queue() for url in self.targets}
+        seen = {url: OrderedDict() for url in self.targets}
+        tasks = [
+            asyncio.create_task(self._deliver_loop(url, queues[url])) for url in self.targets
+        ]
+
+        while not (self._stopping.is_set() and self._inbox.empty()):
+            try:
+                # Block in a worker thread, so the deliveries keep running
+                notification = await asyncio.to_thread(
+                    self._inbox.get, timeout=self.INBOX_TIMEOUT_SEC
+                )
+            except queue.Empty:
+                continue
+            if notification is None:
+                continue
+
+            for url, target_queue in queues.items():
+                if notification.key in seen[url]:
+                    logger.debug(
+                        "Skipping duplicate %s for the trigger at %s",
+                        notification.kind,
+                        notification.trigger,
+                    )
+                    continue
+                seen[url][notification.key] = None
+                if len(seen[url]) > self.DEDUP_SIZE:
+                    seen[url].popitem(last=False)
+                target_queue.put_nowait(notification)
+
+        # Give the queued notifications a bounded time to go out
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(target_queue.join() for target_queue in queues.values())),
+                self.drain_timeout_sec,
+            )
+        except TimeoutError:
+            pending = sum(target_queue.qsize() for target_queue in queues.values())
+            logger.warning("Dropping %d undelivered notification(s) on shutdown", pending)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _deliver_loop(self, url: str, target_queue: asyncio.Queue):
+        """Deliver the notifications of one target, in order."""
+        while True:
+            notification = await target_queue.get()
+            try:
+                await self._deliver(url, notification)
+            except Exception:
+                logger.exception("Error delivering %s to %s", notification.kind, self.labels[url])
+            finally:
+                target_queue.task_done()
+
+    async def _deliver(self, url: str, notification: Notification):
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            attach = None
+            if notification.attachment is not None:
+                attach = AttachMemory(
+                    content=notification.attachment,
+                    name=notification.attachment_name,
+                    mimetype=notification.mimetype,
+                )
+
+            error = None
+            try:
+                delivered = await self.targets[url].async_notify(
+                    title=notification.title,
+                    body=notification.body,
+                    attach=attach,
+                    body_format=NotifyFormat.MARKDOWN,
+                )
+            except Exception as e:
+                # e.g. a network error: retried like a rejected delivery
+                delivered, error = False, e
+            if delivered:
+                logger.info(
+                    "Sent %s for the trigger at %s to %s in %.2f s (attempt %d)",
+                    notification.kind,
+                    notification.trigger,
+                    self.labels[url],
+                    time.perf_counter() - started,
+                    attempt + 1,
+                )
+                return
+
+            if attempt >= self.max_retries:
+                logger.error(
+                    "Giving up on %s for the trigger at %s to %s after %d attempts",
+                    notification.kind,
+                    notification.trigger,
+                    self.labels[url],
+                    attempt + 1,
+                    exc_info=error,
+                )
+                return
+
+            delay = min(self.backoff_sec * 2**attempt, self.max_backoff_sec)
+            attempt += 1
+            logger.warning(
+                "Failed to send %s to %s (%s), retrying in %.1f s",
+                notification.kind,
+                self.labels[url],
+                error if error is not None else "not delivered",
+                delay,
+            )
+            await asyncio.sleep(delay)
@@ -1,74 +1,158 @@
 import time
-from collections import deque
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from logging import getLogger
 from multiprocessing import Event
 from os import getpid
 from threading import Thread
 
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import zmq
-from apprise import Apprise, NotifyFormat
-from apprise.attachment.memory import AttachMemory
 from plotly.subplots import make_subplots
 from rpi_seism_common.settings import Settings
 
+from src.structs.hub_message import DATA_TOPIC, HubMessage, channel_layout
+from src.structs.notification import Notification
+from src.threads.managers.notification_dispatcher import NotificationDispatcher
+from src.utils.downsample import lttb_downsample, minmax_downsample
+from src.utils.ring_buffer import RingBuffer
+
 logger = getLogger(__name__)
 
 
 class NotifierSender(Thread):
+    """
+    Thread that sends push notifications through Apprise when the trigger
+    fires: an immediate text alert, then a report with the waveforms of the
+    60 s before and the 60 s after the trigger.
+
+    Samples are kept in per-channel NumPy ring buffers that are fed for the
+    whole post-event window, so the ZMQ subscription is drained all the
+    time. Once the window is complete the buffers are snapshotted, and the
+    report is rendered by a worker thread, so it never slows down the
+    consumption of the hub.
+
+    Alerts and reports are handed to a NotificationDispatcher, which
+    delivers them to every target concurrently with retries, so a slow or
+    unreachable target neither blocks this thread nor delays the others.
+    Both carry the start of their trigger (the time of the newest sample
+    received when the earthquake event was set), which the dispatcher uses
+    to never send the same notification twice; a trigger that stays on
+    after its report is not reported again.
+
+    To keep attachments small, each trace is reduced to at most
+    `max_points_per_trace` points ("minmax", which keeps every peak, or
+    "lttb"; None disables it). The report is an HTML page loading Plotly
+    from its CDN (`plotly_js=True` embeds the library for offline viewing),
+    or a static PNG rendered with matplotlib (`report_format="png"`).
+    """
+
+    REPORT_FORMATS = ("html", "png")
+    DOWNSAMPLERS = {"minmax": minmax_downsample, "lttb": lttb_downsample}
+
     def __init__(
         self,
         settings: Settings,
         shutdown_event: Event,
         earthquake_event: Event,
         zmq_endpoint: str = "ipc:///tmp/seismic_data.ipc",
+        report_format: str = "html",
+        max_points_per_trace: int | None = 4000,
+        downsample_method: str | None = "minmax",
+        plotly_js: str | bool = "cdn",
+        max_retries: int = 3,
+        retry_backoff_sec: float = 2.0,
     ):
         super().__init__()
+        if report_format not in self.REPORT_FORMATS:
+            raise ValueError(
+                f"report_format must be one of {self.REPORT_FORMATS}, got {report_format!r}."
+            )
+        if downsample_method is not None and downsample_method not in self.DOWNSAMPLERS:
+            raise ValueError(f"Unknown downsample_method {downsample_method!r}.")
+
+        self.report_format = report_format
+        self.max_points_per_trace = max_points_per_trace
+        self.downsample_method = downsample_method
+        self.plotly_js = plotly_js
         self.settings = settings
         self.earthquake_event = earthquake_event
         self.shutdown_event = shutdown_event
         self.zmq_endpoint = zmq_endpoint
 
-        self.notifier = Apprise()
+        self.channel_names = [ch.name for ch in channel_layout(settings)]
+
+        self.dispatcher = NotificationDispatcher(
+            [i.url for i in self.settings.jobs_settings.notifiers if i.enabled and i.url],
+            max_retries=max_retries,
+            backoff_sec=retry_backoff_sec,
+        )
         self.last_notification = 0
+        # Start of the current trigger and of the last one reported
+        self._trigger_time: float | None = None
+        self._reported_trigger_time: float | None = None
+        self._last_sample_time: float | None = None
 
-        self.points_per_window = self.settings.mcu.sampling_rate * 60
+        self.points_per_window = int(self.settings.mcu.sampling_rate * 60)
         self.total_capacity = self.points_per_window * 2
-        self.buffer = deque(maxlen=self.total_capacity)
+
+        # Rolling per-channel sample buffers plus the time of each sample
+        self.times = {
+            ch_name: RingBuffer(self.total_capacity, dtype=np.float64)
+            for ch_name in self.channel_names
+        }
+        self.buffer = {
+            ch_name: RingBuffer(self.total_capacity, dtype=np.int32)
+            for ch_name in self.channel_names
+        }
+
+        # Samples still expected before the report of
+        # the current event is generated (None when no event is collected)
+        self._post_event_remaining: int | None = None
+
+        # Network and rendering work, off the ZMQ loop
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notifier")
 
     def run(self):
         logger.info("Notifier Sender started. PID: %d", getpid())
-        self._initialize_notifier()
+        self.dispatcher.start()
 
         context = zmq.Context()
         sub_socket = context.socket(zmq.SUB)
         sub_socket.connect(self.zmq_endpoint)
-        sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")  # Receive everything
+        sub_socket.setsockopt_string(zmq.SUBSCRIBE, DATA_TOPIC)  # No SOH
 
         sub_socket.setsockopt(zmq.RCVTIMEO, 100)  # 100ms timeout
 
         while not self.shutdown_event.is_set():
             try:
                 try:
-                    packet = sub_socket.recv_pyobj()
-                    if packet.get("type") == "packet":
-                        self.buffer.append(packet)
+                    message = HubMessage.from_frames(sub_socket.recv_multipart())
+                    self._append_block(message)
                 except zmq.Again:
                     pass  # Timeout reached, just check events
 
-                # Check for trigger (with 30s cooldown)
-                if self.earthquake_event.is_set() and (
-                    time.time() - self.last_notification > 30
+                triggered = self.earthquake_event.is_set()
+                if triggered and self._trigger_time is None:
+                    # Data time of the trigger start, wall clock before any data
+                    self._trigger_time = self._last_sample_time or time.time()
+                elif not triggered:
+                    self._trigger_time = None
+
+                # Check for a new trigger (with 30s cooldown)
+                if (
+                    self._post_event_remaining is None
+                    and triggered
+                    and self._trigger_time != self._reported_trigger_time
+                    and time.time() - self.last_notification > 30
                 ):
-                    self.notifier.notify(
-                        title="⚠️ Earthquake Alert",
-                        body="Significant seismic activity detected!",
-                        body_format=NotifyFormat.MARKDOWN,
-                    )
+                    self._reported_trigger_time = self._trigger_time
+                    self._send_alert()
                     logger.info("Triggered! Collecting 60s post-event data...")
+                    self._post_event_remaining = self.points_per_window
+
+                if self._post_event_remaining is not None and self._post_event_remaining <= 0:
                     self._handle_event()
                     self.last_notification = time.time()
 
@@ -77,42 +161,87 @@ class NotifierSender(Thread):
 
         sub_socket.close()
         context.term()
+        self._worker.shutdown(wait=True, cancel_futures=True)
+        self.dispatcher.stop()
+
+    def _append_block(self, message: HubMessage):
+        """Append every sample of a DATA message to the rolling buffers."""
+        period = 1.0 / self.settings.mcu.sampling_rate
+        times = message.timestamp + np.arange(message.sample_count) * period
+        for ch_name, values in zip(self.channel_names, message.data):
+            self.times[ch_name].extend(times)
+            self.buffer[ch_name].extend(values)
+        if len(times):
+            self._last_sample_time = float(times[-1])
+
+        if self._post_event_remaining is not None:
+            self._post_event_remaining -= message.sample_count
 
     def _handle_event(self):
-        """Waits for post-event data, generates graph, and sends."""
-        # Record how many more samples we need to finish the 'after' window
-        # (Already have 60s in buffer, need 60s more)
-        received = 0
+        """Snapshot the 120 s window and hand the report over to the worker."""
+        self._post_event_remaining = None
 
-        while received < self.points_per_window and not self.shutdown_event.is_set():
-            try:
-                data = self.queue.get(timeout=1.0)
-                self.buffer.append(data)
-                received += 1
-            except Exception:
-                continue
-
-        # Generate and Send
-        graph_bytes = self._generate_plotly_graph()
-        self._send_notification(graph_bytes)
-
-    def _generate_plotly_graph(self) -> BytesIO:
-        """Parses buffer into DataFrame and creates a multi-channel Plotly graph."""
-        # Flatten the complex dict structure into a list for Pandas
-        rows = []
-        for packet in self.buffer:
-            ts = packet["timestamp"]
-            for m in packet["measurements"]:
-                rows.append(
-                    {
-                        "time": datetime.fromtimestamp(ts),
-                        "channel": m["channel"].name,  # e.g., "Channel Z"
-                        "value": m["value"],
-                    }
-                )
-
-        df = pd.DataFrame(rows)
-        channels = df["channel"].unique()
+        # Copies: the ring buffers keep being fed while the report is rendered
+        snapshot = {
+            ch_name: (self.times[ch_name].view().copy(), self.buffer[ch_name].view().copy())
+            for ch_name in self.channel_names
+            if len(self.buffer[ch_name])
+        }
+        self._worker.submit(self._send_report, self._reported_trigger_time, snapshot)
+
+    def _send_report(
+        self, trigger_time: float, snapshot: dict[str, tuple[np.ndarray, np.ndarray]]
+    ):
+        """Worker: render the event report and queue it for delivery."""
+        try:
+            started = time.perf_counter()
+            points = sum(len(values) for _, values in snapshot.values())
+            snapshot = self._downsample(snapshot)
+
+            if self.report_format == "png":
+                report, mimetype = self._generate_png(snapshot), "image/png"
+            else:
+                report, mimetype = self._generate_plotly_graph(snapshot), "text/html"
+
+            logger.info(
+                "Event report %s: %d bytes, %d of %d points, generated in %.2f s",
+                report.name,
+                len(report.getvalue()),
+                sum(len(values) for _, values in snapshot.values()),
+                points,
+                time.perf_counter() - started,
+            )
+            self._send_notification(trigger_time, report, mimetype)
+        except Exception:
+            logger.exception("Failed to generate the event report")
+
+    def _downsample(self, snapshot):
+        """Reduce every trace to at most max_points_per_trace points."""
+        if self.downsample_method is None or not self.max_points_per_trace:
+            return snapshot
+
+        downsample = self.DOWNSAMPLERS[self.downsample_method]
+        return {
+            ch_name: downsample(times, values, self.max_points_per_trace)
+            for ch_name, (times, values) in snapshot.items()
+        }
+
+    def _send_alert(self):
+        """Queue the immediate text alert."""
+        self.dispatcher.submit(
+            Notification(
+                kind="alert",
+                trigger_time=self._reported_trigger_time,
+                title="⚠️ Earthquake Alert",
+                body="Significant seismic activity detected!",
+            )
+        )
+
+    def _generate_plotly_graph(
+        self, snapshot: dict[str, tuple[np.ndarray, np.ndarray]]
+    ) -> BytesIO:
+        """Creates a multi-channel Plotly graph from a snapshot of the buffers."""
+        channels = [ch_name for ch_name in self.channel_names if ch_name in snapshot]
 
         # Create subplots (one for each axis/channel)
         fig = make_subplots(
@@ -120,40 +249,66 @@ class NotifierSender(Thread):
         )
 
         for i, ch in enumerate(channels, 1):
-            ch_data = df[df["channel"] == ch]
-            fig.add_trace(
-                go.Scatter(x=ch_data["time"], y=ch_data["value"], name=ch), row=i, col=1
-            )
+            times, values = snapshot[ch]
+            # Epoch seconds to UTC datetimes, vectorised
+            times = (times * 1e6).astype("datetime64[us]")
+            fig.add_trace(go.Scatter(x=times, y=values, name=ch), row=i, col=1)
 
         fig.update_layout(
             height=200 * len(channels), title_text="Seismic Event Detail (120s)"
         )
 
-        # Return as PNG image bytes
-        html = fig.to_html()
+        # The Plotly library is ~3.5 MB: load it from the CDN by default
+        html = fig.to_html(include_plotlyjs=self.plotly_js)
 
         traces_bytes = BytesIO()
         traces_bytes.write(html.encode("utf-8"))
         traces_bytes.seek(0)
-        traces_bytes.name = "trace.html"
+        traces_bytes.name = "report.html"
 
         return traces_bytes
 
-    def _send_notification(self, image_stream):
-        """Sends the notification with the attached graph."""
-        # Apprise allows attaching file streams
-        self.notifier.notify(
-            title="⚠️ Earthquake Alert",
-            body="Seismic activity exceeded threshold. See attached waveform.",
-            attach=AttachMemory(
-                content=image_stream.getvalue(),
-                name="report.html",
-                mimetype="text/html",
-            ),
-            body_format=NotifyFormat.MARKDOWN,
+    def _generate_png(self, snapshot: dict[str, tuple[np.ndarray, np.ndarray]]) -> BytesIO:
+        """Static alternative to the Plotly report, for chat-style targets."""
+        # Imported here: only needed when PNG reports are enabled
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        channels = [ch_name for ch_name in self.channel_names if ch_name in snapshot]
+        fig, axes = plt.subplots(
+            len(channels), 1, sharex=True, figsize=(10, 2 * len(channels)), squeeze=False
         )
 
-    def _initialize_notifier(self):
-        for i in self.settings.jobs_settings.notifiers:
-            if i.enabled:
-                self.notifier.add(i.url)
+        for ax, ch in zip(axes[:, 0], channels):
+            times, values = snapshot[ch]
+            ax.plot((times * 1e6).astype("datetime64[us]"), values, linewidth=0.6)
+            ax.set_ylabel(ch)
+
+        axes[0, 0].set_title("Seismic Event Detail (120s, UTC)")
+        fig.tight_layout()
+
+        image = BytesIO()
+        fig.savefig(image, format="png", dpi=100)
+        plt.close(fig)
+        image.seek(0)
+        image.name = "report.png"
+
+        return image
+
+    def _send_notification(
+        self, trigger_time: float, report: BytesIO, mimetype: str = "text/html"
+    ):
+        """Queue the notification with the attached report."""
+        self.dispatcher.submit(
+            Notification(
+                kind="report",
+                trigger_time=trigger_time,
+                title="⚠️ Earthquake Alert",
+                body="Seismic activity exceeded threshold. See attached waveform.",
+                attachment=report.getvalue(),
+                attachment_name=report.name,
+                mimetype=mimetype,
+            )
+        )
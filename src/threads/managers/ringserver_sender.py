@@ -1,159 +1,227 @@
 import time
-from io import BytesIO
 from logging import getLogger
 from multiprocessing import Event
 from os import getpid
+from pathlib import Path
 from threading import Thread
 
-import numpy as np
 import zmq
-from datalink_client import DataLink, DataLinkError
-from obspy import Trace, UTCDateTime
+from obspy import UTCDateTime
 from rpi_seism_common.settings import Settings
 
+from src.structs.hub_message import DATA_TOPIC, HubMessage, channel_layout
+from src.threads.managers.datalink_target import DataLinkTarget
+from src.utils.mseed_encoder import MiniSeedRecord, MiniSeedRecordEncoder
+from src.utils.record_spool import SpooledRecord
+
 logger = getLogger(__name__)
 
 
+def parse_targets(hosts: str, default_port: int) -> list[tuple[str, int]]:
+    """
+    DataLink servers from the ring_server host setting: a comma-separated
+    list of "host" or "host:port" entries, e.g. "localhost, example.org:18000".
+    IPv6 addresses are written in brackets: "[::1]" or "[::1]:18000".
+    """
+    targets = []
+    for entry in hosts.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if entry.startswith("["):
+            host, bracket, rest = entry[1:].partition("]")
+            if not bracket or (rest and not rest.startswith(":")):
+                raise ValueError(f"Invalid RingServer host {entry!r}.")
+            port = rest[1:]
+        elif entry.count(":") > 1:
+            raise ValueError(
+                f"RingServer host {entry!r}: write IPv6 addresses as [address] or [address]:port."
+            )
+        else:
+            host, _, port = entry.partition(":")
+        targets.append((host, int(port) if port else default_port))
+
+    if not targets:
+        raise ValueError("No RingServer host configured.")
+    return targets
+
+
 class RingServerSender(Thread):
+    """
+    Thread that streams the hub data to one or more RingServers over
+    DataLink.
+
+    Every wake-up drains the ZMQ socket in batches of up to `batch_size`
+    messages, without sleeping in between, so it keeps up with any sample
+    rate and absorbs bursts. Each channel has a persistent
+    MiniSeedRecordEncoder: complete 512-byte records are handed over as
+    soon as they fill, and a channel whose oldest unsent sample is older
+    than `write_interval_sec` is flushed as a partial record, which bounds
+    the latency at low rates.
+
+    The `ring_server.host` setting may list several servers (see
+    parse_targets()). Records are encoded once and the same bytes are put
+    on the queue of every DataLinkTarget, each with its own connection,
+    send thread and backlog (spooled to SPOOL_DIR/<host>_<port>), so a slow
+    or unreachable server does not delay the others.
+    """
+
     def __init__(
         self,
         settings: Settings,
         shutdown_event: Event,
         zmq_endpoint: str = "ipc:///tmp/seismic_data.ipc",
+        batch_size: int = 500,
+        max_pending_records: int = 10000,
+        reconnect_interval_sec: float = 5.0,
+        stats_interval_sec: float = 3600.0,
+        spool_dir: Path | None = None,
+        spool_max_bytes: int = 256 * 1024 * 1024,
+        spool_segment_bytes: int = 4 * 1024 * 1024,
+        spool_sync_sec: float = 5.0,
+        replay_records_per_sec: float = 100.0,
+        timeout_sec: float = 10.0,
     ):
         super().__init__(daemon=True)
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+
         self.settings = settings
         self.shutdown_event = shutdown_event
         self.zmq_endpoint = zmq_endpoint
+        self.batch_size = batch_size
+        self.stats_interval_sec = stats_interval_sec
 
         self.ring_server_settings = self.settings.jobs_settings.ring_server
         self.write_interval_sec = self.ring_server_settings.write_interval_sec
 
-        self._buffer: dict[str, list] = {}
-        self._start_time: float | None = None
+        station = self.settings.station
+        self.targets = [
+            DataLinkTarget(
+                host,
+                port,
+                stream_prefix=f"{station.network}_{station.station}_{station.location_code}_",
+                client_id=f"{station.station}_{station.station}",
+                max_pending_records=max_pending_records,
+                reconnect_interval_sec=reconnect_interval_sec,
+                stats_interval_sec=stats_interval_sec,
+                spool_dir=spool_dir / f"{host}_{port}" if spool_dir is not None else None,
+                spool_max_bytes=spool_max_bytes,
+                spool_segment_bytes=spool_segment_bytes,
+                spool_sync_sec=spool_sync_sec,
+                replay_records_per_sec=replay_records_per_sec,
+                timeout_sec=timeout_sec,
+            )
+            for host, port in parse_targets(
+                self.ring_server_settings.host, self.ring_server_settings.port
+            )
+        ]
+
+        self.channel_names = [ch.name for ch in channel_layout(settings)]
+        self._encoders: dict[str, MiniSeedRecordEncoder] = {}
 
-        self.client = None
+        # Statistics, logged every stats_interval_sec
+        self.messages_received = 0
+        self.records_encoded = 0
 
     def run(self):
-        logger.info("RingServer sender started. PID: %d", getpid())
-        next_write_time = time.time() + self.write_interval_sec
+        logger.info(
+            "RingServer sender started, sending to %s. PID: %d",
+            ", ".join(str(target) for target in self.targets),
+            getpid(),
+        )
+        next_stats_time = time.time() + self.stats_interval_sec
+
+        for target in self.targets:
+            target.start()
 
         context = zmq.Context()
         sub_socket = context.socket(zmq.SUB)
         sub_socket.connect(self.zmq_endpoint)
-        sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")
-        sub_socket.setsockopt(zmq.RCVTIMEO, 100)
+        sub_socket.setsockopt_string(zmq.SUBSCRIBE, DATA_TOPIC)
 
         while not self.shutdown_event.is_set():
-            now = time.time()
+            # Wait for data, then empty the socket
+            if sub_socket.poll(100):
+                self._drain(sub_socket)
 
-            # Ensure Connection
-            if self.client is None or not self.client.is_connected:
-                self._attempt_connection()
+            self._flush_stale()
 
-            # Consume Queue
-            try:
-                packet = sub_socket.recv_pyobj()
-
-                if packet.get("type") != "packet":
-                    continue
-
-                if not self._buffer:
-                    self._start_time = packet["timestamp"]
-
-                for item in packet["measurements"]:
-                    ch_name = item["channel"].name
-                    self._buffer.setdefault(ch_name, []).append(item["value"])
-            except zmq.Again:
-                # No more data in the ZMQ socket for now
-                pass
-
-            # Periodic flush
-            if now >= next_write_time:
-                self._flush()
-                next_write_time = now + self.write_interval_sec
-
-            time.sleep(0.01)
+            now = time.time()
+            if now >= next_stats_time:
+                self._log_stats()
+                next_stats_time = now + self.stats_interval_sec
 
         self._flush()
-        if self.client:
-            self.client.close()
+        for target in self.targets:
+            target.stop()
 
         sub_socket.close()
         context.term()
 
-    def _attempt_connection(self):
-        try:
-            # Create client (host, port)
-            self.client = DataLink(
-                self.ring_server_settings.host, self.ring_server_settings.port
-            )
-            self.client.connect()
+    def _drain(self, sub_socket: zmq.Socket):
+        """Receive up to batch_size queued messages and encode them."""
+        for _ in range(self.batch_size):
+            try:
+                frames = sub_socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
 
-            # Identify is crucial for Ringserver to accept the stream
-            server_id = self.client.identify(
-                clientid=f"{self.settings.station.station}_{self.settings.station.station}"
+            try:
+                message = HubMessage.from_frames(frames)
+            except ValueError as e:
+                logger.warning("Dropping malformed hub message: %s", e)
+                continue
+
+            self.messages_received += 1
+            start = UTCDateTime(message.timestamp)
+            for ch_name, values in zip(self.channel_names, message.data):
+                records = self._get_encoder(ch_name).feed(start, values)
+                self._dispatch(ch_name, records)
+
+    def _get_encoder(self, ch_name: str) -> MiniSeedRecordEncoder:
+        if ch_name not in self._encoders:
+            self._encoders[ch_name] = MiniSeedRecordEncoder(
+                self.settings.station.network,
+                self.settings.station.station,
+                self.settings.station.location_code,
+                ch_name,
+                self.settings.mcu.sampling_rate,
+            )
+        return self._encoders[ch_name]
+
+    def _dispatch(self, ch_name: str, records: list[MiniSeedRecord]):
+        """Hand every record, encoded once, to all the targets."""
+        for record in records:
+            # DataLink 1.1 uses microseconds for timestamps
+            spooled = SpooledRecord(
+                ch_name,
+                int(record.starttime.timestamp * 1_000_000),
+                int(record.endtime.timestamp * 1_000_000),
+                record.data,
             )
-            logger.info("Connected to Ringserver: %s", server_id)
-        except Exception as e:
-            logger.error("DataLink connection failed: %s", e)
-            self.client = None
+            for target in self.targets:
+                target.put(spooled)
+        self.records_encoded += len(records)
+
+    def _flush_stale(self):
+        """Send partial records of channels holding samples older than write_interval_sec."""
+        limit = UTCDateTime(time.time() - self.write_interval_sec)
+        for ch_name, encoder in self._encoders.items():
+            start = encoder.pending_start
+            if start is not None and start < limit:
+                self._dispatch(ch_name, encoder.flush())
 
     def _flush(self):
-        if not self.client or not self.client.is_connected:
-            return
-        if not self._buffer or self._start_time is None:
-            return
-
-        # Explicitly define metadata to avoid NameError
-        net = self.settings.station.network
-        sta = self.settings.station.station
-        loc = self.settings.station.location_code
-        rate = self.settings.mcu.sampling_rate
-        start_utc = UTCDateTime(self._start_time)
-
-        try:
-            # Use the batch context manager from your source code
-            # This sends all channels in one network burst
-            with self.client.batch():
-                for ch, values in self._buffer.items():
-                    if not values:
-                        continue
-
-                    # Create MiniSEED
-                    trace = Trace(data=np.array(values, dtype=np.int32))
-                    trace.stats.update(
-                        {
-                            "network": net,
-                            "station": sta,
-                            "location": loc,
-                            "channel": ch,
-                            "starttime": start_utc,
-                            "sampling_rate": rate,
-                        }
-                    )
-
-                    buf = BytesIO()
-                    trace.write(buf, format="MSEED", reclen=512)
-                    mseed_data = buf.getvalue()
-
-                    # DataLink 1.1 uses microseconds for timestamps
-                    # The library's write() actually takes ints/strings
-                    # but converts them if needed.
-                    # Based on your source, we pass them as microseconds:
-                    start_us = int(trace.stats.starttime.timestamp * 1_000_000)
-                    end_us = int(trace.stats.endtime.timestamp * 1_000_000)
-
-                    stream_id = f"{net}_{sta}_{loc}_{ch}/MSEED"
-
-                    self.client.write(stream_id, start_us, end_us, mseed_data)
-
-            logger.info(f"Flushed {len(self._buffer)} channels to Ringserver")
-
-        except (DataLinkError, OSError) as e:
-            logger.error(f"Flush failed: {e}")
-            self.client.close()
-            self.client = None
-        finally:
-            self._buffer.clear()
-            self._start_time = None
+        """Pack every pending sample (on shutdown)."""
+        for ch_name, encoder in self._encoders.items():
+            self._dispatch(ch_name, encoder.flush())
+
+    def _log_stats(self):
+        logger.info(
+            "RingServer: %d messages received, %d records encoded",
+            self.messages_received,
+            self.records_encoded,
+        )
+        self.messages_received = 0
+        self.records_encoded = 0
@@ -1,3 +1,4 @@
+import os
 import time
 from logging import getLogger
 from multiprocessing import Event, Queue
@@ -8,9 +9,13 @@ from threading import Thread
 
 import numpy as np
 import zmq
-from obspy import Stream, Trace, UTCDateTime
+from obspy import UTCDateTime
 from rpi_seism_common.settings import Settings
 
+from src.structs.hub_message import DATA_TOPIC, HubMessage, channel_layout
+from src.utils.mseed_encoder import MiniSeedRecord, MiniSeedRecordEncoder
+from src.utils.sample_buffer import SampleBuffer
+from src.utils.sample_journal import SampleJournal
 from src.utils.writer_utils import sds_path, split_buffer_at_midnight
 
 logger = getLogger(__name__)
@@ -24,14 +29,41 @@ class MSeedWriter(Thread):
     Files are written to:
         OUTPUT_DIR/YEAR/NET/STA/CHAN.D/NET.STA.LOC.CHAN.D.YEAR.DAY
 
-    Each write interval flushes the buffer and appends to the current day
-    file(s). If the buffer spans midnight, it is split and written to the
-    correct day files automatically.
+    Each write interval flushes the buffer through a persistent per-channel
+    Steim2 encoder and appends the complete records to the current day
+    file(s). The samples of a record that is not full yet are carried over
+    to the next flush, and only packed into a partial record at the end of
+    a day or on shutdown. If the buffer spans midnight, it is split and
+    written to the correct day files automatically.
 
     Earthquake events trigger an early flush after 5 minutes so that the
     event waveform is persisted quickly, then the regular schedule resumes.
+
+    In continuous mode (`continuous=True`) every hub block is fed to the
+    encoders as soon as it arrives and each record is appended to its day
+    file the moment it is complete, so the archive lags by about one record
+    instead of a full write interval. Day files stay open between writes,
+    and `fsync_policy` bounds how often they are synced to the SD card:
+        - "none": leave write-back to the OS
+        - "record": fsync after every append
+        - "interval": fsync at most every `fsync_interval_sec` seconds
+          (and when a file is closed)
+    Day plots are then requested at most every `plot_interval_sec` per file.
+    Bytes, records and fsyncs written are logged every hour.
+
+    In interval mode, every received block is also appended to a write-ahead
+    journal (OUTPUT_DIR/journal, see SampleJournal) that is synced every
+    `journal_sync_sec` and reset after each flush, once the day files are
+    synced (even with `fsync_policy="none"`), keeping only the samples the
+    encoders still carry. Whatever is left in the journal on startup
+    (a crash, a power cut or a killed process) is replayed into the archive
+    before new data is processed, so long write intervals do not put the
+    buffered samples at risk.
     """
 
+    FSYNC_POLICIES = ("none", "record", "interval")
+    STATS_INTERVAL_SEC = 3600
+
     def __init__(
         self,
         settings: Settings,
@@ -40,9 +72,28 @@ class MSeedWriter(Thread):
         earthquake_event: Event,
         plot_queue: Queue,
         zmq_endpoint: str = "ipc:///tmp/seismic_data.ipc",
+        record_length: int = 512,
+        continuous: bool = False,
+        fsync_policy: str = "interval",
+        fsync_interval_sec: float = 30.0,
+        plot_interval_sec: float = 600.0,
+        journal: bool = True,
+        journal_sync_sec: float = 5.0,
+        journal_segment_bytes: int = 8 * 1024 * 1024,
     ):
         super().__init__()
+        if fsync_policy not in self.FSYNC_POLICIES:
+            raise ValueError(
+                f"fsync_policy must be one of {self.FSYNC_POLICIES}, got {fsync_policy!r}."
+            )
+
         self.settings = settings
+        self.record_length = record_length
+        self.continuous = continuous
+        self.fsync_policy = fsync_policy
+        self.fsync_interval_sec = fsync_interval_sec
+        self.plot_interval_sec = plot_interval_sec
+        self.journal_sync_sec = journal_sync_sec
         self.zmq_endpoint = zmq_endpoint
         self.output_dir = output_dir
         self.write_interval_sec = settings.jobs_settings.writer.write_interval_sec
@@ -54,20 +105,60 @@ class MSeedWriter(Thread):
             self.settings.mcu.sampling_rate * len(self.settings.channels) * 60
         ) * 5  # 5 minutes of data at 100 Hz for 3 channels
 
-        # { channel_name: [raw_int_value, ...] }
-        self._buffer: dict[str, list] = {}
+        self.channel_names = [ch.name for ch in channel_layout(settings)]
+
+        # { channel_name: SampleBuffer of raw int32 values }
+        # Preallocated for a full write interval, reused across flushes
+        self._buffer_capacity = int(
+            self.write_interval_sec * self.settings.mcu.sampling_rate
+        )
+        self._buffer: dict[str, SampleBuffer] = {}
+        self._encoders: dict[str, MiniSeedRecordEncoder] = {}
         self._start_time: float | None = None
         self._is_processing_event = False
+        self._last_sequence: int | None = None
+
+        # { channel_name: (path of the current day file, open handle) }
+        self._files: dict[str, tuple[Path, object]] = {}
+        self._unsynced: set[str] = set()
+        self._last_fsync = time.time()
+
+        # Rate-limited day plot requests: { data path: plot path }
+        self._pending_plots: dict[Path, Path] = {}
+        self._last_plot: dict[Path, float] = {}
+
+        # Write counters, logged and reset every STATS_INTERVAL_SEC
+        self.bytes_written = 0
+        self._stats_start = time.time()
+        self._stats = {"bytes": 0, "records": 0, "fsyncs": 0}
+
+        # Continuous mode writes records as they fill: nothing to journal
+        self._journal = (
+            SampleJournal(
+                output_dir / "journal",
+                journal_segment_bytes,
+                self.settings.mcu.sampling_rate,
+            )
+            if journal and not continuous
+            else None
+        )
+        self._last_journal_sync = time.time()
 
     def run(self):
-        logger.info("Mseed writer started. PID: %d", getpid())
+        logger.info(
+            "Mseed writer started (%s mode, fsync: %s). PID: %d",
+            "continuous" if self.continuous else "interval",
+            self.fsync_policy,
+            getpid(),
+        )
+        self._replay_journal()
         next_write_time = time.time() + self.write_interval_sec
 
         context = zmq.Context()
         sub_socket = context.socket(zmq.SUB)
         sub_socket.set(zmq.RCVHWM, self.queue_len)
         sub_socket.connect(self.zmq_endpoint)
-        sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")  # Receive everything
+        sub_socket.setsockopt_string(zmq.SUBSCRIBE, DATA_TOPIC)  # No SOH
 
         # This allows us to check shutdown_event and next_write_time
         sub_socket.setsockopt(zmq.RCVTIMEO, 100)  # 100ms timeout
@@ -76,17 +167,28 @@ class MSeedWriter(Thread):
             now = time.time()
 
             try:
-                # Receive one packet at a time
-                packet = sub_socket.recv_pyobj()
-
-                if packet.get("type") == "packet":
-                    ts = packet["timestamp"]
-                    if not self._buffer:
-                        self._start_time = ts
-
-                    for item in packet["measurements"]:
-                        ch_name = item["channel"].name
-                        self._buffer.setdefault(ch_name, []).append(item["value"])
+                # Receive one message at a time
+                message = HubMessage.from_frames(sub_socket.recv_multipart())
+                self._check_sequence(message.sequence)
+
+                if self.continuous:
+                    # Records are written as soon as they are complete
+                    start = UTCDateTime(message.timestamp)
+                    for ch_name, values in zip(self.channel_names, message.data):
+                        self._encode(ch_name, start, values)
+                else:
+                    if self._start_time is None:
+                        self._start_time = message.timestamp
+
+                    for ch_name, values in zip(self.channel_names, message.data):
+                        if ch_name not in self._buffer:
+                            self._buffer[ch_name] = SampleBuffer(self._buffer_capacity)
+                        self._buffer[ch_name].append(values)
+
+                    if self._journal is not None:
+                        self._journal.append(
+                            self.channel_names, message.timestamp, message.data
+                        )
 
             except zmq.Again:
                 # This exception is raised when RCVTIMEO is hit
@@ -96,109 +198,341 @@ class MSeedWriter(Thread):
 
             # Now these checks will actually execute!
 
-            # Earthquake early-flush trigger
-            if self.earthquake_event.is_set() and not self._is_processing_event:
-                next_write_time = now + 300
-                self._is_processing_event = True
-                logger.warning("Earthquake detected — scheduled flush in 5 min.")
-
-            # Scheduled write
-            if now >= next_write_time:
-                self._flush()
-                next_write_time = now + self.write_interval_sec
-                self._is_processing_event = False
-
-        # Final flush on shutdown
-        self._flush()
+            if self.continuous:
+                # Records are already on disk: make sure event data is synced
+                if self.earthquake_event.is_set() and not self._is_processing_event:
+                    self._is_processing_event = True
+                    self._sync_files()
+                elif not self.earthquake_event.is_set():
+                    self._is_processing_event = False
+
+                if (
+                    self.fsync_policy == "interval"
+                    and now - self._last_fsync >= self.fsync_interval_sec
+                ):
+                    self._sync_files()
+                self._request_plots(now)
+            else:
+                # Earthquake early-flush trigger
+                if self.earthquake_event.is_set() and not self._is_processing_event:
+                    next_write_time = now + 300
+                    self._is_processing_event = True
+                    logger.warning("Earthquake detected — scheduled flush in 5 min.")
+
+                # Scheduled write
+                if now >= next_write_time:
+                    self._flush()
+                    next_write_time = now + self.write_interval_sec
+                    self._is_processing_event = False
+
+                if (
+                    self._journal is not None
+                    and now - self._last_journal_sync >= self.journal_sync_sec
+                ):
+                    self._journal.sync()
+                    self._last_journal_sync = now
+
+            self._log_write_stats(now)
+
+        # Final flush on shutdown, including partial records
+        self._flush(final=True)
+        self._close_files()
+        if self._journal is not None:
+            self._journal.reset()
+        self._log_write_stats(time.time(), force=True)
         if self.settings.jobs_settings.dayplot.enabled:
             self.plot_queue.put(None)
         sub_socket.close()
         context.term()
 
-    def _flush(self):
+    def _check_sequence(self, sequence: int):
+        """Warn when the hub dropped messages (e.g. the HWM was reached)."""
+        if self._last_sequence is not None and sequence != self._last_sequence + 1:
+            logger.warning(
+                "Hub sequence gap: expected %d, got %d",
+                self._last_sequence + 1,
+                sequence,
+            )
+        self._last_sequence = sequence
+
+    def _flush(self, final: bool = False):
+        """
+        Encode buffered samples, append the complete records to SDS day
+        files and reset the buffer. Handles midnight splits transparently.
+        With `final`, the partial records carried by the encoders are
+        written too.
+        """
+        if self._start_time is not None:
+            logger.info(
+                "Flushing %d channel(s) to SDS archive%s...",
+                len(self._buffer),
+                " [EARTHQUAKE]" if self._is_processing_event else "",
+            )
+
+            start = UTCDateTime(self._start_time)
+
+            for ch_name, values in self._buffer.items():
+                if values:
+                    # values.view() is handed to the encoder without a copy
+                    self._encode(ch_name, start, values.view())
+
+            for values in self._buffer.values():
+                values.clear()
+            self._start_time = None
+
+        if final:
+            for ch_name, encoder in self._encoders.items():
+                self._write_records(ch_name, encoder.flush())
+
+        if not self.continuous:
+            # Nothing is written until the next interval: release the files
+            self._close_files()
+            self._reset_journal()
+
+    def _reset_journal(self):
         """
-        Write buffered samples to SDS day files and reset the buffer.
-        Handles midnight splits transparently.
+        Drop the archived samples from the journal, keeping only those the
+        encoders still carry for their next record.
         """
-        if not self._buffer or self._start_time is None:
+        if self._journal is None:
             return
 
-        logger.info(
-            "Flushing %d channel(s) to SDS archive%s...",
-            len(self._buffer),
-            " [EARTHQUAKE]" if self._is_processing_event else "",
-        )
+        self._journal.reset()
+        for ch_name, encoder in self._encoders.items():
+            if encoder.pending_count:
+                self._journal.append(
+                    [ch_name],
+                    encoder.pending_start.timestamp,
+                    encoder.pending_samples()[np.newaxis],
+                )
+        self._journal.sync()
+
+    def _replay_journal(self):
+        """Archive the samples journaled before an unclean shutdown."""
+        if self._journal is None:
+            return
 
-        start = UTCDateTime(self._start_time)
         sampling_rate = self.settings.mcu.sampling_rate
+        starts: dict[str, float] = {}
+        runs: dict[str, SampleBuffer] = {}
+        entries = recovered = 0
+
+        # Rebuild contiguous runs per channel, then encode each run at once
+        for ch_name, timestamp, samples in self._journal.replay():
+            entries += 1
+            recovered += len(samples)
+            run = runs.setdefault(ch_name, SampleBuffer(self._buffer_capacity))
+
+            if run:
+                expected = starts[ch_name] + len(run) / sampling_rate
+                if abs(timestamp - expected) > self._get_encoder(ch_name).time_tolerance:
+                    self._encode(ch_name, UTCDateTime(starts[ch_name]), run.view())
+                    run.clear()
+
+            if not run:
+                starts[ch_name] = timestamp
+            run.append(samples)
+
+        if not entries:
+            return
+
+        for ch_name, run in runs.items():
+            if run:
+                self._encode(ch_name, UTCDateTime(starts[ch_name]), run.view())
+
+        logger.warning(
+            "Recovered %d sample(s) from %d journal entries after an unclean shutdown",
+            recovered,
+            entries,
+        )
+        self._close_files()
+        self._reset_journal()
+
+    def _encode(self, ch_name: str, start: UTCDateTime, values):
+        """
+        Feed a block of samples to the channel encoder and append the
+        records it completes. Handles midnight splits transparently.
+        """
+        encoder = self._get_encoder(ch_name)
+
+        # Split at midnight so each slice lands in the correct day file,
+        # on the same continuous timeline the encoder stamps records with
+        slices = split_buffer_at_midnight(
+            values, encoder.align(start), self.settings.mcu.sampling_rate
+        )
+
+        for slice_start, slice_values in slices:
+            # Close the previous day before starting a new one
+            pending_start = encoder.pending_start
+            if pending_start is not None and (
+                pending_start.year,
+                pending_start.julday,
+            ) != (slice_start.year, slice_start.julday):
+                self._write_records(ch_name, encoder.flush())
+
+            self._write_records(ch_name, encoder.feed(slice_start, slice_values))
+
+    def _get_encoder(self, ch_name: str) -> MiniSeedRecordEncoder:
+        if ch_name not in self._encoders:
+            self._encoders[ch_name] = MiniSeedRecordEncoder(
+                self.settings.station.network,
+                self.settings.station.station,
+                self.settings.station.location_code,
+                ch_name,
+                self.settings.mcu.sampling_rate,
+                record_length=self.record_length,
+            )
+        return self._encoders[ch_name]
+
+    def _write_records(self, ch_name: str, records: list[MiniSeedRecord]):
+        """Append complete records to the day file of their start time."""
+        # A gap may close a series of the previous day in the same batch
+        first = 0
+        for i in range(1, len(records) + 1):
+            if i == len(records) or (
+                records[i].starttime.julday != records[first].starttime.julday
+                or records[i].starttime.year != records[first].starttime.year
+            ):
+                self._write_day_records(ch_name, records[first:i])
+                first = i
+
+    def _write_day_records(self, ch_name: str, records: list[MiniSeedRecord]):
         network = self.settings.station.network
         station = self.settings.station.station
         location_code = self.settings.station.location_code
+        day_start = records[0].starttime
 
-        for ch_name, values in self._buffer.items():
-            if not values:
-                continue
-
-            # Split at midnight so each slice lands in the correct day file
-            slices = split_buffer_at_midnight(values, start, sampling_rate)
-
-            for slice_start, slice_values in slices:
-                raw = np.array(slice_values, dtype=np.int32)
-
-                trace = Trace(data=raw)
-                trace.stats.network = network
-                trace.stats.station = station
-                trace.stats.location = location_code
-                trace.stats.channel = ch_name
-                trace.stats.starttime = slice_start
-                trace.stats.sampling_rate = sampling_rate
-
-                data_path = sds_path(
-                    self.output_dir,
-                    network,
-                    station,
-                    location_code,
-                    ch_name,
-                    slice_start,
-                )
-                data_path.parent.mkdir(parents=True, exist_ok=True)
-
-                plot_path = sds_path(
-                    self.output_dir,
-                    network,
-                    station,
-                    location_code,
-                    ch_name,
-                    slice_start,
-                    plot=True,
-                )
-                plot_path.parent.mkdir(parents=True, exist_ok=True)
-
-                stream = Stream([trace])
-
-                self._write_trace(data_path, plot_path, stream)
+        data_path = sds_path(
+            self.output_dir, network, station, location_code, ch_name, day_start
+        )
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        plot_path = sds_path(
+            self.output_dir,
+            network,
+            station,
+            location_code,
+            ch_name,
+            day_start,
+            plot=True,
+        )
+        plot_path.parent.mkdir(parents=True, exist_ok=True)
 
-                # clean unused data
-                del stream, trace
+        data = b"".join(r.data for r in records)
+        self._append(ch_name, data_path, data)
 
-        self._buffer.clear()
-        self._start_time = None
+        self._stats["records"] += len(records)
+        self._stats["bytes"] += len(data)
+        self.bytes_written += len(data)
 
-    def _write_trace(self, path: Path, plot_path: Path, new_stream: Stream):
-        if path.exists():
-            with open(path, "ab") as f:
-                new_stream.write(f, format="MSEED", reclen=512)
-            logger.debug("Appended new samples to %s", path.name)
+        if self.continuous:
+            # Rate-limited, see _request_plots()
+            self._pending_plots[data_path] = plot_path
         else:
-            new_stream.write(str(path), format="MSEED", reclen=512)
-            logger.info("Created %s", path.name)
-
+            self._enqueue_plot(data_path, plot_path)
+
+    def _append(self, ch_name: str, path: Path, data: bytes):
+        """Append to the channel's current day file, keeping it open."""
+        current = self._files.get(ch_name)
+        if current is not None and current[0] != path:
+            self._close_file(ch_name)
+            current = None
+
+        if current is None:
+            created = not path.exists()
+            current = (path, open(path, "ab"))
+            self._files[ch_name] = current
+            if created:
+                logger.info("Created %s", path.name)
+
+        f = current[1]
+        f.write(data)
+        f.flush()  # Hand the records to the OS right away
+        logger.debug("Appended %d bytes of records to %s", len(data), path.name)
+
+        if self.fsync_policy == "record":
+            self._fsync(f)
+        else:
+            self._unsynced.add(ch_name)
+
+    def _fsync(self, f):
+        os.fsync(f.fileno())
+        self._stats["fsyncs"] += 1
+
+    def _sync_files(self):
+        """fsync the open day files written since the last sync."""
+        if self.fsync_policy != "none":
+            for ch_name in self._unsynced:
+                if ch_name in self._files:
+                    self._fsync(self._files[ch_name][1])
+        self._unsynced.clear()
+        self._last_fsync = time.time()
+
+    def _close_file(self, ch_name: str):
+        path, f = self._files.pop(ch_name)
+        # The journal is reset once the files are closed: whatever the
+        # policy, its samples must be on the storage before that
+        if ch_name in self._unsynced and (
+            self.fsync_policy != "none" or self._journal is not None
+        ):
+            self._fsync(f)
+        self._unsynced.discard(ch_name)
+        f.close()
+
+        # A closed day file gets its final plot without waiting
+        plot_path = self._pending_plots.pop(path, None)
+        if plot_path is not None:
+            self._enqueue_plot(path, plot_path)
+
+    def _close_files(self):
+        for ch_name in list(self._files):
+            self._close_file(ch_name)
+
+    def _request_plots(self, now: float):
+        """Enqueue the pending day plots whose rate limit has expired."""
+        for path in list(self._pending_plots):
+            if now - self._last_plot.get(path, 0.0) >= self.plot_interval_sec:
+                self._enqueue_plot(path, self._pending_plots.pop(path))
+                self._last_plot[path] = now
+
+    def _enqueue_plot(self, path: Path, plot_path: Path):
         if self.settings.jobs_settings.dayplot.enabled:
             try:
                 self.plot_queue.put_nowait(
-                    {"mseed_path": str(path), "plot_path": str(plot_path)}
+                    {
+                        "mseed_path": str(path),
+                        "plot_path": str(plot_path),
+                        "record_length": self.record_length,
+                    }
                 )
             except Full:
                 logger.warning(
                     "Plot queue full! Skipping this plot to keep data saving alive."
                 )
+
+    def _log_write_stats(self, now: float, force: bool = False):
+        """Log and reset the write counters once per STATS_INTERVAL_SEC."""
+        elapsed = now - self._stats_start
+        if elapsed < self.STATS_INTERVAL_SEC and not force:
+            return
+
+        hours = max(elapsed, 1.0) / 3600
+        logger.info(
+            "Archive writes: %d bytes, %d records, %d fsyncs in %.0f s (%.0f bytes/h)",
+            self._stats["bytes"],
+            self._stats["records"],
+            self._stats["fsyncs"],
+            elapsed,
+            self._stats["bytes"] / hours,
+        )
+        if self._journal is not None and self._journal.samples_written:
+            logger.info(
+                "Journal writes: %d bytes for %d samples (%.2f bytes/sample)",
+                self._journal.bytes_written,
+                self._journal.samples_written,
+                self._journal.bytes_written / self._journal.samples_written,
+            )
+            self._journal.bytes_written = self._journal.samples_written = 0
+
+        self._stats = {"bytes": 0, "records": 0, "fsyncs": 0}
+        self._stats_start = now
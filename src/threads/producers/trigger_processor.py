@@ -1,4 +1,3 @@
-from collections import deque
 from logging import getLogger
 from multiprocessing import Event
 from os import getpid
@@ -6,18 +5,19 @@ from threading import Thread
 
 import numpy as np
 import zmq
-
-# ObsPy's recursive STA/LTA is faster and better for continuous data
-from obspy.signal.trigger import recursive_sta_lta
 from rpi_seism_common.settings import Settings
 
+from src.structs.hub_message import DATA_TOPIC, HubMessage, channel_layout
+from src.utils.sta_lta import RecursiveStaLta
+
 logger = getLogger(__name__)
 
 
 class TriggerProcessor(Thread):
     """
-    Thread that processes incoming seismic data packets using ObsPy's recursive STA/LTA.
-    Uses a rolling buffer to maintain the state required for the algorithm.
+    Thread that processes incoming seismic data packets using a streaming
+    version of ObsPy's recursive STA/LTA. The detector state is carried
+    between packets, so each sample is processed exactly once.
     """
 
     def __init__(
@@ -36,6 +36,14 @@ class TriggerProcessor(Thread):
         self.sampling_rate = settings.mcu.sampling_rate
         self.trigger_channel = settings.jobs_settings.trigger.trigger_channel
 
+        # Row of the trigger channel in hub messages (None if not configured)
+        channel_names = [ch.name for ch in channel_layout(settings)]
+        self.trigger_index = (
+            channel_names.index(self.trigger_channel)
+            if self.trigger_channel in channel_names
+            else None
+        )
+
         # STA/LTA Window lengths in seconds
         self.sta_sec = settings.jobs_settings.trigger.sta_sec
         self.lta_sec = settings.jobs_settings.trigger.lta_sec
@@ -48,10 +56,10 @@ class TriggerProcessor(Thread):
         self.nsta = int(self.sta_sec * self.sampling_rate)
         self.nlta = int(self.lta_sec * self.sampling_rate)
 
-        # Buffer: We need at least nlta samples to establish a baseline.
-        # We keep a slightly larger buffer (e.g., 2x LTA) to ensure stable ratios.
-        self.buffer_size = self.nlta * 2
-        self.data_buffer = deque(maxlen=self.buffer_size)
+        # Stateful detector: no trigger decision is made until nlta samples
+        # have been seen (the trigger is disarmed during the warm-up).
+        self.sta_lta = RecursiveStaLta(self.nsta, self.nlta)
+        self.armed = False
 
         self.last_trigger = False
 
@@ -63,37 +71,18 @@ class TriggerProcessor(Thread):
         context = zmq.Context()
         sub_socket = context.socket(zmq.SUB)
         sub_socket.connect(self.zmq_endpoint)
-        sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")  # Receive everything
+        sub_socket.setsockopt_string(zmq.SUBSCRIBE, DATA_TOPIC)  # No SOH
 
         sub_socket.setsockopt(zmq.RCVTIMEO, 100)  # 100ms timeout
 
         while not self.shutdown_event.is_set():
             try:
-                # Expecting: {"timestamp": float, "measurements": [{"channel": obj, "value": int}, ...]}
-                packet = sub_socket.recv_pyobj()
-
-                if packet.get("type") != "packet":
-                    continue
+                message = HubMessage.from_frames(sub_socket.recv_multipart())
 
-                # Extract the value for the trigger channel
-                trigger_value = next(
-                    (
-                        item["value"]
-                        for item in packet["measurements"]
-                        if item["channel"].name == self.trigger_channel
-                    ),
-                    None,
-                )
-
-                if trigger_value is None:
+                if self.trigger_index is None:
                     continue
 
-                # Add new sample to the rolling buffer
-                self.data_buffer.append(float(trigger_value))
-
-                # Process if we have enough data for the LTA window
-                if len(self.data_buffer) >= self.nlta:
-                    self._update_trigger_state()
+                self._update_trigger_state(message.data[self.trigger_index])
 
             except zmq.Again:
                 # This exception is raised when RCVTIMEO is hit
@@ -105,26 +94,44 @@ class TriggerProcessor(Thread):
         context.term()
         logger.info("Trigger Processor stopped.")
 
-    def _update_trigger_state(self):
-        """Calculates the characteristic function and handles event state."""
-        # Convert buffer to numpy array for ObsPy processing
-        data_arr = np.array(self.data_buffer)
-
-        # ObsPy's recursive_sta_lta returns the 'Characteristic Function' (the ratios)
-        cft = recursive_sta_lta(data_arr, self.nsta, self.nlta)
-
-        # The latest ratio is the last element of the array
-        current_ratio = cft[-1]
-
-        # Handle State Changes (Edge Detection) with Dual Thresholds (Hysteresis)
-        if current_ratio > self.thr_on and not self.last_trigger:
+    def _update_trigger_state(self, samples):
+        """Feeds new samples to the detector and handles event state."""
+        # The 'Characteristic Function' (the ratios), one per new sample
+        cft = self.sta_lta.update(samples)
+
+        if not self.armed:
+            # The LTA window is still filling: its ratios are meaningless
+            if not self.sta_lta.is_warm:
+                return
+            self.armed = True
+            logger.info("STA/LTA warmed up after %.0f s, trigger armed", self.lta_sec)
+
+        # Walk the hysteresis over the block: find the next sample crossing
+        # the threshold relevant to the current state, then continue from there.
+        position = 0
+        while position < len(cft):
+            if self.last_trigger:
+                crossings = np.flatnonzero(cft[position:] < self.thr_off)
+            else:
+                crossings = np.flatnonzero(cft[position:] > self.thr_on)
+
+            if not len(crossings):
+                break
+
+            position += crossings[0]
+            self._set_trigger_state(cft[position])
+            position += 1
+
+    def _set_trigger_state(self, current_ratio: float):
+        """Handle State Changes (Edge Detection) with Dual Thresholds (Hysteresis)"""
+        if not self.last_trigger:
             logger.warning(
                 f"EARTHQUAKE DETECTED: STA/LTA ratio {current_ratio:.2f} > {self.thr_on}"
             )
             self.earthquake_event.set()
             self.last_trigger = True
 
-        elif current_ratio < self.thr_off and self.last_trigger:
+        else:
             logger.info(
                 f"Trigger cleared: Signal ratio {current_ratio:.2f} returned below {self.thr_off}"
             )
@@ -1,5 +1,5 @@
 import asyncio
-from collections import deque
+import json
 from logging import getLogger
 from multiprocessing import Event
 from os import getpid
@@ -9,12 +9,36 @@ import numpy as np
 import websockets
 import zmq
 import zmq.asyncio
-from obspy import Trace, UTCDateTime
+from obspy import UTCDateTime
 from rpi_seism_common.settings import Settings
 from rpi_seism_common.websocket_message import WebsocketMessage
 
+from src.structs.hub_message import (
+    DATA_TOPIC,
+    SOH_TOPIC,
+    HubMessage,
+    HubMessageType,
+    channel_layout,
+)
+from src.structs.subscription import ProductKey, Subscription
+from src.utils.client_queue import ClientQueue
+from src.utils.envelope_pyramid import EnvelopePyramid
+from src.utils.ring_buffer import RingBuffer
+from src.utils.sample_buffer import SampleBuffer
+from src.utils.stream_filter import PolyphaseDecimator, StreamingBandpass
+from src.ws_messages.envelope.envelope import Envelope
+from src.ws_messages.envelope.envelope_payload import EnvelopePayload
+from src.ws_messages.envelope.envelope_request import EnvelopeRequest
 from src.ws_messages.sample.sample import Sample
+from src.ws_messages.sample.sample_frame import (
+    BINARY_SUBPROTOCOL,
+    SampleFrame,
+    SampleFrameChannel,
+)
 from src.ws_messages.sample.sample_payload import SamplePayload
+from src.ws_messages.subscribe.subscribe_request import SubscribeRequest
+from src.ws_messages.subscribe.subscribed import Subscribed
+from src.ws_messages.subscribe.subscribed_payload import SubscribedPayload
 from src.ws_messages.state_of_health.state_of_health import StateOfHealth
 from src.ws_messages.state_of_health.state_of_health_payload import StateOfHealthPayload
 
@@ -23,10 +47,48 @@ logger = getLogger(__name__)
 
 class WebSocketSender(Thread):
     """Thread that serves a WebSocket endpoint to broadcast decimated seismic data
-    in real-time to connected clients. It maintains a sliding window buffer for each channel,
-    applies decimation, and sends downsampled data every second.
+    in real-time to connected clients. Each channel has a persistent bandpass
+    filter and polyphase decimator that carry their state across blocks, so
+    only the new samples are processed every second and the downsampled
+    output is sent to the clients.
+
+    Clients get one JSON Sample message per channel per second by default.
+    Clients that offer the BINARY_SUBPROTOCOL WebSocket subprotocol when
+    connecting instead get one binary SampleFrame per tick with the samples
+    of all channels, serialized once and shared by every binary client.
+
+    Every message is serialized once and put on a bounded per-client queue
+    (ClientQueue) that a task per connection drains, so a slow or stalled
+    browser never blocks the producer loop or the other clients. When a
+    queue is full, `slow_client_policy` decides whether the oldest message
+    is dropped ("drop_oldest"), the previous message of the same kind is
+    replaced ("coalesce") or the client is disconnected ("disconnect").
+    Queue depth, drops and disconnections are logged every
+    `metrics_interval_sec`.
+
+    The last `history_sec` seconds of decimated samples of each channel are
+    kept in a RingBuffer and queued for every new client as soon as it
+    connects (one Sample message per channel for JSON clients, a single
+    SampleFrame for binary clients), so dashboards start with a filled plot.
+
+    For zoomed-out views, each channel also keeps an EnvelopePyramid of
+    min/max bins (`envelope_levels`, by default 1 s, 10 s and 60 s) of the
+    filtered full-rate signal.
+    Clients query it by sending an EnvelopeRequest; the answer comes from
+    the finest resolution that fits the requested number of points, so
+    its cost does not depend on the length of the window.
+
+    Clients may send a SubscribeRequest to pick their channels, bandpass
+    and decimation factor (default: every channel, `freqmin`-`freqmax` Hz,
+    the configured factor). Every tick, each distinct (channel, band,
+    decimation) product is computed once (the bandpass once per band),
+    each message is serialized once per distinct subscription, and the
+    same bytes are queued for every client that shares it.
     """
 
+    MAX_ENVELOPE_POINTS = 10000
+    MAX_PRODUCTS = 32  # Distinct (channel, band, decimation) products
+
     def __init__(
         self,
         settings: Settings,
@@ -35,24 +97,78 @@ class WebSocketSender(Thread):
         zmq_endpoint: str = "ipc:///tmp/seismic_data.ipc",
         host: str = "0.0.0.0",
         port: int = 8765,
+        client_queue_size: int = 64,
+        slow_client_policy: str = "drop_oldest",
+        metrics_interval_sec: float = 60.0,
+        history_sec: float = 600.0,
+        freqmin: float = 0.2,
+        freqmax: float = 10.0,
+        envelope_levels: tuple[tuple[float, int], ...] = EnvelopePyramid.DEFAULT_LEVELS,
     ):
         super().__init__(daemon=True)
+        if not 0 < freqmin < freqmax:
+            raise ValueError("The default band must satisfy 0 < freqmin < freqmax.")
+        if not envelope_levels:
+            raise ValueError("envelope_levels needs at least one level.")
+        if slow_client_policy not in ClientQueue.POLICIES:
+            raise ValueError(
+                f"slow_client_policy must be one of {ClientQueue.POLICIES}, "
+                f"got {slow_client_policy!r}."
+            )
+
         self.shutdown_event = shutdown_event
         self.earthquake_event = earthquake_event
         self.zmq_endpoint = zmq_endpoint
         self.host = host
         self.port = port
         self.settings = settings
+        self.client_queue_size = client_queue_size
+        self.slow_client_policy = slow_client_policy
+        self.metrics_interval_sec = metrics_interval_sec
+        self.history_sec = history_sec
+        self.envelope_levels = tuple(tuple(level) for level in envelope_levels)
 
         self._clients = set()
+        self._binary_clients = set()
+        self._queues: dict[object, ClientQueue] = {}
+        # Closing handshakes of disconnected slow clients, kept until done
+        self._closing: set[asyncio.Task] = set()
+
+        # Client metrics, logged and reset every metrics_interval_sec
+        self.dropped_messages = 0
+        self.slow_clients_disconnected = 0
+        self._last_metrics = 0.0
 
-        # Sliding Window Config
-        # window_size: 5s buffer for filter stability
         # step_size: 1s update interval
-        self.window_size = int(self.settings.mcu.sampling_rate * 5)
         self.step_size = int(self.settings.mcu.sampling_rate)
 
-        # Per-channel state: { "EHZ": {"data": deque, "time": deque, "counter": 0}, ... }
+        # Bandpass applied before decimation
+        self.freqmin = freqmin
+        self.freqmax = freqmax
+
+        # Subscription of new clients; its products feed the history and
+        # the envelopes, so they are computed even without clients
+        self._channel_order = [ch.name for ch in channel_layout(settings)]
+        self._default_subscription = Subscription(
+            tuple(self._channel_order),
+            self.freqmin,
+            self.freqmax,
+            self.settings.decimation_factor,
+        )
+        self._subscriptions: dict[object, Subscription] = {}
+
+        # Shared filter state: { (channel, freqmin, freqmax): StreamingBandpass }
+        # and { (channel, freqmin, freqmax, decimation): PolyphaseDecimator }
+        self._bandpasses: dict[tuple[str, float, float], StreamingBandpass] = {}
+        self._decimators: dict[ProductKey, PolyphaseDecimator] = {}
+
+        # Binary frames being assembled for the current tick, per subscription
+        self._frames: dict[Subscription, dict[str, SampleFrameChannel]] = {}
+        self._frame_sequences: dict[Subscription, int] = {}
+
+        # Per-channel state: { "EHZ": {"data": SampleBuffer, "start_time": float,
+        #   "counter": 0, "history": RingBuffer, "history_end": float,
+        #   "envelope": EnvelopePyramid}, ... }
         self.channels_state = {}
         self.latest_soh_data = {}
 
@@ -67,10 +183,17 @@ class WebSocketSender(Thread):
         self.ctx = zmq.asyncio.Context()
         self.sub_socket = self.ctx.socket(zmq.SUB)
         self.sub_socket.connect(self.zmq_endpoint)
-        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")  # Subscribe to all
+        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, DATA_TOPIC)
+        self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, SOH_TOPIC)
         self.sub_socket.setsockopt(zmq.RCVTIMEO, 100)
 
-        async with websockets.serve(self._handle_connection, self.host, self.port):
+        async with websockets.serve(
+            self._handle_connection,
+            self.host,
+            self.port,
+            subprotocols=[BINARY_SUBPROTOCOL],
+            select_subprotocol=self._select_subprotocol,
+        ):
             logger.info(
                 "WebSocket Server started on ws://%s:%d . PID: %d",
                 self.host,
@@ -79,53 +202,249 @@ class WebSocketSender(Thread):
             )
             await self._producer_loop()
 
+    @staticmethod
+    def _select_subprotocol(connection, subprotocols):
+        """Binary frames for the clients that ask for them, JSON for everyone else."""
+        if BINARY_SUBPROTOCOL in subprotocols:
+            return BINARY_SUBPROTOCOL
+        return None
+
     async def _handle_connection(self, websocket):
+        """Per-client task: drain the client's queue onto its socket."""
+        queue = ClientQueue(self.client_queue_size, self.slow_client_policy)
+        self._queues[websocket] = queue
+        self._subscriptions[websocket] = self._default_subscription
         self._clients.add(websocket)
+        if websocket.subprotocol == BINARY_SUBPROTOCOL:
+            self._binary_clients.add(websocket)
+
+        self._queue_history(websocket, queue)
+
+        # Handles the client's requests, and wakes the loop below when the
+        # client goes away while idle
+        reader = asyncio.create_task(self._read_requests(websocket, queue))
+        reader.add_done_callback(lambda _: queue.close())
+
         try:
-            await websocket.wait_closed()
+            while (payload := await queue.get()) is not None:
+                await websocket.send(payload)
+        except websockets.ConnectionClosed:
+            pass
         finally:
-            self._clients.discard(websocket)
+            reader.cancel()
+            self._remove_client(websocket)
 
-    async def _producer_loop(self):
-        while not self.shutdown_event.is_set():
-            try:
-                # Expecting: {"timestamp": float, "measurements": [{"channel": obj, "value": int}, ...]}
-                packet = await asyncio.wait_for(
-                    self.sub_socket.recv_pyobj(), timeout=1.0
+    async def _read_requests(self, websocket, queue: ClientQueue):
+        try:
+            async for raw in websocket:
+                self._handle_request(websocket, queue, raw)
+        except websockets.ConnectionClosed:
+            pass
+
+    def _handle_request(self, websocket, queue: ClientQueue, raw):
+        """Answer a message sent by a client."""
+        try:
+            request_type = json.loads(raw).get("type")
+            if request_type == "envelope":
+                self._answer_envelope(
+                    websocket, queue, EnvelopeRequest.model_validate_json(raw)
                 )
+            elif request_type == "subscribe":
+                self._subscribe(websocket, queue, SubscribeRequest.model_validate_json(raw))
+            else:
+                raise ValueError(f"unknown message type {request_type!r}")
+        except (ValueError, AttributeError) as e:
+            logger.debug("Ignoring invalid WebSocket client message %.100r: %s", raw, e)
+
+    def _answer_envelope(self, websocket, queue: ClientQueue, request: EnvelopeRequest):
+        state = self.channels_state.get(request.channel)
+        if state is None:
+            return
 
-                # Filter for packets
-                if packet.get("type") != "packet":
-                    # If this is an SOH packet, update your local tracker
-                    if packet.get("type") == "SOH":
-                        self.latest_soh_data = packet["data"]
-                    continue
+        envelope = state["envelope"].query(
+            request.start if request.start is not None else float("-inf"),
+            request.end if request.end is not None else float("inf"),
+            min(request.max_points, self.MAX_ENVELOPE_POINTS),
+        )
+        message = Envelope(
+            payload=EnvelopePayload(
+                channel=request.channel,
+                resolution=envelope.bin_seconds,
+                times=envelope.times.tolist(),
+                min=envelope.mins.tolist(),
+                max=envelope.maxs.tolist(),
+            )
+        )
+        if not queue.put(message.to_json) and websocket in self._clients:
+            self._disconnect_slow_client(websocket)
+
+    def _subscribe(self, websocket, queue: ClientQueue, request: SubscribeRequest):
+        """Change what a client receives, then confirm the subscription in effect."""
+        default = self._default_subscription
+        channels = request.channels or default.channels
+        freqmin, freqmax = request.band or (default.freqmin, default.freqmax)
+        decimation = request.decimation or default.decimation
+
+        unknown = set(channels) - set(self._channel_order)
+        if unknown:
+            raise ValueError(f"unknown channels {sorted(unknown)}")
+        if not 0 < freqmin < freqmax:
+            raise ValueError(f"invalid band {freqmin}-{freqmax} Hz")
+        if not 1 <= decimation <= self.step_size:
+            raise ValueError(f"invalid decimation factor {decimation}")
+
+        subscription = Subscription(
+            tuple(ch for ch in self._channel_order if ch in channels),
+            float(freqmin),
+            float(freqmax),
+            int(decimation),
+        )
 
-                ts = packet["timestamp"]
+        products = self._product_keys(
+            set(self._subscriptions.values()) | {subscription}
+        )
+        if len(products) > self.MAX_PRODUCTS:
+            logger.warning(
+                "Rejecting WebSocket subscription %s: more than %d products",
+                subscription,
+                self.MAX_PRODUCTS,
+            )
+            subscription = self._subscriptions[websocket]
+        else:
+            self._subscriptions[websocket] = subscription
+            self._prune_products()
+
+        message = Subscribed(
+            payload=SubscribedPayload(
+                channels=list(subscription.channels),
+                band=(subscription.freqmin, subscription.freqmax),
+                decimation=subscription.decimation,
+                fs=self.settings.mcu.sampling_rate / subscription.decimation,
+            )
+        )
+        if not queue.put(message.to_json) and websocket in self._clients:
+            self._disconnect_slow_client(websocket)
+
+    def _product_keys(self, subscriptions) -> set[ProductKey]:
+        return {
+            subscription.product_key(channel)
+            for subscription in subscriptions | {self._default_subscription}
+            for channel in subscription.channels
+        }
+
+    def _prune_products(self):
+        """Forget the filter state of products nobody subscribes to anymore."""
+        products = self._product_keys(set(self._subscriptions.values()))
+        bands = {product[:3] for product in products}
+
+        for key in set(self._decimators) - products:
+            del self._decimators[key]
+        for key in set(self._bandpasses) - bands:
+            del self._bandpasses[key]
+        for subscription in set(self._frames) - set(self._subscriptions.values()):
+            del self._frames[subscription]
+
+    def _queue_history(self, websocket, queue: ClientQueue):
+        """Queue the buffered history of every channel for a new client."""
+        history = [
+            SampleFrameChannel(
+                name,
+                state["history_end"],
+                self.settings.mcu.sampling_rate / self.settings.decimation_factor,
+                state["history"].view(),
+            )
+            for name, state in self.channels_state.items()
+            if len(state["history"])
+        ]
+        if not history:
+            return
 
-                # update each channel's buffer
-                for item in packet["measurements"]:
-                    ch_name = item["channel"].name
-                    val = item["value"]
+        if websocket.subprotocol == BINARY_SUBPROTOCOL:
+            # Numbered just before the next live frame, which continues it
+            sequence = self._frame_sequences.get(self._default_subscription, 0) - 1
+            frame = SampleFrame(sequence, self._in_layout_order(history))
+            queue.put(frame.to_bytes())
+            return
 
-                    if ch_name not in self.channels_state:
-                        self.channels_state[ch_name] = {
-                            "data": deque(maxlen=self.window_size),
-                            "time": deque(maxlen=self.window_size),
-                            "counter": 0,
-                        }
+        for entry in history:
+            message = SamplePayload(
+                channel=entry.channel,
+                timestamp=UTCDateTime(entry.timestamp).isoformat() + "Z",
+                fs=entry.fs,
+                data=entry.data.tolist(),
+            )
+            queue.put(Sample(payload=message).to_json)
+
+    def _remove_client(self, websocket):
+        queue = self._queues.pop(websocket, None)
+        if queue is not None:
+            self.dropped_messages += queue.dropped
+            queue.close()
+        self._clients.discard(websocket)
+        self._binary_clients.discard(websocket)
+        if self._subscriptions.pop(websocket, None) is not None:
+            self._prune_products()
+
+    def _disconnect_slow_client(self, websocket):
+        """Drop a client whose queue overflowed under the "disconnect" policy."""
+        logger.warning(
+            "Disconnecting slow WebSocket client %s", getattr(websocket, "remote_address", "")
+        )
+        self.slow_clients_disconnected += 1
+        self._remove_client(websocket)
+        # Closing may wait for the stalled socket: never await it here
+        closing = asyncio.create_task(websocket.close(code=1008, reason="Client too slow"))
+        self._closing.add(closing)
+        closing.add_done_callback(self._closed)
+
+    def _closed(self, task: asyncio.Task):
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Closing a slow WebSocket client failed: %s", task.exception())
+
+    def _log_client_metrics(self, now: float):
+        if now - self._last_metrics < self.metrics_interval_sec:
+            return
+        self._last_metrics = now
+
+        if not self._queues and not self.slow_clients_disconnected:
+            return
 
-                    state = self.channels_state[ch_name]
-                    state["data"].append(float(val))
-                    state["time"].append(ts)
-                    state["counter"] += 1
+        queues = list(self._queues.values())
+        dropped = self.dropped_messages + sum(queue.dropped for queue in queues)
+        logger.info(
+            "WebSocket clients: %d (%d binary), queue depth max %d/%d, "
+            "%d message(s) dropped, %d slow client(s) disconnected",
+            len(self._clients),
+            len(self._binary_clients),
+            max((queue.max_depth for queue in queues), default=0),
+            self.client_queue_size,
+            dropped,
+            self.slow_clients_disconnected,
+        )
 
-                    # process every STEP_SIZE samples for THIS specific channel
-                    if (
-                        len(state["data"]) == self.window_size
-                        and state["counter"] % self.step_size == 0
-                    ):
-                        await self._process_and_broadcast(ch_name)
+        for queue in queues:
+            queue.reset_metrics()
+        self.dropped_messages = 0
+        self.slow_clients_disconnected = 0
+
+    async def _producer_loop(self):
+        while not self.shutdown_event.is_set():
+            try:
+                message = HubMessage.from_frames(
+                    await asyncio.wait_for(self.sub_socket.recv_multipart(), timeout=1.0)
+                )
+
+                # Filter for data messages
+                if message.message_type != HubMessageType.DATA:
+                    # If this is an SOH message, update your local tracker
+                    if message.message_type == HubMessageType.SOH:
+                        self.latest_soh_data = message.soh
+                    continue
+
+                # update the buffer of every channel
+                for ch_name, values in zip(self._channel_order, message.data):
+                    await self._append_block(ch_name, message.timestamp, values)
 
                 # Periodic SOH Broadcast to Web Clients
                 now = asyncio.get_event_loop().time()
@@ -133,6 +452,8 @@ class WebSocketSender(Thread):
                     await self._broadcast_soh()
                     self.last_soh_broadcast = now
 
+                self._log_client_metrics(now)
+
             except zmq.error.Again:
                 continue  # No message received within timeout, loop back and check shutdown_event
             except asyncio.TimeoutError:
@@ -143,45 +464,166 @@ class WebSocketSender(Thread):
         self.sub_socket.close()
         self.ctx.term()
 
-    async def _process_and_broadcast(self, channel_name):
-        """Perform decimation and broadcast for a specific channel."""
-        # If no WebSocket clients are connected, don't waste CPU on obspy
-        if not self._clients:
-            return
+    async def _append_block(self, ch_name: str, timestamp: float, values: np.ndarray):
+        """Append a block of samples, processing at every STEP_SIZE boundary."""
+        if ch_name not in self.channels_state:
+            self.channels_state[ch_name] = {
+                "data": SampleBuffer(self.step_size),
+                "start_time": timestamp,
+                "counter": 0,
+                "history": RingBuffer(
+                    self.history_sec
+                    * self.settings.mcu.sampling_rate
+                    / self.settings.decimation_factor
+                ),
+                "history_end": timestamp,
+                "envelope": EnvelopePyramid(
+                    self.settings.mcu.sampling_rate, self.envelope_levels
+                ),
+            }
+
+        state = self.channels_state[ch_name]
+        period = 1.0 / self.settings.mcu.sampling_rate
+        position = 0
+
+        while position < len(values):
+            # Take samples up to the next step boundary for THIS specific channel
+            to_boundary = self.step_size - state["counter"] % self.step_size
+            chunk = values[position : position + to_boundary]
+
+            if not state["data"]:
+                state["start_time"] = timestamp + position * period
+            state["data"].append(chunk)
+            state["counter"] += len(chunk)
+            position += len(chunk)
+
+            if state["counter"] % self.step_size == 0:
+                await self._process_and_broadcast(ch_name)
 
+    async def _process_and_broadcast(self, channel_name):
+        """
+        Compute every product of a channel for the new samples once, and
+        fan the serialized messages out to their subscribers.
+        """
         state = self.channels_state[channel_name]
-
-        # Create Trace from current buffer
-        data_array = np.array(state["data"])
-        tr = Trace(data=data_array)
-        tr.stats.sampling_rate = self.settings.mcu.sampling_rate
-        tr.stats.starttime = UTCDateTime(state["time"][0])
-
-        # Decimate (Anti-Alias filter applied)
-        tr_decimated = tr.copy()
+        fs = self.settings.mcu.sampling_rate
+        default_key = self._default_subscription.product_key(channel_name)
+
+        # The default product always runs, even without clients, so the
+        # history and envelopes stay current
+        subscriptions = set(self._subscriptions.values()) | {self._default_subscription}
+        products = {
+            subscription.product_key(channel_name)
+            for subscription in subscriptions
+            if channel_name in subscription.channels
+        }
+
+        filtered: dict[tuple[str, float, float], np.ndarray] = {}
+        outputs: dict[ProductKey, SampleFrameChannel] = {}
         try:
-            tr_decimated.filter("bandpass", freqmin=0.2, freqmax=10.0)
-            # Note: decimation_factor must be e.g., 2, 4, 5, 8, 10
-            tr_decimated.decimate(self.settings.decimation_factor, no_filter=False)
+            for key in products:
+                band = key[:3]
+                if band not in filtered:
+                    filtered[band] = self._get_bandpass(band).process(state["data"].view())
+
+                decimator = self._get_decimator(key)
+                phase = decimator.phase
+                values = decimator.process(filtered[band])
+                if not len(values):
+                    continue
+
+                # Time of the last kept sample, corrected for the FIR group delay
+                last_index = phase + (len(values) - 1) * decimator.factor
+                end_time = state["start_time"] + (last_index - decimator.delay) / fs
+                outputs[key] = SampleFrameChannel(
+                    channel_name, end_time, fs / decimator.factor, values
+                )
         except Exception as e:
             logger.error("Decimation failed for %s: %s", channel_name, e)
             return
+        finally:
+            state["data"].clear()
 
-        # Extract the new batch of downsampled samples
-        new_samples_count = int(self.step_size / self.settings.decimation_factor)
-        downsampled_values = tr_decimated.data[-new_samples_count:]
+        state["envelope"].update(state["start_time"], filtered[default_key[:3]])
 
-        # Construct and send the message
-        message = SamplePayload(
-            channel=channel_name,
-            timestamp=tr_decimated.stats.endtime.isoformat() + "Z",
-            fs=tr_decimated.stats.sampling_rate,
-            data=downsampled_values.tolist(),
-        )
+        if default_key in outputs:
+            state["history"].extend(outputs[default_key].data)
+            state["history_end"] = outputs[default_key].timestamp
+
+        # Serialized once per product, shared by its JSON subscribers
+        json_payloads: dict[ProductKey, str] = {}
+        frames: set[Subscription] = set()
+
+        for websocket, subscription in list(self._subscriptions.items()):
+            key = subscription.product_key(channel_name)
+            if key not in outputs or channel_name not in subscription.channels:
+                continue
+
+            if websocket in self._binary_clients:
+                frames.add(subscription)
+                continue
+
+            if key not in json_payloads:
+                entry = outputs[key]
+                json_payloads[key] = Sample(
+                    payload=SamplePayload(
+                        channel=channel_name,
+                        timestamp=UTCDateTime(entry.timestamp).isoformat() + "Z",
+                        fs=entry.fs,
+                        data=entry.data.tolist(),
+                    )
+                ).to_json
+            self._fan_out(json_payloads[key], [websocket], f"{DATA_TOPIC}.{channel_name}")
+
+        for subscription in frames:
+            self._add_to_frame(subscription, outputs[subscription.product_key(channel_name)])
+
+    def _get_bandpass(self, band: tuple[str, float, float]) -> StreamingBandpass:
+        if band not in self._bandpasses:
+            self._bandpasses[band] = StreamingBandpass(
+                band[1], band[2], self.settings.mcu.sampling_rate
+            )
+        return self._bandpasses[band]
+
+    def _get_decimator(self, key: ProductKey) -> PolyphaseDecimator:
+        if key not in self._decimators:
+            self._decimators[key] = PolyphaseDecimator(key[3])
+        return self._decimators[key]
+
+    def _add_to_frame(self, subscription: Subscription, entry: SampleFrameChannel):
+        """Collect a channel's tick; send the frame once every channel is in."""
+        channels = self._frames.setdefault(subscription, {})
+
+        # A channel that is already in the frame means a new tick started
+        # before the others arrived: send what we have
+        if entry.channel in channels:
+            self._send_frame(subscription)
+            channels = self._frames.setdefault(subscription, {})
+
+        channels[entry.channel] = entry
+        if len(channels) >= len(subscription.channels):
+            self._send_frame(subscription)
+
+    def _send_frame(self, subscription: Subscription):
+        """Serialize a subscription's frame once and queue it for its binary clients."""
+        channels = self._frames.pop(subscription, None)
+        if not channels:
+            return
 
-        await self._broadcast(Sample(payload=message))
-        
-        del tr, tr_decimated
+        sequence = self._frame_sequences.get(subscription, 0)
+        self._frame_sequences[subscription] = sequence + 1
+
+        clients = [
+            websocket
+            for websocket, subscribed in self._subscriptions.items()
+            if subscribed == subscription and websocket in self._binary_clients
+        ]
+        frame = SampleFrame(sequence, self._in_layout_order(channels.values()))
+        self._fan_out(frame.to_bytes(), clients, "frame")
+
+    def _in_layout_order(self, entries) -> list[SampleFrameChannel]:
+        order = {name: index for index, name in enumerate(self._channel_order)}
+        return sorted(entries, key=lambda entry: order.get(entry.channel, len(order)))
 
     async def _broadcast_soh(self):
         """Broadcast current State of Health metrics to all connected clients."""
@@ -203,26 +645,33 @@ class WebSocketSender(Thread):
         )
 
         message = StateOfHealth(payload=payload)
-        await self._broadcast(message)
+        await self._broadcast(message, key=SOH_TOPIC)
 
-    async def _broadcast(self, message: WebsocketMessage):
-        if not self._clients:
+    async def _broadcast(
+        self,
+        message: WebsocketMessage | SampleFrame,
+        clients=None,
+        key: str | None = None,
+    ):
+        """
+        Serialize a message once and queue it for `clients` (default: all).
+        Never waits for the network; `key` identifies the kind of message
+        for the "coalesce" policy.
+        """
+        clients = list(self._clients if clients is None else clients)
+        if not clients:
             return
 
-        payload = message.to_json
-
-        dead_clients = set()
-        send_tasks = [
-            self._safe_send(ws, payload, dead_clients) for ws in self._clients
-        ]
-        if send_tasks:
-            await asyncio.gather(*send_tasks)
+        if isinstance(message, SampleFrame):
+            payload = message.to_bytes()  # Sent as a binary frame
+        else:
+            payload = message.to_json
 
-        if dead_clients:
-            self._clients.difference_update(dead_clients)
+        self._fan_out(payload, clients, key)
 
-    async def _safe_send(self, websocket, message, dead_clients):
-        try:
-            await websocket.send(message)
-        except Exception:
-            dead_clients.add(websocket)
+    def _fan_out(self, payload, clients, key: str | None = None):
+        """Queue already serialized bytes for every client in `clients`."""
+        for websocket in clients:
+            queue = self._queues.get(websocket)
+            if queue is not None and not queue.put(payload, key):
+                self._disconnect_slow_client(websocket)
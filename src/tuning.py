@@ -0,0 +1,87 @@
+import logging
+from pathlib import Path
+from typing import Literal
+
+import yaml
+
+from rpi_seism_common.settings import BaseModel
+
+
+logger = logging.getLogger(__name__)
+
+
+class TuningSection(BaseModel):
+    # A misspelt key must not silently fall back to the default
+    model_config = {"extra": "forbid"}
+
+    def kwargs(self) -> dict:
+        """Constructor keyword arguments of the thread or process it tunes."""
+        return self.model_dump()
+
+
+class ReaderTuning(TuningSection):
+    read_latency_sec: float = 0.02
+    block_max_samples: int = 1
+    block_max_latency_sec: float = 0.05
+
+
+class WriterTuning(TuningSection):
+    record_length: int = 512
+    continuous: bool = False
+    fsync_policy: Literal["none", "record", "interval"] = "interval"
+    fsync_interval_sec: float = 30.0
+    plot_interval_sec: float = 600.0
+
+
+class WebSocketTuning(TuningSection):
+    freqmin: float = 0.2
+    freqmax: float = 10.0
+    client_queue_size: int = 64
+    slow_client_policy: Literal["drop_oldest", "coalesce", "disconnect"] = "drop_oldest"
+    metrics_interval_sec: float = 60.0
+    history_sec: float = 600.0
+    # (bin seconds, capacity in bins) of each EnvelopePyramid level
+    envelope_levels: tuple[tuple[float, int], ...] = (
+        (1.0, 3600),
+        (10.0, 8640),
+        (60.0, 10080),
+    )
+
+
+class NotifierTuning(TuningSection):
+    report_format: Literal["html", "png"] = "html"
+    max_points_per_trace: int | None = 4000
+    downsample_method: Literal["minmax", "lttb"] | None = "minmax"
+    plotly_js: str | bool = "cdn"
+    max_retries: int = 3
+    retry_backoff_sec: float = 2.0
+
+
+class PlottersTuning(TuningSection):
+    workers: int = 1
+    rss_budget_mb: int = 300
+
+
+class Tuning(TuningSection):
+    """
+    Performance options of the acquisition stack, read from the optional
+    data/tuning.yml. Each section maps onto the keyword arguments of one
+    thread or process; omitted keys (or a missing file) keep the defaults,
+    which suit a Raspberry Pi at 100 Hz.
+    """
+
+    reader: ReaderTuning = ReaderTuning()
+    writer: WriterTuning = WriterTuning()
+    websocket: WebSocketTuning = WebSocketTuning()
+    notifier: NotifierTuning = NotifierTuning()
+    plotters: PlottersTuning = PlottersTuning()
+
+    @classmethod
+    def load(cls, path: Path) -> "Tuning":
+        if not path.exists():
+            return cls()
+
+        with open(path) as f:
+            tuning = cls(**(yaml.safe_load(f) or {}))
+        logger.info("Loaded performance tuning from %s", path)
+        return tuning
@@ -0,0 +1,89 @@
+import asyncio
+from collections import deque
+
+
+class ClientQueue:
+    """
+    Bounded outbound message queue of one WebSocket client.
+
+    put() never blocks, so the producer is never slowed down by the
+    network; the client's own task drains the queue with get(). What
+    happens when the queue is full depends on the policy:
+        - "drop_oldest": the oldest queued message is dropped
+        - "coalesce": the oldest queued message with the same key as the
+          new one (e.g. the previous update of the same channel) is dropped,
+          or the oldest message if none shares the key
+        - "disconnect": the queue is closed and put() returns False, so the
+          caller can disconnect the client
+    """
+
+    POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+    def __init__(self, maxsize: int = 64, policy: str = "drop_oldest"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}, got {policy!r}.")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.closed = False
+
+        # Metrics
+        self.dropped = 0
+        self.max_depth = 0
+
+        self._items: deque[tuple[str | None, object]] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, payload, key: str | None = None) -> bool:
+        """Queue a message. Returns False once the queue has been closed."""
+        if self.closed:
+            return False
+
+        if len(self._items) >= self.maxsize:
+            if self.policy == "disconnect":
+                self.close()
+                return False
+            self._drop_for(key)
+
+        self._items.append((key, payload))
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+        return True
+
+    async def get(self):
+        """Next message to send, or None once the queue is closed."""
+        while not self._items:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self.closed:
+            return None
+        return self._items.popleft()[1]
+
+    def close(self):
+        """Stop accepting messages and wake up the consumer."""
+        self.closed = True
+        self._items.clear()
+        self._ready.set()
+
+    def reset_metrics(self):
+        self.dropped = 0
+        self.max_depth = len(self._items)
+
+    def _drop_for(self, key: str | None):
+        if self.policy == "coalesce" and key is not None:
+            for index, (queued_key, _) in enumerate(self._items):
+                if queued_key == key:
+                    del self._items[index]
+                    self.dropped += 1
+                    return
+
+        self._items.popleft()
+        self.dropped += 1
@@ -1,76 +1,126 @@
-# This global variable will hold the queue for each worker process
-_worker_log_queue = None
+import os
+import resource
+import sys
+import time
+from pathlib import Path
 
-def init_worker(q):
-    global _worker_log_queue
-    _worker_log_queue = q
+# Exit code of a worker that stopped to be replaced (over its memory budget)
+RECYCLE_EXIT_CODE = 3
 
 
-def render_dayplot_worker(task, settings_dict):
+def rss_mb() -> float:
+    """Resident set size of the calling process, in MiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        # No /proc: fall back to the peak RSS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def plot_worker(task_queue, settings_dict, log_queue, rss_budget_mb):
     """
-    DISPOSABLE WORKER: This function runs in a fresh process.
-    We pass log_queue to allow the worker to log messages safely.
+    PERSISTENT WORKER: runs in its own process and renders day plots until
+    it receives None, or until a task leaves it above `rss_budget_mb` of
+    resident memory, in which case it exits and the Plotters manager starts
+    a fresh one. The plotting stack is imported (and the font cache warmed
+    up) once per worker instead of once per plot.
     """
     # Setup Logging for this specific worker process
     import logging
 
     from src.logger import configure_worker_logging
 
-    global _worker_log_queue
-    if _worker_log_queue:
-        configure_worker_logging(_worker_log_queue)
-
+    configure_worker_logging(log_queue)
     logger = logging.getLogger(__name__)
 
-    # Local Imports to keep process startup light
+    started = time.perf_counter()
+    _preload()
+    logger.info(
+        "Plot worker ready in %.2f s (PID %d, RSS %.0f MB)",
+        time.perf_counter() - started,
+        os.getpid(),
+        rss_mb(),
+    )
+    if rss_mb() > rss_budget_mb:
+        logger.warning(
+            "Plot worker RSS budget of %d MB is below its baseline, it will be "
+            "recycled after every task",
+            rss_budget_mb,
+        )
+
+    tasks = 0
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+
+        tasks += 1
+        rss_before = rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        samples = render_dayplot(task, settings_dict, logger)
+        rss_after = rss_mb()
+
+        if samples is not None:
+            logger.info(
+                "Dayplot updated: %s (%d new samples, %.2f s wall, %.2f s CPU, "
+                "RSS %.0f MB %+.1f MB, task %d of worker %d)",
+                Path(task["plot_path"]).with_suffix(".png").name,
+                samples,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                rss_after,
+                rss_after - rss_before,
+                tasks,
+                os.getpid(),
+            )
+
+        if rss_after > rss_budget_mb:
+            logger.info(
+                "Plot worker %d over its %d MB budget (RSS %.0f MB) after %d tasks, recycling",
+                os.getpid(),
+                rss_budget_mb,
+                rss_after,
+                tasks,
+            )
+            sys.exit(RECYCLE_EXIT_CODE)
+
+
+def _preload():
+    """Import the plotting stack and render a throwaway figure."""
     import matplotlib
 
     matplotlib.use("Agg")
-    import gc
-    from pathlib import Path
-
     import matplotlib.pyplot as plt
-    from obspy import read
+    import obspy.io.mseed.core  # noqa: F401
+    from PIL import Image  # noqa: F401
 
-    try:
-        data_path = task["mseed_path"]
-        plot_path = task["plot_path"]
+    import src.utils.helicorder  # noqa: F401
 
-        logger.debug(f"Starting render for {Path(data_path).name}")
+    fig = plt.figure(figsize=(1, 1))
+    fig.text(0.5, 0.5, "00:00")
+    fig.canvas.draw()  # Loads the fonts
+    plt.close(fig)
 
-        # Processing Logic
-        st = read(str(data_path))
-        st.detrend("linear")
-        st.taper(max_percentage=0.05)
-        st.filter(
-            "bandpass",
-            freqmin=settings_dict["low_cutoff"],
-            freqmax=settings_dict["high_cutoff"],
-        )
 
-        plot_filename = Path(plot_path).with_suffix(".png")
-        tr = st[0]
-
-        # Generate Plot
-        st.plot(
-            type="dayplot",
-            color=["black", "red", "blue", "green"],
-            title=f"Helicorder: {tr.id} | {tr.stats.starttime.strftime('%Y-%j')}",
-            size=(1600, 1200),
-            dpi=200,
-            outfile=str(plot_filename),
-            show=False,
-        )
+def render_dayplot(task, settings_dict, logger) -> int | None:
+    """Update the helicorder of a day file; the number of new samples, None on error."""
+    from src.utils.helicorder import Helicorder
 
-        # Cleanup
-        plt.close("all")
-        del st, tr
-        gc.collect()
+    try:
+        logger.debug(f"Starting render for {Path(task['mseed_path']).name}")
 
-        # Log success from inside the worker
-        logger.info(f"Dayplot updated: {plot_filename.name}")
-        return True
+        # Only the records appended since the last update are read,
+        # filtered and drawn onto the existing plot
+        helicorder = Helicorder(
+            Path(task["plot_path"]).with_suffix(".png"),
+            freqmin=settings_dict["low_cutoff"],
+            freqmax=settings_dict["high_cutoff"],
+            record_length=task["record_length"],
+        )
+        return helicorder.update(Path(task["mseed_path"]))
 
     except Exception as e:
         logger.error(f"Failed to generate plot for {task.get('mseed_path')}: {e}")
-        return False
+        return None
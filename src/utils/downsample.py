@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def minmax_downsample(
+    times: np.ndarray, values: np.ndarray, max_points: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a trace to at most `max_points` points by keeping the minimum
+    and the maximum of each of `max_points // 2` equal-sized buckets, in
+    time order. Peaks are preserved exactly, which is what matters when
+    looking at a seismogram.
+    """
+    n = len(values)
+    buckets = max_points // 2
+    if n <= max_points or buckets < 1:
+        return times, values
+
+    size = -(-n // buckets)  # Ceiling: at most `buckets` buckets
+    full = n // size * size
+
+    blocks = values[:full].reshape(-1, size)
+    offsets = np.arange(0, full, size)
+    lows = blocks.argmin(axis=1) + offsets
+    highs = blocks.argmax(axis=1) + offsets
+
+    if full < n:
+        # Shorter last bucket
+        tail = values[full:]
+        lows = np.append(lows, full + tail.argmin())
+        highs = np.append(highs, full + tail.argmax())
+
+    # Time order, without duplicates (flat buckets have min == max)
+    keep = np.unique(np.concatenate((lows, highs)))
+    return times[keep], values[keep]
+
+
+def lttb_downsample(
+    times: np.ndarray, values: np.ndarray, max_points: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last points and, in
+    each of `max_points - 2` buckets, the point forming the largest
+    triangle with the previously kept point and the mean of the next
+    bucket. Keeps the visual shape with fewer points than min/max.
+    """
+    n = len(values)
+    if n <= max_points or max_points < 3:
+        return times, values
+
+    x = np.asarray(times, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+
+    return times[keep], values[keep]
@@ -0,0 +1,140 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from src.utils.ring_buffer import RingBuffer
+
+
+class Envelope(NamedTuple):
+    bin_seconds: float
+    times: np.ndarray  # Start time of each bin (epoch seconds)
+    mins: np.ndarray
+    maxs: np.ndarray
+
+
+class _EnvelopeLevel:
+    """One resolution of the pyramid: min/max bins of `ratio` input items."""
+
+    def __init__(self, bin_seconds: float, capacity: int, ratio: int):
+        self.bin_seconds = bin_seconds
+        self.capacity = capacity
+        self.ratio = ratio
+
+        self.times = RingBuffer(capacity, dtype=np.float64)
+        self.mins = RingBuffer(capacity, dtype=np.float32)
+        self.maxs = RingBuffer(capacity, dtype=np.float32)
+
+        # Bin being filled
+        self._count = 0
+        self._start = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+
+    def add(self, times: np.ndarray, mins: np.ndarray, maxs: np.ndarray):
+        """Aggregate input items; return the (times, mins, maxs) of completed bins."""
+        done_times, done_mins, done_maxs = [], [], []
+        position = 0
+
+        while position < len(mins):
+            take = min(self.ratio - self._count, len(mins) - position)
+            if self._count == 0:
+                self._start = times[position]
+
+            self._min = min(self._min, mins[position : position + take].min())
+            self._max = max(self._max, maxs[position : position + take].max())
+            self._count += take
+            position += take
+
+            if self._count == self.ratio:
+                done_times.append(self._start)
+                done_mins.append(self._min)
+                done_maxs.append(self._max)
+                self._count = 0
+                self._min = np.inf
+                self._max = -np.inf
+
+        completed = (
+            np.array(done_times, dtype=np.float64),
+            np.array(done_mins, dtype=np.float32),
+            np.array(done_maxs, dtype=np.float32),
+        )
+        if done_times:
+            self.times.extend(completed[0])
+            self.mins.extend(completed[1])
+            self.maxs.extend(completed[2])
+        return completed
+
+
+class EnvelopePyramid:
+    """
+    Incrementally updated min/max envelopes of one channel at several
+    resolutions (by default 1 s bins for an hour, 10 s bins for a day and
+    60 s bins for a week).
+
+    Each level is built from the completed bins of the previous one, so an
+    update only touches the new samples, and every level lives in
+    fixed-size ring buffers. query() answers a time range from the finest
+    level that covers it with at most `max_points` bins, so its cost does
+    not grow with the length of the window.
+    """
+
+    # (bin seconds, capacity in bins) of each level, finest first
+    DEFAULT_LEVELS = ((1.0, 3600), (10.0, 8640), (60.0, 10080))
+
+    def __init__(
+        self,
+        sampling_rate: float,
+        levels: tuple[tuple[float, int], ...] = DEFAULT_LEVELS,
+    ):
+        self.sampling_rate = sampling_rate
+        self.levels: list[_EnvelopeLevel] = []
+
+        previous = 1.0 / sampling_rate
+        for bin_seconds, capacity in levels:
+            ratio = round(bin_seconds / previous)
+            if ratio < 1 or abs(ratio * previous - bin_seconds) > 1e-6 * bin_seconds:
+                raise ValueError(
+                    f"{bin_seconds} s bins are not a multiple of the previous level."
+                )
+            self.levels.append(_EnvelopeLevel(bin_seconds, capacity, ratio))
+            previous = bin_seconds
+
+    def update(self, start_time: float, samples: np.ndarray):
+        """Add a block of samples whose first sample is at `start_time`."""
+        values = np.asarray(samples, dtype=np.float32)
+        if not len(values):
+            return
+
+        times = start_time + np.arange(len(values)) / self.sampling_rate
+        mins = maxs = values
+        for level in self.levels:
+            times, mins, maxs = level.add(times, mins, maxs)
+            if not len(times):
+                break
+
+    def query(self, start: float, end: float, max_points: int = 1000) -> Envelope:
+        """
+        Bins starting within [start, end] from the finest level that covers
+        `start` with at most `max_points` bins; the coarsest level (trimmed
+        to its newest `max_points` bins) if none does.
+        """
+        max_points = max(1, max_points)
+
+        for index, level in enumerate(self.levels):
+            times = level.times.view()
+            if not len(times) and index < len(self.levels) - 1:
+                continue
+
+            low = np.searchsorted(times, start, side="left")
+            high = np.searchsorted(times, end, side="right")
+
+            # A level that wrapped around no longer holds the oldest data
+            covers = len(times) < level.capacity or times[0] <= start
+            if index == len(self.levels) - 1 or (covers and high - low <= max_points):
+                low = max(low, high - max_points)
+                return Envelope(
+                    level.bin_seconds,
+                    times[low:high],
+                    level.mins.view()[low:high],
+                    level.maxs.view()[low:high],
+                )
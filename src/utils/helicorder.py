@@ -0,0 +1,250 @@
+import os
+from io import BytesIO
+from logging import getLogger
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.downsample import minmax_downsample
+from src.utils.stream_filter import StreamingBandpass
+
+logger = getLogger(__name__)
+
+
+class Helicorder:
+    """
+    Day plot (helicorder) of one channel-day, updated incrementally.
+
+    The rendered PNG doubles as the canvas: an update reads only the
+    MiniSEED records appended to the day file since the previous one,
+    filters them with the bandpass state carried over from it, draws them
+    on a transparent layer with the same geometry and composites that layer
+    onto the existing image. The cost of an update is proportional to the
+    new data, not to the time of day.
+
+    The state (byte offset in the day file, filter state, time of the next
+    sample, amplitude scale and last drawn point) is kept next to the plot
+    in PLOT.state.npz, so updates can run in a fresh process every time.
+    The amplitude scale is fixed by the first update of the day
+    (`scale_mads` median absolute deviations per row) so earlier rows never
+    need redrawing; traces are clipped at `clip_rows` rows. Only whole
+    records of `record_length` bytes (that of the writer) are read, since
+    the writer may be appending the next one.
+    """
+
+    STATE_VERSION = 1
+    COLORS = ("black", "red", "blue", "green")
+    # Axes position in figure coordinates, identical on every layer
+    AXES_RECT = (0.09, 0.06, 0.88, 0.88)
+
+    def __init__(
+        self,
+        plot_path: Path,
+        freqmin: float,
+        freqmax: float,
+        interval_min: int = 15,
+        size: tuple[int, int] = (1600, 1200),
+        dpi: int = 200,
+        scale_mads: float = 20.0,
+        clip_rows: float = 1.5,
+        record_length: int = 512,
+    ):
+        if 1440 % interval_min:
+            raise ValueError("interval_min must divide a day.")
+
+        self.plot_path = Path(plot_path)
+        self.state_path = self.plot_path.with_suffix(".state.npz")
+        self.freqmin = freqmin
+        self.freqmax = freqmax
+        self.interval_sec = interval_min * 60
+        self.rows = 1440 // interval_min
+        self.size = size
+        self.dpi = dpi
+        self.scale_mads = scale_mads
+        self.clip_rows = clip_rows
+        self.record_length = record_length
+
+    def update(self, mseed_path: Path) -> int:
+        """Draw the records appended to the day file; return the number of new samples."""
+        from obspy import read
+
+        state = self._load_state()
+        # Whole records only: the writer may be appending the next one
+        size = os.path.getsize(mseed_path) // self.record_length * self.record_length
+
+        if state is None or size < state["offset"] or not self.plot_path.exists():
+            state = {"offset": 0}
+        if size == state["offset"]:
+            return 0
+
+        with open(mseed_path, "rb") as f:
+            f.seek(state["offset"])
+            stream = read(BytesIO(f.read(size - state["offset"])), format="MSEED")
+        stream.sort(keys=["starttime"])
+
+        first = stream[0]
+        if state["offset"] == 0:
+            fs = first.stats.sampling_rate
+            start = first.stats.starttime
+            state.update(
+                fs=fs,
+                day_start=float(start.timestamp - (start.timestamp % 86400)),
+                next_time=np.nan,
+                zi=None,
+                scale=np.nan,
+                last=(-1, np.nan, np.nan),  # Row, x, y of the last drawn point
+            )
+            self._new_canvas(first.id, start.strftime("%Y-%j"))
+
+        bandpass = StreamingBandpass(self.freqmin, self.freqmax, state["fs"])
+        bandpass.state = state["zi"]
+
+        fig, ax = self._figure(transparent=True)
+        samples = 0
+        for trace in stream:
+            start = trace.stats.starttime.timestamp
+            if not abs(start - state["next_time"]) < 0.5 / state["fs"]:
+                # Gap (or first trace): restart the filter, break the line
+                bandpass.reset()
+                state["last"] = (-1, np.nan, np.nan)
+
+            values = bandpass.process(trace.data)
+            if np.isnan(state["scale"]):
+                mad = np.median(np.abs(values - np.median(values)))
+                state["scale"] = self.scale_mads * mad if mad > 0 else 1.0
+
+            times = start + np.arange(len(values)) / state["fs"] - state["day_start"]
+            state["last"] = self._draw(
+                ax, times, values / state["scale"], state["fs"], state["last"]
+            )
+            state["next_time"] = start + len(values) / state["fs"]
+            samples += len(values)
+
+        self._composite(fig)
+        state["offset"] = size
+        state["zi"] = bandpass.state
+        self._save_state(state)
+        return samples
+
+    def _draw(
+        self, ax, times: np.ndarray, values: np.ndarray, fs: float, last: tuple
+    ) -> tuple:
+        """Plot one contiguous run, split into rows; return the last point."""
+        rows = np.floor(times / self.interval_sec).astype(np.int64)
+        y = np.clip(values, -self.clip_rows, self.clip_rows)
+        # Plot width in pixels, for the downsampling of every row
+        width = self.size[0] * self.AXES_RECT[2]
+
+        boundaries = np.flatnonzero(np.diff(rows)) + 1
+        for chunk in np.split(np.arange(len(times)), boundaries):
+            row = int(rows[chunk[0]])
+            if not 0 <= row < self.rows:
+                continue
+
+            x = (times[chunk] - row * self.interval_sec) / 60.0
+            # Two points (min and max) per pixel column
+            max_points = int(2 * width * len(chunk) / (self.interval_sec * fs))
+            x, row_y = minmax_downsample(x, y[chunk], max(max_points, 4))
+            row_y = row_y - row
+
+            if last[0] == row:
+                # Continue the line drawn by the previous run or update
+                x = np.concatenate(([last[1]], x))
+                row_y = np.concatenate(([last[2]], row_y))
+
+            ax.plot(x, row_y, color=self.COLORS[row % len(self.COLORS)], linewidth=0.4)
+            last = (row, float(x[-1]), float(row_y[-1]))
+
+        return last
+
+    def _figure(self, transparent: bool):
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=(self.size[0] / self.dpi, self.size[1] / self.dpi), dpi=self.dpi)
+        ax = fig.add_axes(self.AXES_RECT)
+        ax.set_xlim(0, self.interval_sec / 60.0)
+        ax.set_ylim(-self.rows, 1)
+
+        if transparent:
+            fig.patch.set_alpha(0.0)
+            ax.patch.set_alpha(0.0)
+            ax.set_axis_off()
+        return fig, ax
+
+    def _new_canvas(self, trace_id: str, day: str):
+        """Draw the empty helicorder (frame, labels, title) of a new day."""
+        import matplotlib.pyplot as plt
+
+        fig, ax = self._figure(transparent=False)
+        ticks = range(0, self.rows, max(1, 3600 // self.interval_sec))
+        ax.set_yticks([-row for row in ticks])
+        ax.set_yticklabels(
+            [f"{row * self.interval_sec // 3600:02d}:00" for row in ticks], fontsize=4
+        )
+        ax.tick_params(axis="x", labelsize=4)
+        ax.set_xlabel("Time in minutes", fontsize=5)
+        ax.set_ylabel("UTC", fontsize=5)
+        ax.set_title(f"Helicorder: {trace_id} | {day}", fontsize=6)
+
+        self.plot_path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(self.plot_path, dpi=self.dpi)
+        plt.close(fig)
+
+    def _composite(self, fig):
+        """Alpha-composite the layer drawn on `fig` onto the saved plot."""
+        import matplotlib.pyplot as plt
+        from PIL import Image
+
+        fig.canvas.draw()
+        layer = Image.frombuffer(
+            "RGBA", fig.canvas.get_width_height(), fig.canvas.buffer_rgba(), "raw", "RGBA", 0, 1
+        )
+        plt.close(fig)
+
+        with Image.open(self.plot_path) as image:
+            canvas = image.convert("RGBA")
+
+        temporary = self.plot_path.with_suffix(".tmp.png")
+        Image.alpha_composite(canvas, layer).convert("RGB").save(temporary)
+        os.replace(temporary, self.plot_path)
+
+    def _load_state(self) -> dict | None:
+        try:
+            with np.load(self.state_path) as saved:
+                if int(saved["version"]) != self.STATE_VERSION or (
+                    float(saved["freqmin"]),
+                    float(saved["freqmax"]),
+                    int(saved["interval_sec"]),
+                ) != (self.freqmin, self.freqmax, self.interval_sec):
+                    return None
+
+                return {
+                    "offset": int(saved["offset"]),
+                    "fs": float(saved["fs"]),
+                    "day_start": float(saved["day_start"]),
+                    "next_time": float(saved["next_time"]),
+                    "zi": saved["zi"] if saved["zi"].size else None,
+                    "scale": float(saved["scale"]),
+                    "last": tuple(saved["last"].tolist()),
+                }
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_state(self, state: dict):
+        # Saved after the plot: a crash in between only redraws the same data
+        temporary = self.state_path.with_suffix(".tmp.npz")
+        np.savez(
+            temporary,
+            version=self.STATE_VERSION,
+            freqmin=self.freqmin,
+            freqmax=self.freqmax,
+            interval_sec=self.interval_sec,
+            offset=state["offset"],
+            fs=state["fs"],
+            day_start=state["day_start"],
+            next_time=state["next_time"],
+            zi=state["zi"] if state["zi"] is not None else np.empty(0),
+            scale=state["scale"],
+            last=np.array(state["last"], dtype=np.float64),
+        )
+        os.replace(temporary, self.state_path)
@@ -0,0 +1,214 @@
+import struct
+from dataclasses import dataclass
+from io import BytesIO
+from logging import getLogger
+
+import numpy as np
+from obspy import Trace, UTCDateTime
+from obspy.io.mseed import InternalMSEEDError
+
+from src.utils.sample_buffer import SampleBuffer
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class MiniSeedRecord:
+    starttime: UTCDateTime
+    endtime: UTCDateTime
+    sample_count: int
+    data: bytes
+
+
+class MiniSeedRecordEncoder:
+    """
+    Persistent MiniSEED encoder for one channel.
+
+    Samples are accumulated and packed into fixed-length records, but only
+    complete records are returned by feed(): the samples that do not fill
+    a record yet are carried over to the next call instead of producing a
+    trailing, partially filled record on every write. flush() packs what is
+    left (e.g. at the end of a day or on shutdown).
+
+    Consecutive blocks are treated as one continuous time series when their
+    start time is within `time_tolerance` seconds of the expected one, so the
+    jitter of the host clock does not break records apart. A larger gap
+    flushes the pending samples and starts a new series.
+    """
+
+    # Byte offset of the "number of samples" field in the fixed header
+    _NSAMPLES_OFFSET = 30
+    _MAX_SEQUENCE = 999999
+
+    def __init__(
+        self,
+        network: str,
+        station: str,
+        location: str,
+        channel: str,
+        sampling_rate: float,
+        record_length: int = 512,
+        encoding: str = "STEIM2",
+        time_tolerance: float = 0.1,
+    ):
+        self.network = network
+        self.station = station
+        self.location = location
+        self.channel = channel
+        self.sampling_rate = sampling_rate
+        self.record_length = record_length
+        self.encoding = encoding
+        self.time_tolerance = time_tolerance
+
+        self._pending = SampleBuffer(record_length)
+        self._anchor: UTCDateTime | None = None  # Start of the current series
+        self._offset = 0  # Samples already packed since the anchor
+        self._sequence = 1
+
+        # Every data word of a full STEIM/INT32 record holds at least one
+        # sample, so fewer samples than this can never fill a record.
+        self._min_record_samples = (record_length - 64) // 64 * 14 - 2
+        # Samples needed before trying to pack again: packing is what costs,
+        # so it is only attempted once a record is likely to be full, based
+        # on how many samples the last full record held.
+        self._pack_threshold = self._min_record_samples
+
+    @property
+    def pending_start(self) -> UTCDateTime | None:
+        """Start time of the samples not yet packed into a record."""
+        if not len(self._pending):
+            return None
+        return self._sample_time(self._offset)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def pending_samples(self) -> np.ndarray:
+        """The samples not yet packed into a record (a view)."""
+        return self._pending.view()
+
+    def expected_time(self) -> UTCDateTime | None:
+        """Time of the next sample if the series continues without a gap."""
+        if self._anchor is None:
+            return None
+        return self._sample_time(self._offset + len(self._pending))
+
+    def align(self, start: UTCDateTime) -> UTCDateTime:
+        """
+        Start time the encoder will use for a block starting at `start`:
+        the expected time if the block continues the current series,
+        `start` itself otherwise.
+        """
+        expected = self.expected_time()
+        if expected is not None and abs(start - expected) <= self.time_tolerance:
+            return expected
+        return start
+
+    def feed(self, start: UTCDateTime, data: np.ndarray) -> list[MiniSeedRecord]:
+        """Add a block of samples and return the records that are now complete."""
+        records = []
+
+        expected = self.expected_time()
+        if expected is None or abs(start - expected) > self.time_tolerance:
+            # Gap or first block: close the previous series and re-anchor
+            records += self.flush()
+            self._anchor = start
+            self._offset = 0
+
+        self._pending.append(data)
+        records += self._pack(flush=False)
+        return records
+
+    def flush(self) -> list[MiniSeedRecord]:
+        """Pack every pending sample, including a final partial record."""
+        return self._pack(flush=True)
+
+    def _sample_time(self, index: int) -> UTCDateTime:
+        return self._anchor + index / self.sampling_rate
+
+    def _pack(self, flush: bool) -> list[MiniSeedRecord]:
+        if not len(self._pending):
+            return []
+        if not flush and len(self._pending) < self._pack_threshold:
+            return []
+
+        start = self._sample_time(self._offset)
+        trace = Trace(data=self._pending.view())
+        trace.stats.network = self.network
+        trace.stats.station = self.station
+        trace.stats.location = self.location
+        trace.stats.channel = self.channel
+        trace.stats.sampling_rate = self.sampling_rate
+        trace.stats.starttime = start
+
+        buf = BytesIO()
+        try:
+            self._write(trace, buf, self.encoding, flush)
+        except InternalMSEEDError:
+            # e.g. a difference STEIM2 cannot represent in 30 bits
+            logger.warning(
+                "%s encoding failed for %s, falling back to INT32",
+                self.encoding,
+                trace.id,
+            )
+            buf = BytesIO()
+            self._write(trace, buf, "INT32", flush)
+        except ValueError:
+            # Not enough samples to fill a single record yet
+            self._raise_threshold()
+            return []
+
+        raw = buf.getvalue()
+        records = []
+        packed = 0
+
+        for offset in range(0, len(raw), self.record_length):
+            record = raw[offset : offset + self.record_length]
+            (count,) = struct.unpack_from(">H", record, self._NSAMPLES_OFFSET)
+
+            records.append(
+                MiniSeedRecord(
+                    starttime=self._sample_time(self._offset + packed),
+                    endtime=self._sample_time(self._offset + packed + count - 1),
+                    sample_count=count,
+                    data=record,
+                )
+            )
+            packed += count
+
+        self._pending.discard(packed)
+        if flush:
+            self._pack_threshold = self._min_record_samples
+        elif records:
+            # libmseed keeps the samples left over; the next record needs
+            # about as many new samples as the smallest one just packed.
+            smallest = min(record.sample_count for record in records)
+            self._pack_threshold = len(self._pending) + max(
+                self._min_record_samples, smallest * 9 // 10
+            )
+        else:
+            self._raise_threshold()
+        self._offset += packed
+        self._sequence = (
+            self._sequence + len(records) - 1
+        ) % self._MAX_SEQUENCE + 1
+
+        return records
+
+    def _raise_threshold(self):
+        """No full record yet: wait for 10% more samples before retrying."""
+        self._pack_threshold = max(
+            self._pack_threshold, len(self._pending) + max(1, len(self._pending) // 10)
+        )
+
+    def _write(self, trace: Trace, buf: BytesIO, encoding: str, flush: bool):
+        trace.write(
+            buf,
+            format="MSEED",
+            reclen=self.record_length,
+            encoding=encoding,
+            byteorder=">",
+            sequence_number=self._sequence,
+            flush=flush,
+        )
@@ -0,0 +1,356 @@
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class SpooledRecord:
+    channel: str
+    start_us: int  # Epoch microseconds of the first sample
+    end_us: int  # Epoch microseconds of the last sample
+    data: bytes
+
+
+@dataclass
+class _Segment:
+    index: int
+    path: Path
+    size: int
+    records: int
+
+
+class RecordSpool:
+    """
+    Bounded on-disk FIFO of MiniSEED records waiting to be sent.
+
+    Records are appended to segment files:
+        DIRECTORY/00000001.spool, DIRECTORY/00000002.spool, ...
+
+    Each entry is a fixed header (marker, channel name length, start and end
+    time in microseconds, record length, CRC32 of name and record) followed
+    by the channel name and the record. A new segment is started once the
+    current one reaches `segment_bytes`; when the spool exceeds `max_bytes`
+    the oldest segment is deleted, unsent records included, so an outage
+    longer than the spool can hold loses the oldest data first.
+
+    peek() returns the oldest unsent records and commit() acknowledges them.
+    The read position is persisted in DIRECTORY/cursor, so records already
+    sent are not sent again after a restart; fully sent segments are
+    deleted. On open, a torn entry at the end of a segment (power cut while
+    appending) is truncated away.
+
+    flush() syncs the newest segment to the storage at most every
+    `sync_interval_sec`, which bounds the records a power cut can lose; a
+    segment is also synced when it is rotated out and on close().
+    """
+
+    MARKER = 0x5352  # "RS"
+    # marker, channel name length, start (us), end (us), record length, crc32
+    HEADER_FORMAT = "<HBxqqII"
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    SUFFIX = ".spool"
+    CURSOR_FILE = "cursor"
+    READ_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+        sync_interval_sec: float = 5.0,
+    ):
+        if max_bytes < segment_bytes:
+            raise ValueError("max_bytes must be at least segment_bytes.")
+        if sync_interval_sec < 0:
+            raise ValueError("sync_interval_sec cannot be negative.")
+
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.sync_interval_sec = sync_interval_sec
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Records deleted unsent to respect max_bytes
+        self.evicted = 0
+
+        self._segments: list[_Segment] = []
+        self._file = None  # Append handle of the newest segment
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+
+        # Read position: segment index and byte offset, and the records
+        # of that segment before the offset
+        self._cursor = (0, 0)
+        self._consumed = 0
+        self._peeked: tuple[tuple[int, int], int] | None = None
+
+        self._load()
+
+    def __len__(self) -> int:
+        """Number of records not sent yet."""
+        return sum(segment.records for segment in self._segments) - self._consumed
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes on disk, sent records of the oldest segment included."""
+        return sum(segment.size for segment in self._segments)
+
+    def append(self, channel: str, start_us: int, end_us: int, data: bytes):
+        name = channel.encode("ascii")
+        crc = zlib.crc32(data, zlib.crc32(name))
+        entry = (
+            struct.pack(
+                self.HEADER_FORMAT, self.MARKER, len(name), start_us, end_us, len(data), crc
+            )
+            + name
+            + data
+        )
+
+        if self._file is None or self._segments[-1].size >= self.segment_bytes:
+            self._open_segment()
+
+        self._file.write(entry)
+        self._unsynced = True
+        segment = self._segments[-1]
+        segment.size += len(entry)
+        segment.records += 1
+
+        self._evict()
+
+    def flush(self):
+        """Hand the appended entries over to the OS, syncing them every sync_interval_sec."""
+        if self._file is None:
+            return
+        if time.monotonic() - self._last_sync >= self.sync_interval_sec:
+            self.sync()
+        else:
+            self._file.flush()
+
+    def sync(self):
+        """Flush and force the newest segment to the storage."""
+        if self._file is not None:
+            self._file.flush()
+            if self._unsynced:
+                os.fsync(self._file.fileno())
+                self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    def peek(self, max_records: int) -> list[SpooledRecord]:
+        """The oldest unsent records, without removing them (see commit())."""
+        self.flush()
+        records: list[SpooledRecord] = []
+        index, offset = self._cursor
+        consumed = self._consumed
+
+        for segment in self._segments:
+            if segment.index < index:
+                continue
+            if segment.index > index:
+                index, offset, consumed = segment.index, 0, 0
+
+            with open(segment.path, "rb") as f:
+                f.seek(offset)
+                data, position = b"", 0
+                while len(records) < max_records and offset < segment.size:
+                    record, size = self._parse(data, position)
+                    if record is None:
+                        # Entry cut by the end of the chunk: read on
+                        chunk = f.read(self.READ_SIZE)
+                        if not chunk:
+                            break
+                        data, position = data[position:] + chunk, 0
+                        continue
+                    records.append(record)
+                    position += size
+                    offset += size
+                    consumed += 1
+
+            if len(records) >= max_records:
+                break
+
+        self._peeked = ((index, offset), consumed)
+        return records
+
+    def commit(self):
+        """Remove the records returned by the last peek()."""
+        if self._peeked is None:
+            return
+
+        (index, offset), consumed = self._peeked
+        self._peeked = None
+
+        # Delete the segments that are fully sent
+        while self._segments and self._segments[0].index < index:
+            self._delete_oldest()
+        self._cursor = (index, offset)
+        self._consumed = consumed
+
+        if not len(self):
+            # Everything sent: start over with an empty directory
+            self._close_file(sync=False)
+            while self._segments:
+                self._delete_oldest()
+            self._cursor = (0, 0)
+            self._consumed = 0
+            self._cursor_path().unlink(missing_ok=True)
+            return
+
+        if offset >= self._segments[0].size:
+            # Unsent records left, so this is not the newest segment
+            self._delete_oldest()
+            self._cursor = (self._segments[0].index, 0)
+            self._consumed = 0
+
+        self._save_cursor()
+
+    def close(self):
+        self._close_file()
+
+    def _parse(self, data: bytes, position: int) -> tuple[SpooledRecord | None, int]:
+        """Entry at `position` and its size, or (None, 0) if missing or torn."""
+        if position + self.HEADER_SIZE > len(data):
+            return None, 0
+
+        marker, name_len, start_us, end_us, length, crc = struct.unpack_from(
+            self.HEADER_FORMAT, data, position
+        )
+        start = position + self.HEADER_SIZE
+        end = start + name_len + length
+        if marker != self.MARKER or end > len(data):
+            return None, 0
+
+        name = data[start : start + name_len]
+        record = data[start + name_len : end]
+        if zlib.crc32(record, zlib.crc32(name)) != crc:
+            return None, 0
+
+        return SpooledRecord(name.decode("ascii"), start_us, end_us, record), end - position
+
+    def _load(self):
+        """Index the existing segments and restore the read position."""
+        paths = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                paths.append((int(path.stem), path))
+            except ValueError:
+                continue
+
+        for index, path in sorted(paths):
+            data = path.read_bytes()
+            position = records = 0
+            while True:
+                _, size = self._parse(data, position)
+                if not size:
+                    break
+                position += size
+                records += 1
+
+            if position < len(data):
+                logger.warning(
+                    "Truncating torn spool entry in %s at offset %d", path.name, position
+                )
+                os.truncate(path, position)
+            self._segments.append(_Segment(index, path, position, records))
+
+        cursor = self._load_cursor()
+        if self._segments and cursor is not None:
+            index, offset = cursor
+            if any(segment.index == index for segment in self._segments):
+                # The segments before the cursor are fully sent
+                while self._segments[0].index < index:
+                    self._delete_oldest()
+                self._cursor = (index, min(offset, self._segments[0].size))
+                self._consumed = self._count_before(self._segments[0], self._cursor[1])
+            else:
+                self._cursor = (self._segments[0].index, 0)
+        elif self._segments:
+            self._cursor = (self._segments[0].index, 0)
+
+        if len(self):
+            logger.info(
+                "Spool %s holds %d unsent records (%d bytes)", self.directory, len(self), self.nbytes
+            )
+
+    def _count_before(self, segment: _Segment, offset: int) -> int:
+        with open(segment.path, "rb") as f:
+            data = f.read(offset)
+        position = count = 0
+        while position < offset:
+            _, size = self._parse(data, position)
+            if not size:
+                break
+            position += size
+            count += 1
+        return count
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and len(self._segments) > 1:
+            oldest = self._segments[0]
+            unsent = oldest.records
+            if oldest.index == self._cursor[0]:
+                unsent -= self._consumed
+            self.evicted += unsent
+            logger.warning(
+                "Spool over %d bytes: dropped %d unsent records (%s)",
+                self.max_bytes,
+                unsent,
+                oldest.path.name,
+            )
+
+            self._delete_oldest()
+            if self._cursor[0] <= oldest.index:
+                self._cursor = (self._segments[0].index, 0)
+                self._consumed = 0
+            self._peeked = None
+            self._save_cursor()
+
+    def _open_segment(self):
+        self._close_file()
+        index = self._segments[-1].index + 1 if self._segments else 1
+        path = self.directory / f"{index:08d}{self.SUFFIX}"
+        self._file = open(path, "ab")
+        self._sync_directory()  # Make the new segment's name durable
+        self._segments.append(_Segment(index, path, 0, 0))
+        if len(self._segments) == 1:
+            self._cursor = (index, 0)
+            self._consumed = 0
+
+    def _close_file(self, sync: bool = True):
+        if self._file is not None:
+            if sync:
+                self.sync()
+            self._file.close()
+            self._file = None
+
+    def _sync_directory(self):
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _delete_oldest(self):
+        segment = self._segments.pop(0)
+        segment.path.unlink(missing_ok=True)
+
+    def _cursor_path(self) -> Path:
+        return self.directory / self.CURSOR_FILE
+
+    def _load_cursor(self) -> tuple[int, int] | None:
+        try:
+            index, offset = self._cursor_path().read_text().split()
+            return int(index), int(offset)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cursor(self):
+        # Atomic replace: a crash leaves either the old or the new position
+        temporary = self._cursor_path().with_suffix(".tmp")
+        temporary.write_text(f"{self._cursor[0]} {self._cursor[1]}\n")
+        os.replace(temporary, self._cursor_path())
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO of samples backed by a preallocated NumPy array.
+
+    extend() overwrites the oldest samples once the buffer is full, so
+    keeping the last N samples of a stream costs a slice copy per block and
+    no per-sample Python objects.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self._data = np.zeros(max(1, int(capacity)), dtype=dtype)
+        self._end = 0  # Index after the newest sample
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def extend(self, values: np.ndarray):
+        """Append a block of samples, dropping the oldest ones if full."""
+        values = np.asarray(values)
+        capacity = len(self._data)
+
+        if len(values) >= capacity:
+            self._data[:] = values[-capacity:]
+            self._end = 0
+            self._size = capacity
+            return
+
+        first = min(len(values), capacity - self._end)
+        self._data[self._end : self._end + first] = values[:first]
+        self._data[: len(values) - first] = values[first:]
+
+        self._end = (self._end + len(values)) % capacity
+        self._size = min(self._size + len(values), capacity)
+
+    def view(self) -> np.ndarray:
+        """The buffered samples, oldest first (a copy once the buffer wrapped)."""
+        start = self._end - self._size
+        if start >= 0:
+            return self._data[start : self._end]
+        return np.concatenate((self._data[start:], self._data[: self._end]))
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class SampleBuffer:
+    """
+    Append-only int32 sample buffer backed by a preallocated NumPy array.
+
+    Samples are copied straight into the array and read back as a view,
+    so no per-sample Python objects are created. When the capacity is
+    exceeded the array grows by whole chunks; clear() keeps the allocation
+    for the next round.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int32):
+        self._chunk = max(1, int(capacity))
+        self._data = np.empty(self._chunk, dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def append(self, values: np.ndarray):
+        """Copy a block of samples to the end of the buffer."""
+        values = np.asarray(values)
+        end = self._size + len(values)
+
+        if end > len(self._data):
+            # Grow by whole chunks to keep reallocations rare
+            chunks = -(-(end - len(self._data)) // self._chunk)
+            grown = np.empty(len(self._data) + chunks * self._chunk, dtype=self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+
+        self._data[self._size : end] = values
+        self._size = end
+
+    def view(self) -> np.ndarray:
+        """The buffered samples. Only valid until the next append() or clear()."""
+        return self._data[: self._size]
+
+    def discard(self, count: int):
+        """Drop the first `count` samples, moving the rest to the front."""
+        count = min(count, self._size)
+        remaining = self._size - count
+        self._data[:remaining] = self._data[count : self._size]
+        self._size = remaining
+
+    def clear(self):
+        self._size = 0
@@ -0,0 +1,213 @@
+import mmap
+import struct
+import zlib
+from logging import getLogger
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+
+class SampleJournal:
+    """
+    Append-only write-ahead journal of raw int32 samples.
+
+    Entries are appended to memory-mapped, preallocated segment files:
+        DIRECTORY/00000001.seg, DIRECTORY/00000002.seg, ...
+
+    Each entry is a fixed header (marker, length of the channel names,
+    channel count, samples per channel, timestamp of the first sample,
+    CRC32 of names and samples) followed by the comma-separated channel
+    names and the little-endian int32 samples, interleaved (one row of all
+    channels per sample time). Appending is a memcpy into the mapping, so
+    the data survives a crash of the process as soon as append() returns;
+    sync() forces the dirty pages to the storage to survive a power cut as
+    well.
+
+    A block that continues the last entry (same channels, starting within
+    `time_tolerance` of its end at `sampling_rate`) is appended to it in
+    place: its samples are written after the entry, then its header is
+    updated, so the header is paid once per entry rather than once per
+    block. sync() closes the entry, so synced data is never rewritten.
+
+    The unused tail of a segment is zero-filled, so replay() stops at the
+    first entry whose marker or checksum does not match (the end of the
+    journal, or an entry torn by a power cut).
+    """
+
+    MARKER = 0x324A  # "J2"
+    # marker, names length, channel count, samples per channel, timestamp, crc32
+    HEADER_FORMAT = "<HBBIdI"
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    SAMPLE_DTYPE = np.dtype("<i4")
+    SUFFIX = ".seg"
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_size: int = 8 * 1024 * 1024,
+        sampling_rate: float = 100.0,
+        time_tolerance: float = 0.1,
+    ):
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.sampling_rate = sampling_rate
+        self.time_tolerance = time_tolerance
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._file = None
+        self._map: mmap.mmap | None = None
+        self._position = 0
+        self._segment_index = max((i for i, _ in self._segments()), default=0)
+
+        # Entry that the next contiguous block extends: offset, names,
+        # timestamp, samples per channel, crc
+        self._open_entry: tuple[int, bytes, float, int, int] | None = None
+
+        # Journal bytes and samples (all channels) appended, for the stats
+        self.bytes_written = 0
+        self.samples_written = 0
+
+    def append(self, channels: list[str], timestamp: float, samples: np.ndarray):
+        """Journal a (channel_count, sample_count) block, one row per channel."""
+        names = ",".join(channels).encode("ascii")
+        # Interleaved: one row of all channels per sample time
+        payload = np.ascontiguousarray(np.asarray(samples).T, dtype=self.SAMPLE_DTYPE)
+        count = payload.shape[0]
+        if payload.ndim != 2 or payload.shape[1] != len(channels):
+            raise ValueError("samples must be a (channel_count, sample_count) array.")
+
+        entry = self._open_entry
+        if (
+            entry is not None
+            and entry[1] == names
+            and abs(timestamp - (entry[2] + entry[3] / self.sampling_rate))
+            <= self.time_tolerance
+            and self._position + payload.nbytes <= len(self._map)
+        ):
+            offset, _, start, entry_count, crc = entry
+            self._write(payload)
+            crc = zlib.crc32(payload, crc)
+            # Header last: a crash before it leaves the entry as it was
+            struct.pack_into(
+                self.HEADER_FORMAT,
+                self._map,
+                offset,
+                self.MARKER,
+                len(names),
+                len(channels),
+                entry_count + count,
+                start,
+                crc,
+            )
+            self._open_entry = (offset, names, start, entry_count + count, crc)
+        else:
+            size = self.HEADER_SIZE + len(names) + payload.nbytes
+            if self._map is None or self._position + size > len(self._map):
+                self._open_segment(size)
+
+            offset = self._position
+            crc = zlib.crc32(payload, zlib.crc32(names))
+            struct.pack_into(
+                self.HEADER_FORMAT,
+                self._map,
+                offset,
+                self.MARKER,
+                len(names),
+                len(channels),
+                count,
+                timestamp,
+                crc,
+            )
+            self._position += self.HEADER_SIZE
+            self._write(names)
+            self._write(payload)
+            self.bytes_written += self.HEADER_SIZE + len(names)
+            self._open_entry = (offset, names, timestamp, count, crc)
+
+        self.bytes_written += payload.nbytes
+        self.samples_written += payload.size
+
+    def _write(self, data):
+        view = memoryview(data).cast("B")
+        self._map[self._position : self._position + len(view)] = view
+        self._position += len(view)
+
+    def sync(self):
+        """Write the dirty pages of the current segment to the storage."""
+        if self._map is not None:
+            self._map.flush()
+        self._open_entry = None
+
+    def replay(self) -> Iterator[tuple[str, float, np.ndarray]]:
+        """Yield (channel, timestamp, samples) for every channel of every entry, in order."""
+        for _, path in self._segments():
+            with open(path, "rb") as f:
+                data = f.read()
+
+            position = 0
+            while position + self.HEADER_SIZE <= len(data):
+                marker, names_len, channel_count, count, timestamp, crc = struct.unpack_from(
+                    self.HEADER_FORMAT, data, position
+                )
+                if marker != self.MARKER:
+                    break
+
+                start = position + self.HEADER_SIZE
+                end = start + names_len + count * channel_count * self.SAMPLE_DTYPE.itemsize
+                names = data[start : start + names_len]
+                payload = data[start + names_len : end]
+
+                if end > len(data) or zlib.crc32(payload, zlib.crc32(names)) != crc:
+                    logger.warning(
+                        "Discarding torn journal entry in %s at offset %d",
+                        path.name,
+                        position,
+                    )
+                    break
+
+                rows = np.frombuffer(payload, dtype=self.SAMPLE_DTYPE).reshape(
+                    count, channel_count
+                )
+                for channel, samples in zip(names.decode("ascii").split(","), rows.T):
+                    yield channel, timestamp, samples
+                position = end
+
+    def reset(self):
+        """Drop every entry, e.g. once the journaled samples are archived."""
+        self.close()
+        for _, path in self._segments():
+            path.unlink()
+        self._segment_index = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+        self._position = 0
+        self._open_entry = None
+
+    def _segments(self) -> list[tuple[int, Path]]:
+        segments = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                segments.append((int(path.stem), path))
+            except ValueError:
+                continue
+        return sorted(segments)
+
+    def _open_segment(self, min_size: int):
+        self.close()
+        self._segment_index += 1
+        path = self.directory / f"{self._segment_index:08d}{self.SUFFIX}"
+
+        size = max(self.segment_size, min_size)
+        self._file = open(path, "w+b")
+        self._file.truncate(size)  # Sparse, zero-filled
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._position = 0
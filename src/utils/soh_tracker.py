@@ -16,19 +16,19 @@ class SOHTracker:
         self._last_seen = 0.0
         self._connected = False
 
-    def record_success(self):
-        """Record a successfully received and validated packet."""
+    def record_success(self, count: int = 1):
+        """Record successfully received and validated packets."""
         with self._lock:
-            self._total_packets += 1
-            self._successful_packets += 1
+            self._total_packets += count
+            self._successful_packets += count
             self._last_seen = time()
             self._connected = True
 
-    def record_checksum_error(self):
-        """Record a packet that failed checksum validation."""
+    def record_checksum_error(self, count: int = 1):
+        """Record packets that failed checksum validation."""
         with self._lock:
-            self._total_packets += 1
-            self._checksum_errors += 1
+            self._total_packets += count
+            self._checksum_errors += count
 
     def record_dropped_bytes(self, count: int = 1):
         """Record bytes that were discarded while searching for packet headers."""
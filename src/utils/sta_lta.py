@@ -0,0 +1,79 @@
+import numpy as np
+from scipy.signal import lfilter
+
+
+class RecursiveStaLta:
+    """
+    Streaming version of ObsPy's recursive STA/LTA.
+
+    The STA and LTA accumulators are carried between calls, so each new
+    sample costs O(1) instead of re-running the recursion over a rolling
+    buffer. Feeding a stream in blocks of any size yields the same ratios
+    as calling :func:`obspy.signal.trigger.recursive_sta_lta` once on the
+    concatenated data (including the first sample being skipped and the
+    first ``nlta`` ratios being zeroed while the LTA warms up).
+    """
+
+    def __init__(self, nsta: int, nlta: int):
+        if nsta <= 0 or nlta <= 0:
+            raise ValueError("nsta and nlta must be positive sample counts.")
+
+        self.nsta = nsta
+        self.nlta = nlta
+
+        self._csta = 1.0 / nsta
+        self._clta = 1.0 / nlta
+        self._icsta = 1.0 - self._csta
+        self._iclta = 1.0 - self._clta
+
+        self.reset()
+
+    def reset(self):
+        """Forget all history, as if no sample had been seen yet."""
+        self._sta = 0.0
+        self._lta = 1e-99  # Same zero-division guard as ObsPy's C code
+        self._count = 0
+
+    @property
+    def is_warm(self) -> bool:
+        """True once the LTA window has been filled and ratios are meaningful."""
+        return self._count > self.nlta
+
+    def update(self, samples) -> np.ndarray:
+        """
+        Feed a block of samples and return the STA/LTA ratio for each of them.
+        """
+        data = np.asarray(samples, dtype=np.float64).ravel()
+        n = len(data)
+        if n == 0:
+            return np.empty(0, dtype=np.float64)
+
+        first_index = self._count
+        self._count += n
+
+        # ObsPy starts the recursion at index 1: the very first sample of
+        # the stream never enters the averages.
+        skip = 1 if first_index == 0 else 0
+        sq = np.square(data[skip:])
+
+        # y[i] = c * x[i] + (1 - c) * y[i-1] as a first-order IIR filter,
+        # with the previous accumulator value as the initial condition.
+        sta, _ = lfilter(
+            [self._csta], [1.0, -self._icsta], sq, zi=[self._icsta * self._sta]
+        )
+        lta, _ = lfilter(
+            [self._clta], [1.0, -self._iclta], sq, zi=[self._iclta * self._lta]
+        )
+
+        cft = np.zeros(n, dtype=np.float64)
+        if len(sq):
+            cft[skip:] = sta / lta
+            self._sta = sta[-1]
+            self._lta = lta[-1]
+
+        # Zero the ratios that fall inside the LTA warm-up window
+        warmup = self.nlta - first_index
+        if warmup > 0:
+            cft[:warmup] = 0.0
+
+        return cft
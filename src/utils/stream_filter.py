@@ -0,0 +1,124 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin, iirfilter, sosfilt, sosfilt_zi
+
+
+class StreamingBandpass:
+    """
+    Butterworth bandpass applied sample by sample across blocks.
+
+    Same design as ObsPy's ``bandpass`` (cascaded second-order sections,
+    causal), but the state of every section is carried between calls, so a
+    stream filtered in blocks of any size gives the same output as filtering
+    it in one go, without re-filtering overlapping windows or edge effects
+    at block boundaries. If `freqmax` is above the Nyquist frequency, a
+    highpass is used instead, as ObsPy does.
+    """
+
+    def __init__(
+        self, freqmin: float, freqmax: float, sampling_rate: float, corners: int = 4
+    ):
+        nyquist = 0.5 * sampling_rate
+        low = freqmin / nyquist
+        high = freqmax / nyquist
+
+        if high >= 1.0:
+            self.sos = iirfilter(corners, low, btype="highpass", ftype="butter", output="sos")
+        else:
+            self.sos = iirfilter(
+                corners, [low, high], btype="band", ftype="butter", output="sos"
+            )
+
+        self._zi: np.ndarray | None = None
+
+    @property
+    def state(self) -> np.ndarray | None:
+        """State of the sections after the last block (e.g. to persist it)."""
+        return self._zi
+
+    @state.setter
+    def state(self, zi: np.ndarray | None):
+        self._zi = None if zi is None else np.asarray(zi, dtype=np.float64)
+
+    def reset(self):
+        self._zi = None
+
+    def process(self, samples) -> np.ndarray:
+        """Filter a block of samples, continuing from the previous block."""
+        data = np.asarray(samples, dtype=np.float64)
+        if not len(data):
+            return data
+
+        if self._zi is None:
+            # Start in steady state for the first sample, not from rest,
+            # so the DC offset of the sensor does not cause a step response
+            self._zi = sosfilt_zi(self.sos) * data[0]
+
+        filtered, self._zi = sosfilt(self.sos, data, zi=self._zi)
+        return filtered
+
+
+class PolyphaseDecimator:
+    """
+    Anti-aliased decimation by an integer factor across blocks.
+
+    A linear-phase FIR lowpass is evaluated only at the samples that are
+    kept (every `factor`-th one), which is what a polyphase decimator
+    computes. The last ``numtaps - 1`` input samples and the position of
+    the next kept sample are carried between calls, so the output does not
+    depend on how the stream is split into blocks.
+
+    The output is delayed by `delay` input samples (the FIR group delay).
+    """
+
+    def __init__(self, factor: int, numtaps: int | None = None):
+        if factor < 1:
+            raise ValueError("The decimation factor must be a positive integer.")
+
+        self.factor = int(factor)
+        if numtaps is None:
+            numtaps = 8 * self.factor + 1
+
+        if self.factor == 1:
+            self.taps = np.ones(1)
+        else:
+            # Cutoff at 80% of the new Nyquist frequency
+            self.taps = firwin(numtaps, 0.8 / self.factor)
+
+        self._reversed_taps = self.taps[::-1].copy()
+        self._history: np.ndarray | None = None
+        self._phase = 0
+
+    @property
+    def delay(self) -> float:
+        """Group delay of the FIR filter, in input samples."""
+        return (len(self.taps) - 1) / 2
+
+    @property
+    def phase(self) -> int:
+        """Index, within the next block, of the next sample that will be kept."""
+        return self._phase
+
+    def reset(self):
+        self._history = None
+        self._phase = 0
+
+    def process(self, samples) -> np.ndarray:
+        """Decimate a block of samples, continuing from the previous block."""
+        data = np.asarray(samples, dtype=np.float64)
+        if not len(data):
+            return data
+
+        if self._history is None:
+            # Assume the stream was constant before its first sample
+            self._history = np.full(len(self.taps) - 1, data[0])
+
+        buffer = np.concatenate((self._history, data))
+
+        # Window i ends at data[i]: only the kept positions are evaluated
+        windows = sliding_window_view(buffer, len(self.taps))[self._phase :: self.factor]
+        decimated = windows @ self._reversed_taps
+
+        self._phase = (self._phase - len(data)) % self.factor
+        self._history = buffer[len(buffer) - (len(self.taps) - 1) :]
+        return decimated
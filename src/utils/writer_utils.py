@@ -1,6 +1,7 @@
 from pathlib import Path
 from logging import getLogger
 
+import numpy as np
 from obspy import UTCDateTime
 
 logger = getLogger(__name__)
@@ -29,36 +30,54 @@ def sds_path(archive_root: Path, network: str, station: str,
     return archive_root / "archive" / "sds" / str(t.year) / network / station / f"{channel}.D" / filename
 
 
+_NS_PER_DAY = 86400 * 10**9
+
+
 def split_buffer_at_midnight(
-    values: list,
+    values: np.ndarray,
     start_time: UTCDateTime,
     sampling_rate: float,
-) -> list[tuple[UTCDateTime, list]]:
+) -> list[tuple[UTCDateTime, np.ndarray]]:
     """
     Split a buffer of samples at UTC midnight boundaries.
     Returns a list of (start_time, samples) slices, one per calendar day.
+    The samples are views into `values`.
+
+    The index of the first sample of each new day is computed directly
+    from the start time and the sampling rate, using the same time
+    arithmetic as UTCDateTime (which has no leap seconds, so every day is
+    86400 s long): sample i is at `start_time + i / sampling_rate`.
     """
-    if not values:
+    if not len(values):
         return []
 
+    seconds_per_sample = 1.0 / sampling_rate
+
+    def sample_ns(i: int) -> int:
+        # Same rounding as UTCDateTime.__add__
+        return start_time.ns + int(round(float(i * seconds_per_sample) * 1e9))
+
+    first_day = start_time.ns // _NS_PER_DAY
+    last_day = sample_ns(len(values) - 1) // _NS_PER_DAY
+
     slices = []
     slice_start = start_time
-    slice_values = []
-
-    seconds_per_sample = 1.0 / sampling_rate
+    slice_index = 0
 
-    for i, v in enumerate(values):
-        sample_time = start_time + i * seconds_per_sample
+    for day in range(first_day + 1, last_day + 1):
+        midnight_ns = day * _NS_PER_DAY
 
-        # Detect crossing into a new UTC day
-        if slice_values and sample_time.julday != slice_start.julday:
-            slices.append((slice_start, slice_values))
-            slice_start = sample_time
-            slice_values = []
+        # First sample at or after midnight: estimate, then correct for rounding
+        i = int(np.ceil((midnight_ns - start_time.ns) / 1e9 * sampling_rate))
+        while i > slice_index + 1 and sample_ns(i - 1) >= midnight_ns:
+            i -= 1
+        while sample_ns(i) < midnight_ns:
+            i += 1
 
-        slice_values.append(v)
+        slices.append((slice_start, values[slice_index:i]))
+        slice_start = start_time + i * seconds_per_sample
+        slice_index = i
 
-    if slice_values:
-        slices.append((slice_start, slice_values))
+    slices.append((slice_start, values[slice_index:]))
 
     return slices
@@ -0,0 +1,15 @@
+from typing import Literal
+
+from rpi_seism_common.websocket_message import BaseModel
+
+from .envelope_payload import EnvelopePayload
+
+
+# Answer to an EnvelopeRequest, not part of the shared message types
+class Envelope(BaseModel):
+    type: Literal["envelope"] = "envelope"
+    payload: EnvelopePayload
+
+    @property
+    def to_json(self):
+        return self.model_dump_json()
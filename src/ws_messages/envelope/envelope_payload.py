@@ -0,0 +1,9 @@
+from rpi_seism_common.websocket_message import BaseModel
+
+
+class EnvelopePayload(BaseModel):
+    channel: str
+    resolution: float  # Bin length in seconds
+    times: list[float]  # Start time of each bin (epoch seconds)
+    min: list[float]
+    max: list[float]
@@ -0,0 +1,13 @@
+from typing import Literal
+
+from rpi_seism_common.websocket_message import BaseModel
+
+
+# Sent by clients, e.g. {"type": "envelope", "channel": "EHZ",
+#   "start": 1760000000.0, "end": 1760086400.0, "max_points": 1500}
+class EnvelopeRequest(BaseModel):
+    type: Literal["envelope"]
+    channel: str
+    start: float | None = None  # Default: oldest available data
+    end: float | None = None  # Default: now
+    max_points: int = 1000
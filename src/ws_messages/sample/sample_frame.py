@@ -0,0 +1,90 @@
+import struct
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# WebSocket subprotocol a client offers to receive SampleFrames instead of JSON
+BINARY_SUBPROTOCOL = "rpi-seism.binary.v1"
+
+
+@dataclass
+class SampleFrameChannel:
+    channel: str
+    timestamp: float  # Epoch time of the last sample
+    fs: float
+    data: np.ndarray
+
+
+@dataclass
+class SampleFrame:
+    """
+    Binary alternative to the JSON Sample message: the decimated samples of
+    every channel for one tick, in a single WebSocket binary frame.
+
+    Layout (little-endian):
+        frame header: magic b"RS", version (u8), channel count (u8),
+                      tick sequence (u32)
+        per channel:  channel name (8 bytes, NUL padded), timestamp of the
+                      last sample (f64, epoch seconds), fs (f32),
+                      sample count (u32), then the samples as f32
+
+    Every field starts at a multiple of 4 bytes, so browsers can read the
+    samples with a Float32Array directly on the received ArrayBuffer.
+    """
+
+    sequence: int
+    channels: list[SampleFrameChannel] = field(default_factory=list)
+
+    MAGIC = b"RS"
+    VERSION = 1
+    HEADER_FORMAT = "<2sBBI"
+    CHANNEL_FORMAT = "<8sdfI"
+    SAMPLE_DTYPE = np.dtype("<f4")
+
+    def to_bytes(self) -> bytes:
+        parts = [
+            struct.pack(
+                self.HEADER_FORMAT,
+                self.MAGIC,
+                self.VERSION,
+                len(self.channels),
+                self.sequence & 0xFFFFFFFF,
+            )
+        ]
+
+        for entry in self.channels:
+            samples = np.asarray(entry.data, dtype=self.SAMPLE_DTYPE)
+            parts.append(
+                struct.pack(
+                    self.CHANNEL_FORMAT,
+                    entry.channel.encode("ascii"),
+                    entry.timestamp,
+                    entry.fs,
+                    len(samples),
+                )
+            )
+            parts.append(samples.tobytes())
+
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, frame: bytes) -> "SampleFrame":
+        magic, version, count, sequence = struct.unpack_from(cls.HEADER_FORMAT, frame)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Not a version 1 sample frame.")
+
+        offset = struct.calcsize(cls.HEADER_FORMAT)
+        channels = []
+        for _ in range(count):
+            name, timestamp, fs, samples = struct.unpack_from(
+                cls.CHANNEL_FORMAT, frame, offset
+            )
+            offset += struct.calcsize(cls.CHANNEL_FORMAT)
+            data = np.frombuffer(frame, dtype=cls.SAMPLE_DTYPE, count=samples, offset=offset)
+            offset += data.nbytes
+            channels.append(
+                SampleFrameChannel(name.rstrip(b"\0").decode("ascii"), timestamp, fs, data)
+            )
+
+        return cls(sequence, channels)
@@ -0,0 +1,12 @@
+from typing import Literal
+
+from rpi_seism_common.websocket_message import BaseModel
+
+
+# Sent by clients, e.g. {"type": "subscribe", "channels": ["EHZ"],
+#   "band": [1.0, 5.0], "decimation": 10}. Omitted fields keep the defaults.
+class SubscribeRequest(BaseModel):
+    type: Literal["subscribe"]
+    channels: list[str] | None = None
+    band: tuple[float, float] | None = None
+    decimation: int | None = None
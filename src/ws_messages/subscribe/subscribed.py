@@ -0,0 +1,15 @@
+from typing import Literal
+
+from rpi_seism_common.websocket_message import BaseModel
+
+from .subscribed_payload import SubscribedPayload
+
+
+# Answer to a SubscribeRequest with the subscription now in effect
+class Subscribed(BaseModel):
+    type: Literal["subscribed"] = "subscribed"
+    payload: SubscribedPayload
+
+    @property
+    def to_json(self):
+        return self.model_dump_json()
@@ -0,0 +1,8 @@
+from rpi_seism_common.websocket_message import BaseModel
+
+
+class SubscribedPayload(BaseModel):
+    channels: list[str]
+    band: tuple[float, float]
+    decimation: int
+    fs: float
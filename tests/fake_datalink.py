@@ -0,0 +1,70 @@
+import socket
+import threading
+
+
+class FakeDataLinkServer:
+    """
+    Minimal DataLink 1.1 server for the tests and benchmarks: answers ID,
+    stores the packets of WRITE and acknowledges those that ask for it.
+
+    stop() drops the connections and start() listens again on the same
+    port, to stand in for a Ringserver outage.
+    """
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self.packets: list[tuple[str, int, int, bytes]] = []  # stream id, start, end, data
+        self._connections: list[socket.socket] = []
+
+    def start(self) -> "FakeDataLinkServer":
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", self.port))
+        self.port = self._socket.getsockname()[1]
+        self._socket.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def stop(self):
+        for sock in (self._socket, *self._connections):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        self._connections.clear()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            self._connections.append(connection)
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    @staticmethod
+    def _frame(header: str) -> bytes:
+        encoded = header.encode()
+        return b"DL" + bytes([len(encoded)]) + encoded
+
+    def _serve(self, connection: socket.socket):
+        stream = connection.makefile("rb")
+        try:
+            while True:
+                preheader = stream.read(3)
+                if len(preheader) < 3:
+                    return
+                command = stream.read(preheader[2]).decode().split()
+
+                if command[0] == "ID":
+                    connection.sendall(
+                        self._frame("ID DataLink 2020.075 :: DLPROTO:1.0 PACKETSIZE:512 WRITE")
+                    )
+                elif command[0] == "WRITE":
+                    _, stream_id, start, end, flags, size = command[:6]
+                    self.packets.append((stream_id, int(start), int(end), stream.read(int(size))))
+                    if "A" in flags:
+                        connection.sendall(self._frame("OK 0 0"))
+        except OSError:
+            return
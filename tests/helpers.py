@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+
+def make_settings(sampling_rate: int = 100, write_interval_sec: float = 1800.0, dayplot: bool = False):
+    """Minimal stand-in for the Settings attributes the threads read."""
+    return SimpleNamespace(
+        channels=[
+            SimpleNamespace(name="EHZ", adc_channel=0),
+            SimpleNamespace(name="EHN", adc_channel=1),
+            SimpleNamespace(name="EHE", adc_channel=2),
+        ],
+        decimation_factor=4,
+        mcu=SimpleNamespace(sampling_rate=sampling_rate),
+        station=SimpleNamespace(network="XX", station="RPI3", location_code="00"),
+        jobs_settings=SimpleNamespace(
+            writer=SimpleNamespace(write_interval_sec=write_interval_sec),
+            trigger=SimpleNamespace(
+                trigger_channel="EHZ", sta_sec=1.0, lta_sec=10.0, thr_on=3.0, thr_off=1.5
+            ),
+            dayplot=SimpleNamespace(enabled=dayplot, low_cutoff=0.5, high_cutoff=10.0),
+        ),
+    )
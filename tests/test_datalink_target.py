@@ -0,0 +1,123 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.threads.managers.datalink_target import DataLinkTarget
+from src.utils.record_spool import SpooledRecord
+from tests.fake_datalink import FakeDataLinkServer
+
+
+class IncompatibleClient:
+    """Client whose batch() rejects the arguments, like datalink-client < 1.5."""
+
+    is_connected = True
+
+    def batch(self):
+        raise AssertionError("unreachable")
+
+    def close(self):
+        self.is_connected = False
+
+
+def wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def record(i: int) -> SpooledRecord:
+    return SpooledRecord("EHZ", i * 1_000_000, i * 1_000_000 + 990_000, i.to_bytes(4, "big") * 128)
+
+
+class DataLinkTargetTest(unittest.TestCase):
+    def test_unexpected_write_error_spools_the_records(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = DataLinkTarget(
+                "localhost", 16000, "XX_RPI3_00_", "RPI3", spool_dir=Path(tmp) / "spool"
+            )
+            target.client = IncompatibleClient()
+            target._pending = [SpooledRecord("EHZ", 0, 1_000_000, b"\0" * 512)]
+
+            with self.assertLogs("src.threads.managers.datalink_target", "ERROR"):
+                target._send_pending()
+
+            self.assertIsNone(target.client)
+            self.assertEqual(target._pending, [])
+            self.assertEqual(target.backlog, 1)
+            target._spool.close()
+
+
+class DataLinkTargetOutageTest(unittest.TestCase):
+    """A DataLinkTarget against a stand-in server that goes away and comes back."""
+
+    REPLAY_RATE = 20.0
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.server = FakeDataLinkServer().start()
+        self.addCleanup(self.server.stop)
+
+        self.target = DataLinkTarget(
+            "127.0.0.1",
+            self.server.port,
+            "XX_RPI3_00_",
+            "RPI3",
+            reconnect_interval_sec=0.1,
+            spool_dir=Path(self.tmp.name) / "spool",
+            replay_records_per_sec=self.REPLAY_RATE,
+            timeout_sec=1.0,
+        )
+        self.target.start()
+        self.addCleanup(self.target.stop, 5)
+        self.assertTrue(wait_for(lambda: self.target.client is not None))
+
+    def test_records_spooled_during_an_outage_are_replayed_in_order(self):
+        self.target.put(record(0))
+        self.assertTrue(wait_for(lambda: len(self.server.packets) == 1))
+
+        self.server.stop()
+        with self.assertLogs("src.threads.managers.datalink_target", "WARNING"):
+            for i in range(1, 41):
+                self.target.put(record(i))
+            self.assertTrue(wait_for(lambda: self.target.backlog == 40))
+        self.assertEqual(len(self.server.packets), 1)
+
+        restarted = time.monotonic()
+        self.server.start()
+        self.assertTrue(wait_for(lambda: self.target.backlog == 0))
+        replay_time = time.monotonic() - restarted
+
+        self.assertTrue(wait_for(lambda: len(self.server.packets) == 41))
+        self.assertEqual(
+            [packet[3] for packet in self.server.packets], [record(i).data for i in range(41)]
+        )
+        self.assertEqual({packet[0] for packet in self.server.packets}, {"XX_RPI3_00_EHZ/MSEED"})
+        self.assertEqual(self.target.records_replayed, 40)
+        # At most a second of records at once, then REPLAY_RATE per second
+        self.assertGreaterEqual(replay_time, (40 - self.REPLAY_RATE) / self.REPLAY_RATE)
+
+    def test_live_records_are_sent_while_the_backlog_replays(self):
+        self.server.stop()
+        with self.assertLogs("src.threads.managers.datalink_target", "WARNING"):
+            for i in range(40):
+                self.target.put(record(i))
+            self.assertTrue(wait_for(lambda: self.target.backlog == 40))
+
+        self.server.start()
+        self.assertTrue(wait_for(lambda: self.target.records_replayed > 0))
+        self.target.put(record(100))
+        self.assertTrue(wait_for(lambda: record(100).data in [p[3] for p in self.server.packets]))
+        self.assertGreater(self.target.backlog, 0)
+
+        self.assertTrue(wait_for(lambda: self.target.backlog == 0))
+        replayed = [p[3] for p in self.server.packets if p[3] != record(100).data]
+        self.assertEqual(replayed, [record(i).data for i in range(40)])
+
+
+if __name__ == "__main__":
+    unittest.main()
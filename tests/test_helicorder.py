@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from obspy import Stream, Trace, UTCDateTime
+
+from src.utils.helicorder import Helicorder
+
+
+class HelicorderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = Path(self.tmp.name)
+
+    def write_day_file(self, record_length: int, samples: int) -> Path:
+        trace = Trace(
+            np.random.default_rng(0).integers(-1000, 1000, samples).astype(np.int32),
+            header={
+                "network": "XX",
+                "station": "RPI3",
+                "location": "00",
+                "channel": "EHZ",
+                "sampling_rate": 100.0,
+                "starttime": UTCDateTime(2026, 1, 1, 12),
+            },
+        )
+        path = self.directory / "XX.RPI3.00.EHZ.D.2026.001"
+        Stream([trace]).write(str(path), format="MSEED", encoding="STEIM2", reclen=record_length)
+        return path
+
+    def test_reads_the_records_of_the_writer_record_length(self):
+        path = self.write_day_file(record_length=256, samples=1500)
+        self.assertNotEqual(path.stat().st_size % 512, 0)
+
+        helicorder = Helicorder(self.directory / "plot.png", 0.5, 10.0, record_length=256)
+
+        self.assertEqual(helicorder.update(path), 1500)
+        self.assertEqual(helicorder.update(path), 0)
@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from src.structs.hub_message import DATA_TOPIC, SOH_TOPIC, HubMessage, HubMessageType
+
+
+class HubMessageTest(unittest.TestCase):
+    def test_data_round_trip_carries_all_channels(self):
+        samples = np.arange(30, dtype=np.int32).reshape(3, 10)
+        frames = HubMessage.data_message(7, 1.7e9, samples).to_frames()
+
+        self.assertEqual(frames[0], DATA_TOPIC.encode())
+        message = HubMessage.from_frames([bytes(frame) for frame in frames])
+        self.assertEqual(message.message_type, HubMessageType.DATA)
+        self.assertEqual((message.sequence, message.timestamp), (7, 1.7e9))
+        self.assertEqual((message.channel_count, message.sample_count), (3, 10))
+        np.testing.assert_array_equal(message.data, samples)
+
+    def test_soh_round_trip(self):
+        frames = HubMessage.soh_message(7, 1.7e9, {"packets": 5}).to_frames()
+
+        self.assertEqual(frames[0], SOH_TOPIC.encode())
+        self.assertEqual(HubMessage.from_frames(frames).soh, {"packets": 5})
+
+    def test_truncated_payload_is_rejected(self):
+        frames = HubMessage.data_message(1, 0.0, np.zeros((3, 10), dtype=np.int32)).to_frames()
+
+        with self.assertRaises(ValueError):
+            HubMessage.from_frames([frames[0], frames[1], bytes(frames[2])[:-4]])
@@ -0,0 +1,113 @@
+import tempfile
+import threading
+import time
+import unittest
+from multiprocessing import Event, Queue
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import zmq
+from obspy import read
+
+from src.structs.hub_message import HubMessage
+from src.threads.producers.mseed_writer import MSeedWriter
+from src.utils.sample_buffer import SampleBuffer
+from tests.helpers import make_settings
+
+
+class MSeedWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name)
+        self.endpoint = f"ipc://{self.output_dir / 'hub.ipc'}"
+        self.shutdown_event = Event()
+        self.writer = MSeedWriter(
+            make_settings(),
+            self.output_dir,
+            self.shutdown_event,
+            Event(),
+            Queue(),
+            zmq_endpoint=self.endpoint,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_log_write_stats_resets_the_counters(self):
+        journal = self.writer._journal
+        self.writer._stats["bytes"] = 1024
+
+        self.writer._log_write_stats(time.time(), force=True)
+
+        self.assertEqual(self.writer._stats, {"bytes": 0, "records": 0, "fsyncs": 0})
+        # The live journal is kept
+        self.assertIs(self.writer._journal, journal)
+
+    def test_start_stop_archives_the_received_samples(self):
+        errors = []
+        previous_hook = threading.excepthook
+        threading.excepthook = errors.append
+        self.addCleanup(setattr, threading, "excepthook", previous_hook)
+
+        context = zmq.Context()
+        pub = context.socket(zmq.PUB)
+        pub.bind(self.endpoint)
+        self.addCleanup(context.term)
+        self.addCleanup(pub.close, 0)
+
+        self.writer.start()
+        time.sleep(0.5)  # Let the subscription reach the publisher
+
+        start = time.time()
+        # One row per channel, in channel_layout order (EHZ, EHN, EHE)
+        samples = np.arange(3000, dtype=np.int32).reshape(3, 1000)
+        for sequence, offset in enumerate(range(0, samples.shape[1], 100)):
+            message = HubMessage.data_message(
+                sequence, start + offset / 100, samples[:, offset : offset + 100]
+            )
+            pub.send_multipart(message.to_frames())
+
+        time.sleep(0.5)
+        self.shutdown_event.set()
+        self.writer.join(timeout=10)
+
+        self.assertFalse(self.writer.is_alive())
+        self.assertEqual(errors, [])
+
+        for channel, expected in zip(("EHZ", "EHN", "EHE"), samples):
+            files = list(self.output_dir.rglob(f"*.{channel}.D.*"))
+            self.assertEqual(len(files), 1)
+            stream = read(str(files[0]))
+            np.testing.assert_array_equal(
+                np.concatenate([t.data for t in stream]), expected
+            )
+
+    def test_day_files_are_synced_before_the_journal_is_reset(self):
+        writer = MSeedWriter(
+            make_settings(),
+            self.output_dir,
+            Event(),
+            Event(),
+            Queue(),
+            zmq_endpoint=self.endpoint,
+            fsync_policy="none",
+        )
+        writer._start_time = time.time()
+        for ch_name in writer.channel_names:
+            writer._buffer[ch_name] = SampleBuffer(1000)
+            writer._buffer[ch_name].append(np.arange(1000, dtype=np.int32))
+
+        calls = mock.Mock()
+        with (
+            mock.patch("src.threads.producers.mseed_writer.os.fsync", calls.fsync),
+            mock.patch.object(writer._journal, "reset", calls.reset),
+        ):
+            writer._flush()
+
+        names = [name for name, _, _ in calls.mock_calls]
+        self.assertEqual(names, ["fsync"] * 3 + ["reset"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import time
+import unittest
+
+from src.structs.notification import Notification
+from src.threads.managers.notification_dispatcher import NotificationDispatcher
+
+
+class RecordingTarget:
+    """Stand-in for an Apprise instance that accepts every notification."""
+
+    def __init__(self):
+        self.titles = []
+
+    async def async_notify(self, title, body, attach=None, body_format=None):
+        self.titles.append(title)
+        return True
+
+
+class FlakyTarget(RecordingTarget):
+    """Target whose first delivery raises, like a dropped connection."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    async def async_notify(self, title, body, attach=None, body_format=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        return await super().async_notify(title, body, attach, body_format)
+
+
+def notification(kind: str, trigger_time: float) -> Notification:
+    return Notification(kind=kind, trigger_time=trigger_time, title=f"{kind} {trigger_time}", body="")
+
+
+class NotificationDispatcherTest(unittest.TestCase):
+    def test_nothing_is_queued_without_targets(self):
+        dispatcher = NotificationDispatcher([])
+        dispatcher.submit(notification("alert", 1.0))
+
+        self.assertTrue(dispatcher._inbox.empty())
+
+    def test_a_trigger_is_notified_once_per_kind(self):
+        target = RecordingTarget()
+        dispatcher = NotificationDispatcher([])
+        dispatcher.targets = {"test://": target}
+        dispatcher.labels = {"test://": "test #0"}
+
+        started = time.monotonic()
+        dispatcher.start()
+        for kind, trigger_time in [
+            ("alert", 1.0),
+            ("alert", 1.0),  # Same trigger, still on
+            ("report", 1.0),
+            ("alert", 2.0),
+        ]:
+            dispatcher.submit(notification(kind, trigger_time))
+        dispatcher.stop(timeout=5)
+
+        self.assertFalse(dispatcher.is_alive())
+        self.assertEqual(target.titles, ["alert 1.0", "report 1.0", "alert 2.0"])
+        # Woken up by stop(), not by a poll or the inbox timeout
+        self.assertLess(time.monotonic() - started, NotificationDispatcher.INBOX_TIMEOUT_SEC)
+
+    def test_a_raising_delivery_is_retried(self):
+        target = FlakyTarget()
+        dispatcher = NotificationDispatcher([], backoff_sec=0.01, max_backoff_sec=0.01)
+        dispatcher.targets = {"test://": target}
+        dispatcher.labels = {"test://": "test #0"}
+
+        with self.assertLogs("src.threads.managers.notification_dispatcher") as logs:
+            dispatcher.start()
+            dispatcher.submit(notification("alert", 1.0))
+            dispatcher.stop(timeout=5)
+
+        self.assertEqual(target.titles, ["alert 1.0"])
+        self.assertTrue(any("connection reset" in line for line in logs.output))
+        self.assertFalse(any(line.startswith("ERROR") for line in logs.output))
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.utils.record_spool import RecordSpool
+
+
+class RecordSpoolSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = Path(self.tmp.name)
+
+        fsync = mock.patch("src.utils.record_spool.os.fsync", wraps=os.fsync)
+        self.fsync = fsync.start()
+        self.addCleanup(fsync.stop)
+
+    def test_flush_syncs_at_most_every_interval(self):
+        spool = RecordSpool(self.directory, segment_bytes=1024, sync_interval_sec=3600)
+        spool.append("EHZ", 0, 1, b"x" * 100)
+        spool.flush()
+        self.fsync.reset_mock()  # The new segment's directory entry
+
+        spool.append("EHZ", 1, 2, b"x" * 100)
+        spool.flush()
+        self.assertEqual(self.fsync.call_count, 0)
+
+        spool.sync_interval_sec = 0
+        spool.flush()
+        self.assertEqual(self.fsync.call_count, 1)
+        spool.flush()  # Nothing new to sync
+        self.assertEqual(self.fsync.call_count, 1)
+
+    def test_segments_are_synced_on_rotation_and_close(self):
+        spool = RecordSpool(self.directory, segment_bytes=256, sync_interval_sec=3600)
+        synced = []
+        self.fsync.side_effect = lambda fd: synced.append(
+            Path(os.readlink(f"/proc/self/fd/{fd}")).name
+        )
+
+        spool.append("EHZ", 0, 1, b"x" * 300)
+        spool.append("EHZ", 1, 2, b"x" * 300)  # Rotates the first segment out
+        self.assertIn("00000001.spool", synced)
+
+        spool.close()
+        self.assertIn("00000002.spool", synced)
+        self.assertEqual(len(RecordSpool(self.directory)), 2)
+
+
+class RecordSpoolEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # Two 231-byte entries per segment: opening a third evicts the oldest
+        self.spool = RecordSpool(Path(self.tmp.name), segment_bytes=256, max_bytes=512)
+        self.addCleanup(self.spool.close)
+
+    def append(self, *indices: int):
+        for i in indices:
+            self.spool.append("EHZ", i, i + 1, bytes([i]) * 200)
+
+    def test_oldest_segment_is_evicted_over_max_bytes(self):
+        with self.assertLogs("src.utils.record_spool", "WARNING"):
+            self.append(*range(6))
+
+        self.assertLessEqual(self.spool.nbytes, self.spool.max_bytes)
+        self.assertEqual(self.spool.evicted, 4)
+        self.assertEqual(len(self.spool), 2)
+        self.assertEqual([record.start_us for record in self.spool.peek(10)], [4, 5])
+
+    def test_sent_records_are_not_counted_as_evicted(self):
+        with self.assertLogs("src.utils.record_spool", "WARNING"):
+            self.append(*range(6))
+        self.spool.peek(1)
+        self.spool.commit()  # Record 4 sent
+
+        with self.assertLogs("src.utils.record_spool", "WARNING"):
+            self.append(6)
+        self.assertEqual(self.spool.evicted, 5)
+        self.assertEqual([record.start_us for record in self.spool.peek(10)], [6])
+
+        self.spool.commit()
+        self.assertEqual(len(self.spool), 0)
+        self.assertEqual(list(Path(self.tmp.name).glob("*.spool")), [])
@@ -0,0 +1,26 @@
+import unittest
+
+from src.threads.managers.ringserver_sender import parse_targets
+
+
+class ParseTargetsTest(unittest.TestCase):
+    def test_entries(self):
+        cases = {
+            "localhost": [("localhost", 16000)],
+            "example.org:18000": [("example.org", 18000)],
+            "[::1]": [("::1", 16000)],
+            "[::1]:18000": [("::1", 18000)],
+            " localhost , [fe80::1]:18001,": [("localhost", 16000), ("fe80::1", 18001)],
+        }
+        for hosts, expected in cases.items():
+            with self.subTest(hosts=hosts):
+                self.assertEqual(parse_targets(hosts, 16000), expected)
+
+    def test_invalid_entries(self):
+        for hosts in ["fe80::1", "::1:18000", "[::1", "[::1]18000", "localhost:port", " , "]:
+            with self.subTest(hosts=hosts), self.assertRaises(ValueError):
+                parse_targets(hosts, 16000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.sample_journal import SampleJournal
+
+CHANNELS = ["EHZ", "EHN", "EHE"]
+
+
+class SampleJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.journal = SampleJournal(Path(self.tmp.name), 64 * 1024, sampling_rate=100)
+        self.addCleanup(self.journal.close)
+
+    def replay(self) -> list[tuple[str, float, list]]:
+        return [(ch, ts, samples.tolist()) for ch, ts, samples in self.journal.replay()]
+
+    def test_contiguous_blocks_share_one_entry(self):
+        samples = np.arange(300, dtype=np.int32).reshape(3, 100)
+        for offset in range(100):
+            self.journal.append(CHANNELS, 1000.0 + offset / 100, samples[:, offset : offset + 1])
+
+        self.assertEqual(
+            self.replay(), [(ch, 1000.0, row.tolist()) for ch, row in zip(CHANNELS, samples)]
+        )
+        # One header and the channel names for 300 samples of 4 bytes
+        overhead = SampleJournal.HEADER_SIZE + len("EHZ,EHN,EHE")
+        self.assertEqual(self.journal.bytes_written, 300 * 4 + overhead)
+
+    def test_gaps_and_syncs_start_new_entries(self):
+        block = np.ones((3, 10), dtype=np.int32)
+        self.journal.append(CHANNELS, 1000.0, block)
+        self.journal.append(CHANNELS, 1000.1, block)
+        self.journal.append(CHANNELS, 1005.0, block)  # Gap
+        self.journal.sync()
+        self.journal.append(CHANNELS, 1005.1, block)  # Synced entries are not rewritten
+        self.journal.append(["EHZ"], 1005.2, block[:1])  # Other channels
+
+        timestamps = [ts for ch, ts, _ in self.replay() if ch == "EHZ"]
+        self.assertEqual(timestamps, [1000.0, 1005.0, 1005.1, 1005.2])
+        self.assertEqual(sum(len(s) for _, _, s in self.replay()), 4 * 30 + 10)
+
+    def test_replay_stops_at_a_torn_extension(self):
+        block = np.ones((3, 10), dtype=np.int32)
+        self.journal.append(CHANNELS, 1000.0, block)
+        self.journal.sync()
+        self.journal.append(CHANNELS, 1000.1, block)
+        self.journal.append(CHANNELS, 1000.2, block)
+        # A power cut tore the unsynced entry: only the synced one is left
+        self.journal._map[self.journal._position - 4] ^= 0xFF
+
+        self.assertEqual([len(s) for _, _, s in self.replay()], [10, 10, 10])
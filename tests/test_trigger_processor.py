@@ -0,0 +1,33 @@
+import unittest
+from multiprocessing import Event
+
+import numpy as np
+
+from src.threads.producers.trigger_processor import TriggerProcessor
+from tests.helpers import make_settings
+
+
+class TriggerProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.earthquake_event = Event()
+        self.processor = TriggerProcessor(make_settings(), Event(), self.earthquake_event)
+        self.noise = np.random.default_rng(0).normal(0, 10, 100 * 60)
+
+    def test_no_trigger_before_the_lta_window_has_filled(self):
+        # A burst 2 s into the stream, while the 10 s LTA is still filling
+        samples = self.noise[:500].copy()
+        samples[200:300] *= 100
+
+        self.processor._update_trigger_state(samples)
+
+        self.assertFalse(self.processor.armed)
+        self.assertFalse(self.earthquake_event.is_set())
+
+    def test_a_burst_after_the_warm_up_triggers(self):
+        self.processor._update_trigger_state(self.noise[:1500])
+        self.assertTrue(self.processor.armed)
+        self.assertFalse(self.earthquake_event.is_set())
+
+        self.processor._update_trigger_state(self.noise[1500:1600] * 100)
+
+        self.assertTrue(self.earthquake_event.is_set())
@@ -0,0 +1,62 @@
+import inspect
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.processes.plotters import Plotters
+from src.processes.reader import Reader
+from src.threads.managers.notifier_sender import NotifierSender
+from src.threads.producers.mseed_writer import MSeedWriter
+from src.threads.producers.websocket_sender import WebSocketSender
+from src.tuning import Tuning
+
+# Tuning section -> what its keyword arguments are passed to
+TARGETS = {
+    "reader": Reader,
+    "writer": MSeedWriter,
+    "websocket": WebSocketSender,
+    "notifier": NotifierSender,
+    "plotters": Plotters,
+}
+
+
+class TuningTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "tuning.yml"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_missing_file_keeps_the_defaults(self):
+        self.assertEqual(Tuning.load(self.path), Tuning())
+
+    def test_sections_map_onto_keyword_arguments(self):
+        self.path.write_text("reader:\n  block_max_samples: 10\n")
+
+        kwargs = Tuning.load(self.path).reader.kwargs()
+
+        self.assertEqual(kwargs["block_max_samples"], 10)
+        self.assertEqual(kwargs["block_max_latency_sec"], 0.05)
+
+    def test_sections_match_the_constructors(self):
+        tuning = Tuning()
+        self.assertEqual(set(TARGETS), set(type(tuning).model_fields))
+
+        for section, target in TARGETS.items():
+            parameters = inspect.signature(target.__init__).parameters
+            for key, value in getattr(tuning, section).kwargs().items():
+                with self.subTest(section=section, key=key):
+                    self.assertIn(key, parameters)
+                    # The defaults of the file mirror those of the code
+                    self.assertEqual(value, parameters[key].default)
+
+    def test_unknown_keys_are_rejected(self):
+        self.path.write_text("reader:\n  block_max_sample: 10\n")
+
+        with self.assertRaises(ValueError):
+            Tuning.load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import asyncio
+import gc
+import unittest
+from multiprocessing import Event
+
+from src.threads.producers.websocket_sender import WebSocketSender
+from tests.helpers import make_settings
+
+
+class StalledWebSocket:
+    """Client socket whose closing handshake takes a while, then fails."""
+
+    remote_address = ("192.0.2.1", 50000)
+
+    async def close(self, code, reason):
+        await asyncio.sleep(0.05)
+        raise ConnectionResetError("peer gone")
+
+
+class WebSocketSenderTest(unittest.TestCase):
+    def test_slow_client_close_is_kept_until_done(self):
+        sender = WebSocketSender(make_settings(), Event(), Event(), slow_client_policy="disconnect")
+
+        async def disconnect():
+            sender._disconnect_slow_client(StalledWebSocket())
+            gc.collect()
+            self.assertEqual(len(sender._closing), 1)
+            await asyncio.gather(*sender._closing, return_exceptions=True)
+
+        with self.assertLogs("src.threads.producers.websocket_sender", "WARNING") as logs:
+            asyncio.run(disconnect())
+
+        self.assertEqual(sender._closing, set())
+        self.assertEqual(sender.slow_clients_disconnected, 1)
+        self.assertIn("peer gone", logs.output[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()